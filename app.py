@@ -1,376 +1,388 @@
 import streamlit as st
-import random
 import time
+import contextlib
+import functools
+import math
+import os
+import io
 import json
-import streamlit.components.v1 as components
+import cProfile
+import pstats
 import re
+import secrets
+import streamlit.components.v1 as components
+
+from party_engine import (
+    EXPORT_FORMATS,
+    SNAPFILE_EXT,
+    EventLog,
+    Metrics,
+    NameIndex,
+    RoomRegistry,
+    build_reward_wheel,
+    build_weighted_wheel,
+    commit_punish,
+    commit_reward,
+    dump_party,
+    import_roster,
+    iter_export,
+    load_party,
+    load_party_config,
+    normalize_room_code,
+    parse_roster_text,
+    restore_party,
+    reward_winner_pos,
+    verify_punish,
+    verify_reward,
+    winner_pos_for,
+)
+
+_RUN_T0 = time.perf_counter()  # เริ่มจับเวลา full app rerun
 st.set_page_config(page_title="Party Tools", page_icon="🎡", layout="wide")
 
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
 # -----------------------------
-# Helpers
+# Shared config (data/party_config.json)
+# - โหลดครั้งเดียวต่อ process แชร์ทุก session (immutable: tuple / mappingproxy)
+# - แก้ไฟล์แล้วโหลดใหม่เอง (cache key = mtime) ไม่ต้อง restart server
 # -----------------------------
-def shuffle_avoid_adjacent_same(items, max_tries=50):
-    """
-    Shuffle list so that no identical neighbors exist (best effort).
-    If impossible (e.g. too many duplicates), it will try and return best attempt.
-    """
-    if len(items) <= 2:
-        return items[:]
-
-    best = items[:]
-    best_bad = float("inf")
-
-    for _ in range(max_tries):
-        arr = items[:]
-        random.shuffle(arr)
-        bad = sum(1 for i in range(1, len(arr)) if arr[i] == arr[i - 1])
-        if bad == 0:
-            return arr
-        if bad < best_bad:
-            best_bad = bad
-            best = arr
-
-    # fallback: greedy fix
-    arr = best[:]
-    for i in range(1, len(arr)):
-        if arr[i] == arr[i - 1]:
-            # find a later different element and swap
-            j = None
-            for k in range(i + 1, len(arr)):
-                if arr[k] != arr[i - 1]:
-                    j = k
-                    break
-            if j is not None:
-                arr[i], arr[j] = arr[j], arr[i]
-    return arr
-
-
-def expand_weighted_labels(punish_items):
-    """
-    Expand list by weight -> ["ดื่ม 3 วินาที", "ดื่ม 3 วินาที", ...]
-    and then shuffle to avoid duplicates adjacent.
-    """
-    expanded = []
-    for it in punish_items:
-        w = max(0, int(it.get("weight", 0)))
-        if w <= 0:
-            continue
-        expanded.extend([str(it["label"])] * w)
-
-    # shuffle so that same label not stuck together
-    expanded = shuffle_avoid_adjacent_same(expanded, max_tries=80)
-    return expanded
-
-def parse_eel_points(label: str):
+CONFIG_PATH = os.path.join(APP_DIR, "data", "party_config.json")
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_party_config(path, mtime_ns):
+    return load_party_config(path)
+
+
+def party_config():
+    return _load_party_config(CONFIG_PATH, os.stat(CONFIG_PATH).st_mtime_ns)
+
+
+# -----------------------------
+# Event log (data/events.sqlite3) แชร์ทั้ง process แต่แยก scope ต่อ party
+# - party id อยู่ใน URL (?party=...) -> refresh แล้วกู้ party เดิม, เปิดลิงก์เปล่า = party ใหม่
+# - session อื่น (มือถือแขก ฯลฯ) ไม่เห็น / ไม่ทับผลของกันและกัน
+# -----------------------------
+EVENT_LOG_PATH = os.path.join(APP_DIR, "data", "events.sqlite3")
+SNAPSHOT_EVERY = 1000  # replay ตอนกู้ไม่เกินเท่านี้ event (นับต่อ scope)
+PARTY_ID_RE = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+
+@st.cache_resource(show_spinner=False)
+def event_log():
+    return EventLog(EVENT_LOG_PATH)
+
+
+@st.cache_resource(show_spinner=False)
+def snapshot_counts():
+    """{scope: จำนวน event ตั้งแต่ snapshot ล่าสุด} (หลาย session เขียน scope เดียวกันได้)"""
+    return {}
+
+
+def party_id():
+    """party id ของ session จาก ?party=...; ไม่มี / รูปแบบไม่ถูก -> สร้างใหม่แล้วใส่ URL"""
+    pid = st.query_params.get("party")
+    if not pid or not PARTY_ID_RE.match(pid):
+        pid = st.session_state.get("party_id") or secrets.token_urlsafe(9)
+        st.query_params["party"] = pid
+    return pid
+
+
+# -----------------------------
+# Metrics (span / counter / payload bytes) แชร์ทั้ง process
+# - ดูได้ที่ sidebar เมื่อเปิด ?debug=1, export เป็น data/metrics.json
+# -----------------------------
+METRICS_PATH = os.path.join(APP_DIR, "data", "metrics.json")
+METRICS_EXPORT_EVERY = 10  # วินาที (export อัตโนมัติตอน debug)
+PROFILE_DIR = os.path.join(APP_DIR, "data", "profiles")
+
+
+@st.cache_resource(show_spinner=False)
+def metrics():
+    return Metrics()
+
+
+METRICS = metrics()
+
+
+# -----------------------------
+# Shared room (?room=CODE): ทุกจอในห้องชี้ Party ตัวเดียวกัน (party_engine.room)
+# - host (?room=CODE&host=TOKEN) แก้ room.party ภายใต้ room.lock แล้ว touch() -> version +1
+# - viewer poll ด้วย fragment (run_every) เทียบ version แล้วอ่าน view ที่สร้างครั้งเดียวต่อ version
+# -----------------------------
+ROOM_POLL_S = 1.0
+ROOM_WHEEL_HEIGHT = 460
+ROOM_RECENT_PAIRS = 10
+
+
+@st.cache_resource(show_spinner=False)
+def rooms():
+    return RoomRegistry()
+
+
+def current_room():
+    """-> (Room, เป็น host ไหม) จาก query params; ไม่ได้อยู่ในห้อง / ไม่มีห้องนี้ -> (None, False)"""
+    code = st.query_params.get("room")
+    room = rooms().get(code) if code else None
+    if room is None:
+        return None, False
+    return room, room.is_host(st.query_params.get("host"))
+
+
+ROOM, IS_HOST = current_room()
+
+
+def room_guard():
     """
-    ดึงเลขหลังคำว่า 'แทงปลาไหล' เช่น '... แทงปลาไหล 40' -> 40
-    ถ้าไม่มี -> None
+    host ถือ lock เฉพาะช่วงแก้ room.party + log_event (viewer ไม่เห็น state ครึ่ง ๆ)
+    ไม่คลุมการ render / fairness -> poll ของ viewer ไม่ต้องรอ; นอกห้องไม่ต้องล็อก
     """
-    if not label:
-        return None
-    m = re.search(r"แทงปลาไหล\s*(\d+)", str(label))
-    return int(m.group(1)) if m else None
+    return ROOM.lock if IS_HOST else contextlib.nullcontext()
+
+
+def room_publish(kind, layout, items=None, message=None):
+    """layout / ผลหมุนของวงล้อ kind -> ทุกจอในห้อง (เฉพาะ host)"""
+    if IS_HOST:
+        ROOM.publish(kind, layout, items, message)
+
+
 # -----------------------------
 # State init
+# - logic ทั้งหมดอยู่ใน party_engine.Party (ss.party); session_state เก็บแค่ state ของ UI เพิ่ม
 # -----------------------------
 def init_state():
     ss = st.session_state
+    cfg = party_config()
+
+    before = ss.get("party")
+    pid = party_id()
+    if ss.get("party_id") != pid:
+        ss.pop("party", None)  # party id เปลี่ยน -> กู้ใหม่จาก scope นั้น
+        ss.party_id = pid
+
+    orphan = orphan_room_log() if ROOM is None else None
+    if ROOM is not None:
+        # ในห้อง: ไม่กู้ / ไม่คำนวณเอง ใช้ party ของห้อง (แก้ได้เฉพาะ host)
+        ss.party = ROOM.party
+        ss.party_room = ROOM.code
+        if IS_HOST:
+            ROOM.heartbeat(st.query_params.get("host"))
+            with ROOM.lock:
+                ss.party.sync_config(cfg)
+    elif orphan is not None:
+        fold_room_scope(orphan, pid, cfg)
+    elif "party" not in ss or ss.pop("party_room", None):
+        # session ใหม่ (refresh / server restart) หรือเพิ่งออกจากห้อง -> กู้ผลจาก event log ของ party นี้
+        ss.party, snapshot_counts()[pid] = restore_party(event_log().scope(pid), cfg)
+    else:
+        ss.party.sync_config(cfg)
+    if before is not None and ss.party is not before:
+        reset_party_ui()  # เข้า / ออก / รับห้อง, เปลี่ยน party id
 
     # Reward wheel
-    ss.setdefault("reward_pool", list(range(1, 11)))
-    ss.setdefault("reward_last", None)
-    ss.setdefault("reward_remove_after", False)
-    ss.setdefault("reward_winner_index", None)
-    ss.setdefault("reward_wheel_labels", None)  # shuffled labels for display
-
-    # Buddy list
-    ss.setdefault("buddy_list", [
-    "พี่ปั๊ป",
-    "น้องอ่าย",
-    "พี่ป้อง",
-    "หมอไนท์",
-    "หมอพีท",
-    "หมอกานต์",
-    "พี่แบงค์",
-    "พี่วัจน์",
-    "ป๊อป AR",
-    "แอ๊น",
-    "นันทิชา",
-    "พิม Asst",
-    "แนน Asst.",
-    "สตางค์ Admin",
-    "บี๋ ACC",
-    "MARK",
-    "อามร์",
-    "แนท DEV",
-    "อีฟ Pur",
-    "เจน IB",
-    "โจ๊ค DRN",
-    "พราว RN",
-    "เมย์ RN",
-    "พี่แอน RN",
-    "ฟ้าใส HPH",
-    "พี่บี PH",
-    "แอม PH",
-    "เขต",
-    "แจน PH",
-    "หนุงหนิง",
-    "ตอง",
-    "เดียร์",
-    "ชมพู่",
-    "มะปราง",
-    "เดียร์น่า",
-    "หลิน",
-    "โอม PMD",
-    "นัท PMD",
-    "ฟ้า PMD",
-    "บังเจี๊ยบ DV",
-    "เมย์ HK",
-    "บังหมาน DV",
-    "หมูแป้ง",
-    "แนน PH",
-    "สมา",
-    "เบญ",
-    "นี",
-    "เอ้",
-    "ตุ๊ก",
-    "หลิว",
-    "จิ๋ม",
-    "เมย์ IB",
-    "อ้อน IB",
-    "ยาหยี IB",
-    "น้าพง",
-    "โดม",
-    "อู",
-    "อาคา",
-    "ปาย",
-])
-    ss.setdefault("selected_player", None)
+    ss.setdefault("reward_spin_id", 0)
+    ss.setdefault("reward_last_spin", 0)  # spin_id ของผลล่าสุด (0 = กู้มาจาก log)
+    ss.setdefault("reward_wheel_layout", None)  # wheel + pool version
 
-    # Punishment config
-    ss.setdefault("punish_items", [
-        {"label": "ดื่ม 0 วินาที", "seconds": 0, "weight": 1},
-        {"label": "ดื่ม 1 วินาที หรือ แทงปลาไหล 20", "seconds": 1, "weight": 1},
-        {"label": "ดื่ม 2 วินาที หรือ แทงปลาไหล 30", "seconds": 2, "weight": 2},
-        {"label": "ดื่ม 3 วินาที หรือ แทงปลาไหล 40", "seconds": 3, "weight": 3},
-        {"label": "ดื่ม 4 วินาที หรือ แทงปลาไหล 50", "seconds": 4, "weight": 2},
-        {"label": "ดื่ม 5 วินาที หรือ แทงปลาไหล 60", "seconds": 5, "weight": 1},
-    ])
-    ss.setdefault("punish_last", None)
-    ss.setdefault("punish_remove_after", False)
-    ss.setdefault("punish_winner_index", None)
-    ss.setdefault("punish_wheel_labels", None)  # shuffled expanded labels for display
+    # Punishment
+    ss.setdefault("selected_player", None)
+    ss.setdefault("punish_spin_id", 0)
+    ss.setdefault("punish_last_spin", 0)
+    ss.setdefault("punish_wheel_layout", None)  # weighted wheel (segments + stripe order + sampler version)
 
     # Buddy–Budder
-    ss.setdefault("budder_list", [
-    "พี่ปั๊ป",
-    "น้องอ่าย",
-    "พี่ป้อง",
-    "หมอไนท์",
-    "หมอพีท",
-    "หมอกานต์",
-    "พี่แบงค์",
-    "พี่วัจน์",
-    "ป๊อป AR",
-    "แอ๊น",
-    "นันทิชา",
-    "พิม Asst",
-    "แนน Asst.",
-    "สตางค์ Admin",
-    "บี๋ ACC",
-    "MARK",
-    "อามร์",
-    "แนท DEV",
-    "อีฟ Pur",
-    "เจน IB",
-    "โจ๊ค DRN",
-    "พราว RN",
-    "เมย์ RN",
-    "พี่แอน RN",
-    "ฟ้าใส HPH",
-    "พี่บี PH",
-    "แอม PH",
-    "เขต",
-    "แจน PH",
-    "หนุงหนิง",
-    "ตอง",
-    "เดียร์",
-    "ชมพู่",
-    "มะปราง",
-    "เดียร์น่า",
-    "หลิน",
-])
-    ss.setdefault("pairs", [])
     ss.setdefault("selected_buddy", None)
     ss.setdefault("selected_budder", None)
     ss.setdefault("confirm_step", None)
 
+
+def reset_party_ui():
+    """ล้าง state ของ UI ที่อ้างถึง party เดิม (cache key เป็น version ต่อ object -> ชนกันข้าม party ได้)"""
+    ss = st.session_state
+    ss.reward_wheel_layout = None
+    ss.punish_wheel_layout = None
+    ss.reward_last_spin = ss.punish_last_spin = 0
+    ss.selected_player = ss.selected_buddy = ss.selected_budder = None
+    ss.confirm_step = None
+    ss.pop("reward_quick", None)
+    ss.pop("punish_quick", None)
+
+
+def room_scope(code):
+    return f"room-{code}"
+
+
+def orphan_room_log():
+    """
+    URL ของ host แต่ห้องไม่มีใน registry แล้ว (server restart) -> ScopedLog ของห้องนั้น (ถ้ามีผลบันทึกไว้)
+    viewer (ไม่มี host token) ไม่ย้ายอะไร แค่เห็นว่าไม่พบห้อง
+    """
+    code = normalize_room_code(st.query_params.get("room"))
+    if code is None or not st.query_params.get("host"):
+        return None
+    log = event_log().scope(room_scope(code))
+    return log if log.exists() else None
+
+
+def fold_room_scope(log, pid, cfg):
+    """ผลของห้องใน log -> party ของ host (scope pid) แบบเดียวกับตอนปิดห้อง"""
+    ss = st.session_state
+    ss.party, _ = restore_party(log, cfg)
+    event_log().scope(pid).snapshot(ss.party.snapshot())
+    snapshot_counts()[pid] = 0
+    ss.pop("party_room", None)
+    ss.room_folded = st.query_params.pop("room")
+    st.query_params.pop("host", None)
+
+
+def log_scope():
+    """scope ของ event log ที่ session นี้เขียน: host เขียนลง scope ของห้อง (เปลี่ยน host ได้ไม่ปนกับ party ของใคร)"""
+    return room_scope(ROOM.code) if IS_HOST else st.session_state.party_id
+
+
+def log_event(kind, **data):
+    """บันทึก event (เข้าคิว group commit) + snapshot ทุก SNAPSHOT_EVERY event ของ scope เดียวกัน"""
+    ss = st.session_state
+    scope = log_scope()
+    log = event_log().scope(scope)
+    METRICS.incr(f"event.{kind}")
+    with room_guard():
+        with METRICS.span("event_log.append"):
+            log.append(kind, data)
+        ss.party.history.observe(kind, data)  # ประวัติ / leaderboard (ตอน replay ผ่าน Party.apply)
+        if IS_HOST:
+            ROOM.touch()
+        counts = snapshot_counts()
+        counts[scope] = counts.get(scope, 0) + 1
+        if counts[scope] >= SNAPSHOT_EVERY:
+            with METRICS.span("event_log.snapshot"):
+                log.snapshot(ss.party.snapshot())
+            counts[scope] = 0
+
+
 init_state()
+st.session_state.full_rerun = True  # False ตอนจบ script -> fragment rerun หลังจากนั้นรู้ว่าตัวเองไม่ใช่ full rerun
+
+DEBUG = st.query_params.get("debug") == "1"  # ?debug=1 -> แสดง frame-time ของวงล้อ + debug sidebar
+
+# cProfile ทั้ง rerun (กดจาก debug sidebar -> ทำครั้งเดียวรอบถัดไป)
+_PROFILER = cProfile.Profile() if st.session_state.pop("profile_next", False) else None
+if _PROFILER:
+    _PROFILER.enable()
 
 
 # -----------------------------
-# Canvas Wheel Component (HTML/JS)
-# - draws wheel; if winner_index passed -> animates to it
+# Canvas Wheel Component (static custom component: frontend/wheel)
+# - iframe อยู่ถาวร ไม่สร้างใหม่ทุก rerun; ส่งแค่ state ที่เปลี่ยน
+# - segments ส่งครั้งเดียวต่อ layout id (จำไว้ใน session_state); iframe ถูกสร้างใหม่ -> component ขอใหม่ (nonce)
+# - spin_id ใหม่ -> หมุนไปหยุดที่ winner_pos แล้วตอบกลับ {"version", "spin_id"}
 # -----------------------------
-def wheel_component(labels, winner_index=None, height=560, key="wheel"):
-    payload = {
-        "labels": labels,
-        "winnerIndex": winner_index,
-        "key": key,
-        "ts": int(time.time() * 1000),
-    }
-    data = json.dumps(payload)
-    canvas_id = f"wheelCanvas_{key}"
-
-    html = f"""
-    <div style="width:100%; display:flex; justify-content:center;">
-      <canvas id="{canvas_id}" width="520" height="520" style="max-width:100%;"></canvas>
-    </div>
-
-    <script>
-      const payload = {data};
-      const labels = payload.labels || [];
-      const canvas = document.getElementById("{canvas_id}");
-      const ctx = canvas.getContext("2d");
-
-      function mulberry32(a) {{
-        return function() {{
-          var t = a += 0x6D2B79F5;
-          t = Math.imul(t ^ t >>> 15, t | 1);
-          t ^= t + Math.imul(t ^ t >>> 7, t | 61);
-          return ((t ^ t >>> 14) >>> 0) / 4294967296;
-        }}
-      }}
-      const rand = mulberry32((payload.ts >>> 0));
-
-      function colorFor(i) {{
-        const hue = (i * 360 / Math.max(1, labels.length)) % 360;
-        return `hsl(${{hue}}, 70%, 55%)`;
-      }}
-
-      let angle = 0;
-
-      function draw() {{
-        const n = labels.length;
-        ctx.clearRect(0, 0, canvas.width, canvas.height);
-
-        const cx = canvas.width / 2;
-        const cy = canvas.height / 2;
-        const r = Math.min(cx, cy) - 10;
-
-        ctx.beginPath();
-        ctx.arc(cx, cy, r, 0, Math.PI * 2);
-        ctx.fillStyle = "#ffffff";
-        ctx.fill();
-        ctx.lineWidth = 6;
-        ctx.strokeStyle = "#222";
-        ctx.stroke();
-
-        if (n === 0) return;
-
-        const arc = (Math.PI * 2) / n;
-
-        for (let i = 0; i < n; i++) {{
-          const start = angle + i * arc;
-          const end = start + arc;
-
-          ctx.beginPath();
-          ctx.moveTo(cx, cy);
-          ctx.arc(cx, cy, r - 6, start, end);
-          ctx.closePath();
-          ctx.fillStyle = colorFor(i);
-          ctx.fill();
-
-          ctx.save();
-          ctx.translate(cx, cy);
-          ctx.rotate(start + arc/2);
-          ctx.textAlign = "right";
-          ctx.fillStyle = "#111";
-          ctx.font = "bold 16px sans-serif";
-          const text = String(labels[i]);
-          ctx.fillText(text.length > 16 ? text.slice(0, 16) + "…" : text, r - 24, 6);
-          ctx.restore();
-        }}
-
-        // center
-        ctx.beginPath();
-        ctx.arc(cx, cy, 56, 0, Math.PI * 2);
-        ctx.fillStyle = "#fff";
-        ctx.fill();
-        ctx.lineWidth = 4;
-        ctx.strokeStyle = "#111";
-        ctx.stroke();
-
-        ctx.fillStyle = "#111";
-        ctx.font = "bold 16px sans-serif";
-        ctx.textAlign = "center";
-        ctx.fillText("SPIN", cx, cy + 6);
-
-        // pointer
-        ctx.beginPath();
-        ctx.moveTo(cx, cy - r + 6);
-        ctx.lineTo(cx - 14, cy - r + 34);
-        ctx.lineTo(cx + 14, cy - r + 34);
-        ctx.closePath();
-        ctx.fillStyle = "#111";
-        ctx.fill();
-      }}
-
-      function angleForIndex(idx) {{
-        const n = labels.length;
-        const arc = (Math.PI * 2) / n;
-        const pointerAngle = (Math.PI * 3/2);
-        const sectorCenter = idx * arc + arc/2;
-        return (pointerAngle - sectorCenter);
-      }}
-
-      function spinTo(idx) {{
-        const n = labels.length;
-        if (!n) return;
-
-        const target = angleForIndex(idx);
-        const extra = (Math.PI * 2) * (4 + Math.floor(rand() * 3)); // 4-6 รอบ
-        const finalAngle = target + extra;
-
-        const start = angle;
-        const delta = finalAngle - start;
-        const duration = 1800 + Math.floor(rand() * 600);
-        const t0 = performance.now();
-
-        function easeOutCubic(t) {{ return 1 - Math.pow(1 - t, 3); }}
-
-        function frame(now) {{
-          const t = Math.min(1, (now - t0) / duration);
-          angle = start + delta * easeOutCubic(t);
-          draw();
-          if (t < 1) requestAnimationFrame(frame);
-        }}
-        requestAnimationFrame(frame);
-      }}
-
-      draw();
-
-      if (typeof payload.winnerIndex === "number") {{
-        setTimeout(() => spinTo(payload.winnerIndex), 200);
-      }}
-    </script>
+_wheel_frontend = components.declare_component(
+    "party_wheel",
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend", "wheel"),
+)
+
+
+def wheel_component(wheel, winner_pos=None, spin_id=None, height=560, key="wheel", quick=None, playlist=None):
+    """
+    wheel: layout ที่มี "segments", "order", "id"
+    quick: ชุดผลที่ commit ไว้ (SpinCommit.public) -> แตะวงล้อแล้วหมุนทันทีฝั่ง browser
+    playlist: {"id", "items": [{"pos", "text"}]} -> หมุนต่อกันทีละรายการ (หมุนทั้งรอบ)
+    คืนค่า state ล่าสุดจากฝั่ง browser: {"version": layout id, "spin_id": หมุนเสร็จล่าสุด} หรือ {}
+    ฝั่ง JS วาดวงล้อเป็น sprite ครั้งเดียวต่อ layout แต่ละเฟรมแค่หมุนภาพ
     """
-    return components.html(html, height=height)
+    ss = st.session_state
+    shown = ss.get(key) or {}
+    sent_key, nonce_key = f"{key}_layout_sent", f"{key}_layout_nonce"
+    if shown.get("nonce") is not None and shown["nonce"] != ss.get(nonce_key):
+        ss[nonce_key] = shown["nonce"]  # คำขอ segments ใหม่ (ตอบครั้งเดียวต่อคำขอ)
+        ss.pop(sent_key, None)
+    send_layout = ss.get(sent_key) != wheel["id"]
+    spin = spin_id if spin_id is not None and winner_pos is not None else None
+    args = dict(
+        segments=wheel["segments"] if send_layout else None,
+        order=wheel["order"] if send_layout else None,
+        version=wheel["id"],
+        spin_id=spin,
+        winner_pos=winner_pos if spin is not None else None,
+        quick=quick,
+        playlist=playlist,
+        height=height,
+        debug=DEBUG,
+    )
+    # ขนาด args ที่ส่งไป browser (ส่วนใหญ่คือ segments ตอน layout เปลี่ยน)
+    size = len(json.dumps(args, ensure_ascii=False).encode())
+    METRICS.gauge(f"payload_bytes.{key}", size)
+    METRICS.incr("payload_bytes.wheel_total", size)
+    if send_layout:
+        METRICS.incr(f"wheel_layout_sent.{key}")
+        ss[sent_key] = wheel["id"]
+    with METRICS.span(f"wheel_component.{key}"):
+        value = _wheel_frontend(**args, key=key, default=None)
+    value = value or {}
+    if DEBUG and value.get("frame_stats"):
+        s = value["frame_stats"]
+        st.caption(f"🛠 {s['fps']} fps · avg {s['avg_ms']} ms · p95 {s['p95_ms']} ms · {s['sectors']} แถบ")
+    return value
 
 
 # -----------------------------
 # UI helpers: clickable "cards"
 # -----------------------------
-def card_picker(title, items, selected, key_prefix):
+@st.cache_resource(max_entries=32, show_spinner=False)
+def name_index(names):
+    """NameIndex แชร์ทุก session (names เป็น tuple -> ใช้เป็น cache key ได้)"""
+    return NameIndex(names)
+
+
+PICKER_PAGE_SIZE = 24  # 4 คอลัมน์ x 6 แถว
+
+
+@METRICS.timed("card_picker")
+def card_picker(title, items, selected, key_prefix, page_size=PICKER_PAGE_SIZE):
+    """
+    ค้นหา + แบ่งหน้า: สร้างปุ่มเฉพาะหน้าที่เห็น (จำนวน widget คงที่ไม่ว่ารายชื่อยาวแค่ไหน)
+    """
     st.markdown(f"### {title}")
     if not items:
         st.info("ไม่มีรายการ")
         return None
 
+    ss = st.session_state
+    q = st.text_input("ค้นหา", key=f"{key_prefix}_q", placeholder="🔎 ค้นหาชื่อ", label_visibility="collapsed")
+    hits = name_index(tuple(items)).search(q)
+
+    page_key = f"{key_prefix}_page"
+    if ss.get(f"{key_prefix}_q_last") != q:
+        ss[f"{key_prefix}_q_last"] = q
+        ss[page_key] = 0
+    pages = max(1, math.ceil(len(hits) / page_size))
+    page = min(ss.get(page_key, 0), pages - 1)
+
+    if pages > 1:
+        p1, p2, p3 = st.columns([1, 2, 1])
+        with p1:
+            if st.button("◀", key=f"{key_prefix}_prev", use_container_width=True, disabled=page == 0):
+                page -= 1
+        with p3:
+            if st.button("▶", key=f"{key_prefix}_next", use_container_width=True, disabled=page >= pages - 1):
+                page += 1
+        with p2:
+            st.caption(f"หน้า {page + 1}/{pages} · {len(hits)} รายการ")
+    ss[page_key] = page
+
+    if not hits:
+        st.caption("ไม่พบชื่อที่ค้นหา")
+    if selected and selected in items:
+        st.caption(f"เลือกอยู่: **{selected}**")
+
     cols = st.columns(4)
     chosen = selected
-    for i, name in enumerate(items):
-        with cols[i % 4]:
+    for j, i in enumerate(hits[page * page_size:(page + 1) * page_size]):
+        name = items[i]
+        with cols[j % 4]:
             is_sel = (name == selected)
             label = f"✅ {name}" if is_sel else name
             if st.button(label, use_container_width=True, key=f"{key_prefix}_btn_{i}_{name}"):
@@ -378,90 +390,488 @@ def card_picker(title, items, selected, key_prefix):
     return chosen
 
 
-st.title("🎡 Party Tools (Graphic Wheels + Buddy Picker)")
+# -----------------------------
+# Roster editor: นำเข้าไฟล์ CSV/XLSX หรือแก้เป็นข้อความ
+# - textarea สร้างเฉพาะตอนเปิด toggle (รายชื่อหลายพันบรรทัดไม่ต้อง render ทุก rerun)
+# - ทั้ง 2 ทางผ่าน pipeline เดียวกัน: NFC + ยุบช่องว่าง + ตัดชื่อซ้ำ
+# -----------------------------
+def roster_editor(title, names, key, text_key, update_key):
+    """-> ผลนำเข้า {"names", "departments", ...} เมื่อกดนำเข้า/อัปเดต ไม่งั้น None"""
+    result = None
+    up = st.file_uploader(f"📥 นำเข้า {title} (CSV / XLSX)", type=["csv", "xlsx"], key=f"{key}_file",
+                          help="คอลัมน์แรก = ชื่อ, คอลัมน์ที่สอง = แผนก (หรือมี header: ชื่อ / แผนก)")
+    if up is not None:
+        append = st.checkbox("ต่อท้ายรายชื่อเดิม", key=f"{key}_append")
+        if st.button(f"นำเข้า {up.name}", key=f"{key}_import", use_container_width=True):
+            bar = st.progress(0.0, text="กำลังอ่านไฟล์…")
+
+            def progress(rows):
+                bar.progress(min(1.0, up.tell() / max(1, up.size)), text=f"อ่านแล้ว {rows:,} แถว")
+
+            try:
+                result = import_roster(up, up.name, existing=names if append else (), on_chunk=progress)
+            except ValueError as e:
+                st.error(str(e))
+            bar.empty()
+
+    if st.toggle(f"✏️ แก้ {title} เป็นข้อความ", key=f"{key}_edit"):
+        text = st.text_area(f"{title} (ขึ้นบรรทัดใหม่)", value="\n".join(names), height=150, key=text_key)
+        if st.button(f"อัปเดต {title}", key=update_key, use_container_width=True):
+            result = parse_roster_text(text)
+
+    if result is not None:
+        dup = len(result["duplicates"])
+        st.success(f"{title}: {len(result['names']):,} คน" + (f" · ตัดชื่อซ้ำ {dup}" if dup else "") + " ✅")
+    return result
+
+
+def update_roster(key, result):
+    """ใช้ผลนำเข้ากับ party (ทางเดียวกับตอน replay) แล้วบันทึก event"""
+    data = {"key": key, "names": result["names"], "departments": result["departments"]}
+    with room_guard():
+        st.session_state.party.apply("roster", data)
+        log_event("roster", **data)
 
-tab1, tab2, tab3 = st.tabs(["1) วงล้อรางวัล", "2) วงล้อบทลงโทษ + เลือกผู้เล่น", "3) Buddy–Budder"])
+
+# -----------------------------
+# Verify fairness panel (Monte Carlo ผ่าน party_engine.fairness)
+# -----------------------------
+FAIRNESS_ALPHA = 0.001  # p-value ต่ำกว่านี้ถือว่าผิดปกติ
+
+
+def fairness_panel(key, verify):
+    """verify(spins, sequence, workers) -> report; ผลล่าสุดเก็บใน session_state[f"{key}_fair_report"]"""
+    with st.expander("🔍 Verify fairness (Monte Carlo)"):
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            spins = st.number_input("spins", min_value=10_000, max_value=10_000_000, value=200_000, step=50_000, key=f"{key}_fair_spins")
+        with c2:
+            sequence = st.number_input("หมุนติดกัน (ตัดออกทุกครั้ง)", min_value=1, max_value=20, value=1, step=1, key=f"{key}_fair_seq",
+                                       help="1 = หมุนครั้งเดียว, k = หมุนแล้วตัดออก k ครั้ง ตรวจผลครั้งสุดท้าย")
+        with c3:
+            workers = st.number_input("processes", min_value=1, max_value=os.cpu_count() or 1, value=1, step=1, key=f"{key}_fair_workers")
+
+        if st.button("ตรวจ", key=f"{key}_fair_btn", use_container_width=True):
+            try:
+                with st.spinner("กำลังสุ่ม…"), METRICS.span(f"fairness.{key}"):
+                    st.session_state[f"{key}_fair_report"] = verify(int(spins), int(sequence), int(workers))
+            except ValueError as e:
+                st.error(str(e))
+
+        report = st.session_state.get(f"{key}_fair_report")
+        if report:
+            ok = report["p_value"] >= FAIRNESS_ALPHA and not report.get("layout_errors")
+            msg = (f"{report['trials']:,} trials · chi² = {report['chi2']:.2f} (dof {report['dof']}) · "
+                   f"p = {report['p_value']:.4f} · {report['elapsed']:.2f}s")
+            (st.success if ok else st.error)(("✅ " if ok else "⚠️ ") + msg)
+            for err in report.get("layout_errors", ()):
+                st.warning(err)
+            st.table([
+                {"label": r["label"], "expected": f"{r['expected']:.5f}", "observed": f"{r['observed']:.5f}", "count": r["count"]}
+                for r in report["rows"]
+            ])
+
+
+# -----------------------------
+# Quick spin (แตะวงล้อ -> หมุนทันทีใน browser)
+# - สุ่มชุดผลล่วงหน้า (SpinCommit) ส่งไปกับ component; ผลตอบกลับมาทีหลังผ่าน component value
+# - settle ก่อนวาดอะไรในแท็บ: apply ผลที่หมุนไปแล้วตามลำดับใน commit (ไม่สุ่มใหม่)
+# - ชุดที่เลิกใช้ (หมด / state เปลี่ยน) log "spin_reveal" พร้อม salt ไว้ตรวจย้อนหลัง
+# -----------------------------
+def settle_quick(key, wheel_key):
+    """ผล quick spin ที่ browser ส่งกลับมา -> outcome ที่ต้อง apply เพิ่ม"""
+    batch = st.session_state.get(f"{key}_quick")
+    report = (st.session_state.get(wheel_key) or {}).get("quick")
+    if batch is None or not report or report.get("id") != batch.id:
+        return []  # ค่าเก่าของชุดก่อน ๆ
+    try:
+        outcomes = batch.settle(report)
+    except ValueError:
+        METRICS.incr(f"quick.rejected.{key}")
+        return []
+    METRICS.incr(f"quick.settled.{key}", len(outcomes))
+    return outcomes
+
+
+def retire_quick(key):
+    batch = st.session_state.pop(f"{key}_quick", None)
+    if batch is not None and batch.next:
+        log_event("spin_reveal", **batch.reveal())
+
+
+def quick_batch(key, version, make):
+    """ชุดที่ commit ไว้ของวงล้อ key; สร้างใหม่เมื่อยังไม่มี / ใช้หมด / layout หรือ state เปลี่ยน"""
+    batch = st.session_state.get(f"{key}_quick")
+    if batch is not None and (batch.exhausted or batch.version != version):
+        retire_quick(key)
+        batch = None
+    if batch is None:
+        with METRICS.span(f"quick.commit.{key}"):
+            batch = make()
+        st.session_state[f"{key}_quick"] = batch
+    return batch
+
+
+# -----------------------------
+# Partial reruns: แต่ละแท็บเป็น st.fragment
+# - กดปุ่ม/หมุนในแท็บไหน rerun แค่แท็บนั้น
+# - อะไรที่กระทบแท็บอื่น (รายชื่อผู้เล่น) -> st.rerun(scope="app")
+# - จับเวลาทุกรอบ: full app vs fragment (ดูได้ใน ?debug=1)
+# -----------------------------
+def record_timing(name, ms):
+    st.session_state.setdefault("rerun_ms", {})[name] = ms
+    METRICS.record(f"rerun.{name}", ms)
+
+
+def timing_caption(name):
+    if not DEBUG:
+        return
+    t = st.session_state.get("rerun_ms", {})
+    full = t.get("app")
+    if full is None:
+        st.caption(f"⏱ fragment {name}: {t.get(name, 0):.1f} ms")
+    else:
+        st.caption(f"⏱ fragment {name}: {t.get(name, 0):.1f} ms · full app rerun: {full:.1f} ms")
+
+
+def rerun_fragment():
+    """
+    rerun แค่ fragment ที่กำลังทำงาน; ถ้า handler ถูกเรียกระหว่าง full rerun (เช่นใน AppTest)
+    scope="fragment" ใช้ไม่ได้ -> rerun ทั้งแอป
+    """
+    st.rerun(scope="app" if st.session_state.get("full_rerun", True) else "fragment")
+
+
+def timed_fragment(name):
+    def deco(fn):
+        @st.fragment
+        @functools.wraps(fn)
+        def run():
+            if IS_HOST:
+                token = st.query_params.get("host")
+                if not ROOM.is_host(token):
+                    st.rerun(scope="app")  # มีคนรับเป็น host แทนแล้ว -> กลายเป็น viewer
+                ROOM.heartbeat(token)  # ใช้แต่ในแท็บ (fragment rerun) ก็ยังนับว่าออนไลน์
+            t0 = time.perf_counter()
+            try:
+                fn()
+            finally:
+                record_timing(name, (time.perf_counter() - t0) * 1000)
+            timing_caption(name)
+        return run
+    return deco
+
+
+# -----------------------------
+# Snapshot ทั้งปาร์ตี้ (.ptsnap): ย้ายไปเครื่องอื่น / เก็บ setup ไว้ใช้ซ้ำ
+# - download: encode ตอนกดเท่านั้น (data เป็น callable) ไม่ใช่ทุก rerun
+# - upload: decode ทีละ chunk -> แทน ss.party + เขียน snapshot ลง event log (refresh แล้วยังอยู่)
+# -----------------------------
+def restore_snapshot_file(f):
+    ss = st.session_state
+    with METRICS.span("snapfile.load"):
+        ss.party = load_party(party_config(), f)
+    event_log().scope(log_scope()).snapshot(ss.party.snapshot())
+    snapshot_counts()[log_scope()] = 0
+    METRICS.incr("snapfile.restored")
+    reset_party_ui()
+    if IS_HOST:
+        ROOM.replace_party(ss.party)
+
+
+def snapshot_sidebar():
+    with st.sidebar:
+        st.markdown("## 💾 Snapshot ปาร์ตี้")
+        party = st.session_state.party
+        st.download_button(
+            "ดาวน์โหลด snapshot",
+            lambda: dump_party(party),
+            file_name=time.strftime(f"party-%Y%m%d-%H%M%S{SNAPFILE_EXT}"),
+            mime="application/octet-stream",
+            key="snap_download",
+            use_container_width=True,
+        )
+        up = st.file_uploader("โหลด snapshot", type=[SNAPFILE_EXT.lstrip(".")], key="snap_upload")
+        if up is not None and st.button("กู้คืนจากไฟล์นี้ (แทนที่ของเดิมทั้งหมด)", key="snap_restore", use_container_width=True):
+            try:
+                restore_snapshot_file(up)
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                st.rerun()
 
 
 # -----------------------------
 # 1) Reward wheel (equal chance)
 # -----------------------------
-with tab1:
+@timed_fragment("reward")
+def reward_tab():
     st.subheader("1) วงล้อรางวัล (โอกาสเท่ากัน)")
 
+    reward = st.session_state.party.reward
+    settled = settle_quick("reward", "reward_wheel")
+    with room_guard():
+        for o in settled:
+            reward.apply_spin(o["ticket"], o["removed"])
+            st.session_state.reward_last_spin = 0  # หมุนเสร็จแล้วฝั่ง browser -> เฉลยได้เลย
+            log_event("reward_spin", ticket=o["ticket"], removed=o["removed"])
+    if settled:
+        room_publish("reward", st.session_state.reward_wheel_layout, [{"pos": o["pos"], "text": o["text"]} for o in settled],
+                     "ได้: " + ", ".join(o["text"] for o in settled))
     a, b = st.columns([2, 3])
 
     with a:
         n = st.number_input(
             "จำนวนรางวัล (1..N)",
-            min_value=1, max_value=999,
-            value=len(st.session_state.reward_pool) or 10,
+            min_value=1, max_value=1_000_000,
+            value=len(reward) or 10,
             step=1, key="reward_n"
         )
 
         if st.button("สร้าง/รีเซ็ตพูลรางวัล", use_container_width=True, key="reward_reset"):
-            st.session_state.reward_pool = list(range(1, int(n) + 1))
-            st.session_state.reward_last = None
-            st.session_state.reward_winner_index = None
-            st.session_state.reward_wheel_labels = None
+            with room_guard():
+                reward.reset(int(n))
+                st.session_state.reward_wheel_layout = None
+                log_event("reward_reset", n=int(n))
             st.success(f"สร้างพูลรางวัล 1..{n} แล้ว")
 
-        st.session_state.reward_remove_after = st.toggle(
+        reward.remove_after = st.toggle(
             "หมุนแล้วตัดออกจากพูล (ของจริง)",
-            value=st.session_state.reward_remove_after,
+            value=reward.remove_after,
             key="reward_remove_toggle"
         )
+        quick_on = st.toggle("⚡ แตะวงล้อเพื่อหมุนทันที", key="reward_quick_on",
+                             help="สุ่มผลไว้ล่วงหน้า (commit + sha256) วงล้อหมุนในเบราว์เซอร์ได้ทันทีไม่ต้องรอ server")
+
+        st.caption(f"เหลือในพูล: {len(reward)}")
+        st.code(reward.tickets.summary())
 
-        st.caption(f"เหลือในพูล: {len(st.session_state.reward_pool)}")
-        st.code(str(st.session_state.reward_pool))
+        if len(reward):
+            fairness_panel("reward", lambda spins, seq, workers: verify_reward(reward.tickets, spins, seq, workers=workers))
 
     with b:
-        pool = st.session_state.reward_pool[:]
+        pool = reward.tickets
+
+        # สร้างวงล้อใหม่เฉพาะตอนพูลเปลี่ยน (เช็ค version แทนการเทียบ set ทั้งพูล)
+        layout = st.session_state.reward_wheel_layout
+        if layout is None or layout["version"] != reward.version or layout["size"] != len(pool):
+            METRICS.incr("rebuild.reward_wheel")
+            with METRICS.span("build.reward_wheel"):
+                layout = build_reward_wheel(pool)
+            layout["version"] = reward.version
+            st.session_state.reward_wheel_layout = layout
+        room_publish("reward", layout)
+
+        winner_pos = None
+        if st.button("🎡 หมุนรางวัล", type="primary", key="reward_spin_btn"):
+            with room_guard():
+                rank, ticket = reward.spin()  # remove after -> layout สร้างใหม่รอบหน้าเพราะ version เปลี่ยน
+                if ticket is not None:
+                    st.session_state.reward_spin_id += 1
+                    st.session_state.reward_last_spin = st.session_state.reward_spin_id
+                    winner_pos = reward_winner_pos(layout, rank, ticket)
+                    log_event("reward_spin", ticket=ticket, removed=reward.remove_after)
+            if ticket is None:
+                st.warning("พูลรางวัลว่างแล้ว: สร้าง/รีเซ็ตพูลรางวัลก่อน")
+            else:
+                room_publish("reward", layout, [{"pos": winner_pos, "text": str(ticket)}], f"ได้: {ticket}")
 
-        # ทำ labels แบบคละ (1..10 ไม่เรียงติดกัน)
-        if st.session_state.reward_wheel_labels is None or set(st.session_state.reward_wheel_labels) != set(map(str, pool)):
-            labels = [str(x) for x in pool]
-            random.shuffle(labels)  # reward ไม่มี duplicate เลย shuffle ธรรมดาพอ
-            st.session_state.reward_wheel_labels = labels
+        quick = None
+        if quick_on:
+            batch = quick_batch("reward", (layout["id"], reward.version, reward.remove_after),
+                                lambda: commit_reward(reward, layout))
+            quick = batch.public(layout["id"]) if batch else None
+        else:
+            retire_quick("reward")
 
-        labels = st.session_state.reward_wheel_labels
+        shown = wheel_component(layout, winner_pos=winner_pos, spin_id=st.session_state.reward_spin_id, key="reward_wheel", height=560, quick=quick)
 
-        if st.button("🎡 หมุนรางวัล", type="primary", key="reward_spin_btn"):
-            if labels:
-                st.session_state.reward_winner_index = random.randrange(len(labels))
-            else:
-                st.session_state.reward_winner_index = None
+    if reward.last is not None:
+        # เฉลยหลังวงล้อหมุนเสร็จ (component ตอบ spin_id กลับมา)
+        last_spin = st.session_state.reward_last_spin
+        if winner_pos is not None or (shown.get("spin_id") or last_spin) < last_spin:
+            st.caption("กำลังหมุน…")
+        else:
+            st.markdown(f"**ล่าสุดได้:** {reward.last}")
+            history = st.session_state.party.history
+            recent = history.recent(REWARD_RECENT, "reward")
+            st.caption(f"หมุนไปแล้ว {history.count('reward'):,} ครั้ง · ล่าสุด: " + ", ".join(str(e["ticket"]) for e in recent))
 
-        winner_idx = st.session_state.reward_winner_index
-        wheel_component(labels, winner_index=winner_idx, key="reward_wheel", height=560)
 
-        if winner_idx is not None and 0 <= winner_idx < len(labels):
-            result = int(labels[winner_idx])
-            st.session_state.reward_last = result
+PUNISH_EDITOR_KEYS = ("pun_label_", "pun_sec_", "pun_w_")
 
-            if st.session_state.reward_remove_after:
-                # remove from pool by value
-                st.session_state.reward_pool = [x for x in st.session_state.reward_pool if x != result]
-                st.session_state.reward_winner_index = None
-                st.session_state.reward_wheel_labels = None  # rebuild after remove
 
-    if st.session_state.reward_last is not None:
-        st.markdown(f"**ล่าสุดได้:** {st.session_state.reward_last}")
+def punish_editor_rows(items):
+    return tuple((it["label"], int(it["seconds"]), int(it["weight"])) for it in items)
+
+
+def reset_punish_editor(items):
+    """
+    key ของ editor ผูกกับตำแหน่งแถว: รายการเปลี่ยนจากนอก editor (ตัดออกหลังหมุน / ลบ / กู้ snapshot)
+    -> ทิ้ง state ของทุกแถว ไม่งั้นค่าเก่าถูกเขียนทับแถวที่เลื่อนขึ้นมา
+    """
+    ss = st.session_state
+    if ss.get("punish_editor_rows") == punish_editor_rows(items):
+        return
+    for k in [k for k in ss if isinstance(k, str) and k.startswith(PUNISH_EDITOR_KEYS)]:
+        del ss[k]
+
+
+def punish_message(r):
+    msg = f"ผล: {r['player']} → ดื่ม {r['seconds']} วินาที"
+    if r["eel_points"] is not None:
+        msg += f" หรือ แทงปลาไหล {r['eel_points']}"
+    return msg
+
+
+# -----------------------------
+# หมุนทั้งรอบ: สุ่มให้ผู้เล่นหลายคนใน rerun เดียว (PunishmentWheel.spin_round)
+# - ผลทั้งรอบเป็น 1 event ("punish_round"); แอนิเมชันเล่นต่อกันฝั่ง browser (playlist)
+# - ตำแหน่งหยุดคิดจากวงล้อก่อนเริ่มรอบ (remove after: วงล้อจริงเปลี่ยนหลังจบรอบ)
+# -----------------------------
+def punish_round_panel(punish, wheel, players):
+    """-> playlist สำหรับ wheel_component ถ้ากดหมุนรอบนี้ (และเปิดแอนิเมชัน) ไม่งั้น None"""
+    playlist = None
+    with st.expander("🎲 หมุนทั้งรอบ (ทุกคนในครั้งเดียว)", expanded=bool(st.session_state.get("punish_round"))):
+        everyone = st.toggle(f"ทุกคน ({len(players):,} คน)", value=True, key="punish_round_all")
+        chosen = list(players) if everyone else st.multiselect("ผู้เล่น", players, key="punish_round_players")
+        play = st.toggle("เล่นแอนิเมชันทีละคนบนวงล้อ", value=True, key="punish_round_play")
+        if st.button(f"🎲 หมุนให้ {len(chosen):,} คน", key="punish_round_btn", use_container_width=True, disabled=not chosen):
+            with room_guard():
+                with METRICS.span("punish.round"):
+                    results = punish.spin_round(chosen)
+                log_event("punish_round", results=results)
+            st.session_state.punish_round = list(zip(chosen, results))
+            index = {s[0]: i for i, s in enumerate(wheel["segments"])}
+            items = [
+                {"pos": winner_pos_for(wheel, index[r["label"]]), "text": f"{r['player']} → {r['seconds']} วินาที"}
+                for r in results if r is not None
+            ]
+            room_publish("punish", wheel, items, f"หมุนทั้งรอบ {len(items):,} คน")
+            if play:
+                st.session_state.punish_spin_id += 1
+                playlist = {"id": st.session_state.punish_spin_id, "items": items}
+
+        done = st.session_state.get("punish_round")
+        if done:
+            st.dataframe(
+                [
+                    {"ผู้เล่น": r["player"], "บทลงโทษ": r["label"], "วินาที": r["seconds"],
+                     "ปลาไหล": r["eel_points"], "ตัดออก": r["removed"]} if r is not None else
+                    {"ผู้เล่น": p, "บทลงโทษ": "— (ไม่เหลือรายการ)", "วินาที": None, "ปลาไหล": None, "ตัดออก": False}
+                    for p, r in done
+                ],
+                hide_index=True,
+                use_container_width=True,
+            )
+    return playlist
+
+
+# -----------------------------
+# ตารางผลแบบแบ่งหน้า (render เฉพาะหน้าที่เห็น) + ดาวน์โหลด CSV / JSON
+# -----------------------------
+RESULTS_PAGE_SIZE = 25
+EXPORT_MIME = {"csv": "text/csv", "json": "application/json"}
+
+
+def page_bounds(total, key, page_size=RESULTS_PAGE_SIZE):
+    """ตัวเลือกหน้า -> (start, stop) ของแถวที่จะแสดง; หน้าเดียวไม่ต้องมีตัวเลือก"""
+    pages = max(1, math.ceil(total / page_size))
+    if pages == 1:
+        return 0, total
+    if st.session_state.get(key, 1) > pages:
+        st.session_state[key] = pages  # ข้อมูลลดลง (undo / reset) -> หน้าเดิมไม่มีแล้ว
+    page = st.number_input(f"หน้า (จาก {pages:,})", min_value=1, max_value=pages, step=1, key=key)
+    start = (page - 1) * page_size
+    return start, min(total, start + page_size)
+
+
+def export_buttons(party, what, key):
+    """ปุ่มดาวน์โหลด: สร้างไฟล์ตอนกดเท่านั้น (callable) ไม่สร้างทุก rerun"""
+    for col, fmt in zip(st.columns(len(EXPORT_FORMATS)), EXPORT_FORMATS):
+        with col:
+            st.download_button(
+                f"⬇️ {fmt.upper()}",
+                data=lambda fmt=fmt: b"".join(iter_export(party, what, fmt)),
+                file_name=f"party-{what}-{time.strftime('%Y%m%d')}.{fmt}",
+                mime=EXPORT_MIME[fmt],
+                key=f"{key}_{fmt}",
+                use_container_width=True,
+            )
+
+
+# -----------------------------
+# Leaderboard: ยอดสะสมอัปเดตทีละ event (party.history) -> แต่ละ rerun แค่ top-k ไม่ไล่ประวัติทั้งหมด
+# -----------------------------
+LEADERBOARD_TOP = 10
+REWARD_RECENT = 10
+LEADERBOARDS = (  # (หัวข้อ, attribute ของ History, หน่วย)
+    ("🍺 ดื่มรวม", "seconds", "วินาที"),
+    ("🐍 แทงปลาไหลรวม", "eel_points", "แต้ม"),
+    ("🎯 โดนบ่อยสุด", "punish_spins", "ครั้ง"),
+)
+
+
+def leaderboard_tops(history):
+    """-> [(หัวข้อ, หน่วย, [(ผู้เล่น, คะแนน)])] ของทุก board"""
+    return [(title, unit, getattr(history, attr).top(LEADERBOARD_TOP)) for title, attr, unit in LEADERBOARDS]
+
+
+def leaderboard_tables(tops):
+    for col, (title, unit, top) in zip(st.columns(len(tops)), tops):
+        with col:
+            st.markdown(f"**{title}**")
+            if top:
+                st.table([{"#": i + 1, "ผู้เล่น": k, unit: v} for i, (k, v) in enumerate(top)])
+            else:
+                st.caption("-")
+
+
+@METRICS.timed("leaderboard")
+def leaderboard_panel(history):
+    st.divider()
+    st.markdown("## 🏆 Leaderboard คืนนี้")
+    if not history.count("punish"):
+        st.caption("ยังไม่มีใครโดนบทลงโทษ")
+        return
+    with room_guard():  # top() แก้ heap ที่ viewer อ่านพร้อมกัน
+        tops = leaderboard_tops(history)
+    leaderboard_tables(tops)
+    total = history.count("punish")
+    with st.expander(f"ประวัติ (ทั้งหมด {total:,} ครั้ง ใหม่สุดก่อน)"):
+        start, stop = page_bounds(total, "history_page")
+        st.table([
+            {"#": total - i, "ผู้เล่น": e["player"], "บทลงโทษ": e["label"], "วินาที": e["seconds"], "ปลาไหล": e["eel_points"]}
+            for i, e in enumerate(history.recent(stop - start, "punish", offset=start), start)
+        ])
+        export_buttons(st.session_state.party, "history", "history_export")
 
 
 # -----------------------------
 # 2) Punishment wheel (weighted) + must pick player + MARK = 0s (display 0)
 # -----------------------------
-with tab2:
+@timed_fragment("punish")
+def punish_tab():
     st.subheader("2) วงล้อบทลงโทษ (ตั้งค่า weight ได้) + ต้องเลือกผู้เล่นก่อนหมุน")
 
+    party = st.session_state.party
+    punish = party.punish
+    settled = settle_quick("punish", "punish_wheel")
+    with room_guard():
+        for o in settled:
+            punish.apply_spin(o["result"])
+            st.session_state.punish_last_spin = 0
+            log_event("punish_spin", **o["result"])
+    if settled:
+        room_publish("punish", st.session_state.punish_wheel_layout, [{"pos": o["pos"], "text": o["text"]} for o in settled],
+                     punish_message(settled[-1]["result"]))
     left, right = st.columns([2, 3])
 
     with left:
         st.markdown("## 👤 เลือกผู้เล่น")
         st.session_state.selected_player = card_picker(
             title="Players",
-            items=st.session_state.buddy_list,
+            items=party.pairing.buddies,
             selected=st.session_state.selected_player,
             key_prefix="player"
         )
@@ -469,132 +879,166 @@ with tab2:
         st.divider()
         st.markdown("## ⚙️ ตั้งค่าบทลงโทษ (label / seconds / weight)")
 
-        items = st.session_state.punish_items
-
         with st.expander("➕ เพิ่มรายการใหม่"):
             nl = st.text_input("label", value="ดื่ม 10 วินาที", key="punish_new_label")
             ns = st.number_input("seconds", min_value=0, max_value=999, value=10, step=1, key="punish_new_seconds")
             nw = st.number_input("weight", min_value=0, max_value=999, value=1, step=1, key="punish_new_weight")
             if st.button("เพิ่ม", use_container_width=True, key="punish_add_btn"):
-                items.append({"label": nl, "seconds": int(ns), "weight": int(nw)})
-                st.session_state.punish_items = items
-                st.session_state.punish_wheel_labels = None
+                with room_guard():
+                    punish.add_item(nl, ns, nw)
+                    log_event("punish_config", items=punish.items)
                 st.success("เพิ่มแล้ว ✅")
 
-        for idx, it in enumerate(items):
-            c1, c2, c3, c4 = st.columns([3, 1, 1, 1])
-            with c1:
-                it["label"] = st.text_input("label", value=it["label"], key=f"pun_label_{idx}")
-            with c2:
-                it["seconds"] = int(st.number_input("sec", min_value=0, max_value=999, value=int(it["seconds"]), step=1, key=f"pun_sec_{idx}"))
-            with c3:
-                it["weight"] = int(st.number_input("w", min_value=0, max_value=999, value=int(it["weight"]), step=1, key=f"pun_w_{idx}"))
-            with c4:
-                if st.button("ลบ", key=f"pun_del_{idx}"):
-                    items.pop(idx)
-                    st.session_state.punish_items = items
-                    st.session_state.punish_wheel_labels = None
-                    st.rerun()
-
-        st.session_state.punish_items = items
-
-        st.session_state.punish_remove_after = st.toggle(
+        # แก้ทีละแถว -> copy-on-write แล้วอัปเดต sampler เฉพาะส่วนที่เปลี่ยน (O(log n))
+        with METRICS.span("punish.editor"):
+            # อ่าน punish.items หลังเพิ่มแถว (rerun นี้ต้องเห็นแถวใหม่); อาจเป็นค่า default ที่แชร์ -> วนบนสำเนา
+            reset_punish_editor(punish.items)
+            for idx, it in enumerate(list(punish.items)):
+                c1, c2, c3, c4 = st.columns([3, 1, 1, 1])
+                with c1:
+                    label = st.text_input("label", value=it["label"], key=f"pun_label_{idx}")
+                with c2:
+                    seconds = int(st.number_input("sec", min_value=0, max_value=999, value=int(it["seconds"]), step=1, key=f"pun_sec_{idx}"))
+                with c3:
+                    weight = int(st.number_input("w", min_value=0, max_value=999, value=int(it["weight"]), step=1, key=f"pun_w_{idx}"))
+                with room_guard():
+                    if punish.update_item(idx, label, seconds, weight):
+                        log_event("punish_config", items=punish.items)
+                with c4:
+                    if st.button("ลบ", key=f"pun_del_{idx}"):
+                        with room_guard():
+                            punish.delete_item(idx)
+                            log_event("punish_config", items=punish.items)
+                        rerun_fragment()
+            st.session_state.punish_editor_rows = punish_editor_rows(punish.items)
+
+        punish.remove_after = st.toggle(
             "หมุนแล้วตัดออกจากพูล (ถ้าต้องการ)",
-            value=st.session_state.punish_remove_after,
+            value=punish.remove_after,
             key="punish_remove_toggle",
             help="ตัดรายการที่ออกออกจาก config (ใน session นี้)"
         )
 
+        if punish.sampler.total > 0:
+            fairness_panel("punish", lambda spins, seq, workers: verify_punish(punish.sampler.items(), spins, seq, workers))
+
         st.divider()
         st.markdown("## ✍️ จัดการรายชื่อผู้เล่น")
-        player_text = st.text_area("รายชื่อผู้เล่น (ขึ้นบรรทัดใหม่)", value="\n".join(st.session_state.buddy_list), height=150, key="player_list_text")
-        if st.button("อัปเดตรายชื่อผู้เล่น", use_container_width=True, key="player_update_btn"):
-            st.session_state.buddy_list = [x.strip() for x in player_text.splitlines() if x.strip()]
-            if st.session_state.selected_player not in st.session_state.buddy_list:
+        st.caption(f"ผู้เล่น {len(party.pairing.buddies):,} คน")
+        result = roster_editor("รายชื่อผู้เล่น", party.pairing.buddies, "player_roster", "player_list_text", "player_update_btn")
+        if result is not None:
+            update_roster("buddy_list", result)
+            if st.session_state.selected_player not in party.pairing.buddies:
                 st.session_state.selected_player = None
-            st.success("อัปเดตแล้ว ✅")
+            st.rerun(scope="app")  # รายชื่อผู้เล่นใช้ในแท็บ 3 ด้วย
 
     with right:
         st.markdown("## 🎡 วงล้อบทลงโทษ")
 
         player = st.session_state.selected_player
-        if not player:
-            st.warning("ต้องเลือกผู้เล่นก่อน ถึงจะหมุนได้")
-        else:
-            is_mark = (player.strip().upper() == "MARK")
-            effective_items = [x for x in st.session_state.punish_items if int(x.get("weight", 0)) > 0]
+        sampler = punish.sampler
 
-            if not effective_items:
-                st.warning("ยังไม่มีรายการที่ weight > 0")
+        if sampler.total <= 0:
+            st.warning("ยังไม่มีรายการที่ weight > 0")
+        else:
+            # วงล้อแบบ weighted: 1 segment ต่อ label, แบ่งแถบคละไม่ให้ติดกัน
+            # สร้างใหม่เฉพาะตอน sampler เปลี่ยน (เพิ่ม/ลบ/แก้ weight)
+            layout = st.session_state.punish_wheel_layout
+            if layout is None or layout["version"] != punish.version:
+                METRICS.incr("rebuild.punish_wheel")
+                with METRICS.span("build.punish_wheel"):
+                    layout = build_weighted_wheel(sampler.items())
+                layout["version"] = punish.version
+                st.session_state.punish_wheel_layout = layout
+            room_publish("punish", layout)
+
+            wheel = layout
+            segments = wheel["segments"]
+
+            quick = None
+            winner_pos = None
+            if not player:
+                st.warning("ต้องเลือกผู้เล่นก่อน ถึงจะหมุนได้ (หรือหมุนทั้งรอบด้านล่าง)")
+                retire_quick("punish")
             else:
-                # สร้าง wheel_labels แบบคละ (ไม่ให้ label เดิมติดกัน)
-                if st.session_state.punish_wheel_labels is None:
-                    st.session_state.punish_wheel_labels = expand_weighted_labels(effective_items)
-
-                wheel_labels = st.session_state.punish_wheel_labels
-
                 st.caption(f"ผู้เล่น: **{player}**")
+                if st.toggle("⚡ แตะวงล้อเพื่อหมุนทันที", key="punish_quick_on",
+                             help="สุ่มผลไว้ล่วงหน้า (commit + sha256) วงล้อหมุนในเบราว์เซอร์ได้ทันทีไม่ต้องรอ server"):
+                    batch = quick_batch("punish", (wheel["id"], punish.version, player, punish.remove_after),
+                                        lambda: commit_punish(punish, wheel, player))
+                    quick = batch.public(wheel["id"]) if batch else None
+                else:
+                    retire_quick("punish")
                 if st.button("🎯 เลือกผลบทลงโทษ (แล้วให้วงล้อหมุนไปหยุด)", type="primary", key="punish_spin_py"):
-                    if wheel_labels:
-                        st.session_state.punish_winner_index = random.randrange(len(wheel_labels))
+                    # MARK = 0 วินาที / remove after (ไม่ตัดตอน Mark) อยู่ใน punish.spin
+                    # remove -> layout สร้างใหม่รอบหน้าเพราะ version เปลี่ยน
+                    with room_guard():
+                        version, weights = punish.version, sampler.items()
+                        result = punish.spin(player)
+                        seg_idx = next((i for i, s in enumerate(segments) if s[0] == result["label"]), None)
+                        if seg_idx is None:
+                            # layout ไม่ตรงกับ sampler -> สร้างใหม่จากรายการก่อนหมุน (ยังมี label ที่ออก)
+                            METRICS.incr("rebuild.punish_wheel")
+                            wheel = build_weighted_wheel(weights)
+                            wheel["version"] = version
+                            st.session_state.punish_wheel_layout = wheel
+                            segments = wheel["segments"]
+                            seg_idx = next(i for i, s in enumerate(segments) if s[0] == result["label"])
+                        winner_pos = winner_pos_for(wheel, seg_idx)
+                        st.session_state.punish_spin_id += 1
+                        st.session_state.punish_last_spin = st.session_state.punish_spin_id
+                        log_event("punish_spin", **result)
+                    room_publish("punish", wheel, [{"pos": winner_pos, "text": result["label"]}], punish_message(result))
+
+            # วงล้อ + เฉลยอยู่เหนือ panel หมุนทั้งรอบ แต่ต้องรู้ playlist ของรอบก่อน render
+            wheel_slot = st.container()
+            result_slot = st.container()
+            playlist = punish_round_panel(punish, wheel, party.pairing.buddies)
+            if playlist is not None:
+                quick = None
+                retire_quick("punish")  # ชุดที่ commit ไว้สุ่มจากพูลก่อนรอบนี้
+
+            with wheel_slot:
+                shown = wheel_component(wheel, winner_pos=winner_pos, spin_id=st.session_state.punish_spin_id, key="punish_wheel",
+                                        height=560, quick=quick, playlist=playlist)
+
+            last = punish.last
+            if player and last is not None and last["player"] == player and playlist is None:
+                # เฉลยหลังวงล้อหมุนเสร็จ (component ตอบ spin_id กลับมา)
+                last_spin = st.session_state.punish_last_spin
+                with result_slot:
+                    if winner_pos is not None or (shown.get("spin_id") or last_spin) < last_spin:
+                        st.caption("กำลังหมุน…")
                     else:
-                        st.session_state.punish_winner_index = None
-
-                winner_idx = st.session_state.punish_winner_index
-                wheel_component(wheel_labels, winner_index=winner_idx, key="punish_wheel", height=560)
-
-                if winner_idx is not None and 0 <= winner_idx < len(wheel_labels):
-                    label = wheel_labels[winner_idx]
-                    chosen = next((x for x in effective_items if x["label"] == label), {"label": label, "seconds": 0, "weight": 1})
-
-                    eel_points = parse_eel_points(chosen.get("label", ""))
-
-                    # ถ้าเป็นกติกา "MARK = 0 เสมอ" (แบบเปิดเผย) ก็ใช้บรรทัดนี้ต่อได้
-                    seconds_to_show = 0 if is_mark else int(chosen.get("seconds", 0))
-                    
-                    st.session_state.punish_last = {
-                        "player": player,
-                        "label": chosen.get("label"),
-                        "seconds": seconds_to_show,
-                        "eel_points": eel_points,
-                    }
-
-                    msg = f"ผล: {player} → ดื่ม {seconds_to_show} วินาที"
-                    if eel_points is not None:
-                        msg += f" หรือ แทงปลาไหล {eel_points}"
-                    st.success(msg)
-
-                    # remove after (ไม่ให้ตัดตอน Mark)
-                    if st.session_state.punish_remove_after and not is_mark:
-                        st.session_state.punish_items = [x for x in st.session_state.punish_items if x["label"] != chosen["label"]]
-                        st.session_state.punish_winner_index = None
-                        st.session_state.punish_wheel_labels = None  # rebuild after remove
-                        st.info("ตัดรายการนี้ออกจากพูลชั่วคราวแล้ว (session นี้)")
+                        st.success(punish_message(last))
+                        if last["removed"]:
+                            st.info("ตัดรายการนี้ออกจากพูลชั่วคราวแล้ว (session นี้)")
 
-        # if st.session_state.punish_last:
-        #     st.divider()
-        #     st.markdown("### ล่าสุดได้")
-        #     st.write(st.session_state.punish_last)
+    leaderboard_panel(party.history)
 
 
 # -----------------------------
 # 3) Buddy–Budder pairing (1-1; remove budder)
 # -----------------------------
-with tab3:
+@timed_fragment("pairing")
+def pairing_tab():
     st.subheader("3) Buddy–Budder")
 
+    pairing = st.session_state.party.pairing
+
     topL, topR = st.columns([1, 1])
     with topL:
-        buddy_text = st.text_area("Buddy list (ขึ้นบรรทัดใหม่)", value="\n".join(st.session_state.buddy_list), height=150, key="bb_buddy_text")
-        if st.button("อัปเดต Buddy", key="bb_buddy_update", use_container_width=True):
-            st.session_state.buddy_list = [x.strip() for x in buddy_text.splitlines() if x.strip()]
-            st.success("อัปเดตแล้ว ✅")
+        st.caption(f"Buddy {len(pairing.buddies):,} คน")
+        result = roster_editor("Buddy", pairing.buddies, "bb_buddy_roster", "bb_buddy_text", "bb_buddy_update")
+        if result is not None:
+            update_roster("buddy_list", result)
+            st.rerun(scope="app")  # รายชื่อผู้เล่นใช้ในแท็บ 2 ด้วย
 
     with topR:
-        budder_text = st.text_area("Budder list (ขึ้นบรรทัดใหม่)", value="\n".join(st.session_state.budder_list), height=150, key="bb_budder_text")
-        if st.button("อัปเดต Budder", key="bb_budder_update", use_container_width=True):
-            st.session_state.budder_list = [x.strip() for x in budder_text.splitlines() if x.strip()]
-            st.success("อัปเดตแล้ว ✅")
+        st.caption(f"Budder เหลือ {len(pairing.budders):,} คน")
+        result = roster_editor("Budder", pairing.budders, "bb_budder_roster", "bb_budder_text", "bb_budder_update")
+        if result is not None:
+            update_roster("budder_list", result)
 
     st.divider()
 
@@ -604,7 +1048,7 @@ with tab3:
         st.markdown("### 👈 เลือก Buddy")
         st.session_state.selected_buddy = card_picker(
             title="Buddy",
-            items=st.session_state.buddy_list,
+            items=pairing.buddies,
             selected=st.session_state.selected_buddy,
             key_prefix="bb_buddy"
         )
@@ -613,7 +1057,7 @@ with tab3:
         st.markdown("### Budder 👉")
         st.session_state.selected_budder = card_picker(
             title="Budder",
-            items=st.session_state.budder_list,
+            items=pairing.budders,
             selected=st.session_state.selected_budder,
             key_prefix="bb_budder"
         )
@@ -626,7 +1070,7 @@ with tab3:
         st.write("Buddy:", f"**{buddy or '-'}**")
         st.write("Budder:", f"**{budder or '-'}**")
 
-        used_buddies = set(p["buddy"] for p in st.session_state.pairs)
+        used_buddies = pairing.used_buddies()
         if buddy and buddy in used_buddies:
             st.warning("Buddy คนนี้ถูกจับคู่ไปแล้ว")
 
@@ -635,32 +1079,272 @@ with tab3:
                 if st.session_state.confirm_step != (buddy, budder):
                     st.session_state.confirm_step = (buddy, budder)
                     st.warning("กดยืนยันอีกครั้งเพื่อ Confirm (กันพลาด)")
-                    st.stop()
                 else:
                     st.session_state.confirm_step = None
 
-                st.session_state.pairs.append({
-                    "buddy": buddy,
-                    "budder": budder,
-                    "ts": time.strftime("%Y-%m-%d %H:%M:%S")
-                })
-                st.session_state.budder_list = [x for x in st.session_state.budder_list if x != budder]
-                st.success(f"จับคู่แล้ว ✅ {buddy} ↔ {budder}")
-                st.session_state.selected_budder = None
+                    with room_guard():
+                        pair = pairing.pair(buddy, budder)
+                        log_event("pair", **pair)
+                    st.success(f"จับคู่แล้ว ✅ {buddy} ↔ {budder}")
+                    st.session_state.selected_budder = None
         else:
             st.info("เลือกทั้ง 2 ฝั่งก่อน")
 
         st.divider()
         if st.button("รีเซ็ตคู่ทั้งหมด (ไม่รีเซ็ต list)", key="bb_reset_pairs", use_container_width=True):
-            st.session_state.pairs = []
-            st.session_state.confirm_step = None
-            st.success("ล้างคู่แล้ว ✅")
+            with room_guard():
+                pairing.reset()
+                st.session_state.confirm_step = None
+                log_event("pairs_reset")
+            st.success("ล้างคู่แล้ว ✅ (กด Undo เพื่อเอาคืนได้)")
+
+        u1, u2 = st.columns(2)
+        with u1:
+            if st.button("↩️ Undo", key="bb_undo", use_container_width=True, disabled=not pairing.can_undo()):
+                with room_guard():
+                    pairing.undo()
+                    st.session_state.confirm_step = None
+                    log_event("pair_undo")
+                rerun_fragment()
+        with u2:
+            if st.button("↪️ Redo", key="bb_redo", use_container_width=True, disabled=not pairing.can_redo()):
+                with room_guard():
+                    pairing.redo()
+                    st.session_state.confirm_step = None
+                    log_event("pair_redo")
+                rerun_fragment()
+
+        # จับคู่ที่เหลือทั้งหมดในครั้งเดียว (คู่เดิมคงไว้)
+        st.divider()
+        no_same_dept = st.checkbox("ห้ามจับแผนกเดียวกัน", key="bb_auto_no_same_dept",
+                                   help="แผนกจากไฟล์ที่นำเข้า หรือคำท้ายชื่อ เช่น \"แจน PH\"")
+        can_auto = bool(pairing.budders) and len(pairing.used_buddies()) < len(pairing.buddies)
+        if st.button("🤝 จับคู่ที่เหลือทั้งหมด", key="bb_auto_pair", use_container_width=True, disabled=not can_auto):
+            if st.session_state.confirm_step != "auto":
+                st.session_state.confirm_step = "auto"
+                st.warning("กดอีกครั้งเพื่อ Confirm จับคู่อัตโนมัติ")
+            else:
+                st.session_state.confirm_step = None
+                with room_guard():
+                    with METRICS.span("pairing.auto_pair"):
+                        pairs, unmatched = pairing.auto_pair(no_same_dept)
+                    if pairs:
+                        log_event("pair_batch", pairs=pairs)
+                st.session_state.selected_buddy = None
+                st.session_state.selected_budder = None
+                st.success(f"จับคู่อัตโนมัติ {len(pairs)} คู่ ✅")
+                if unmatched:
+                    more = f" … (+{len(unmatched) - 10})" if len(unmatched) > 10 else ""
+                    st.warning(f"จับคู่ไม่ได้ {len(unmatched)} คน: " + ", ".join(unmatched[:10]) + more)
 
     st.divider()
     st.markdown("### 📌 ผลการจับคู่")
-    if st.session_state.pairs:
-        st.table(st.session_state.pairs)
+    if pairing.pairs:
+        start, stop = page_bounds(len(pairing.pairs), "pairs_page")
+        st.table([{"#": i + 1, **p} for i, p in enumerate(pairing.pairs[start:stop], start)])
+        export_buttons(st.session_state.party, "pairs", "pairs_export")
     else:
         st.info("ยังไม่มีคู่")
 
-    st.caption(f"Budder เหลือในพูล: {len(st.session_state.budder_list)} คน")
+    st.caption(f"Budder เหลือในพูล: {len(pairing.budders)} คน")
+
+
+# -----------------------------
+# Shared room: sidebar (เปิด / รับ host / ออก) + หน้า viewer
+# - viewer ไม่สุ่ม ไม่สร้าง layout เอง: วงล้อหมุนตามผลที่ host publish (seq ใหม่ = หมุน)
+# - เข้าห้องกลางทาง -> ไม่เล่นผลเก่าซ้ำ
+# -----------------------------
+def room_sidebar():
+    with st.sidebar:
+        st.markdown("## 📺 ห้อง (หลายจอ)")
+        if ROOM is None:
+            folded = st.session_state.pop("room_folded", None)
+            if folded:
+                st.info(f"ห้อง {folded} ปิดไปแล้ว (server restart) · ผลของห้องย้ายมาเป็น party ของคุณแล้ว")
+            elif st.query_params.get("room"):
+                st.warning("ไม่พบห้องนี้ (ปิดไปแล้ว หรือ server restart)")
+            code = st.text_input("รหัสห้อง (เว้นว่าง = สุ่ม)", key="room_code", placeholder="เช่น newyear")
+            if st.button("เปิดห้อง (เป็น host)", key="room_open", use_container_width=True):
+                party = st.session_state.party
+                try:
+                    room = rooms().open(party, code.strip() or None)
+                except ValueError as e:
+                    st.error(str(e))
+                else:
+                    # ห้องเริ่มจาก party ของ host: event ต่อจากนี้ลง scope ของห้อง
+                    event_log().scope(room_scope(room.code)).snapshot(party.snapshot())
+                    snapshot_counts()[room_scope(room.code)] = 0
+                    token = secrets.token_urlsafe(12)
+                    room.claim(token)
+                    st.query_params.update(room=room.code, host=token)
+                    st.rerun()
+            return
+
+        online = ROOM.host_online()
+        st.caption(f"ห้อง **{ROOM.code}** · {'🎙 คุณเป็น host' if IS_HOST else '👀 ดูอย่างเดียว'}"
+                   + ("" if IS_HOST or online else " · host ไม่ออนไลน์"))
+        st.code(f"?room={ROOM.code}", language=None)  # ต่อท้าย URL ของแอปให้จออื่นเปิดดู
+        if IS_HOST:
+            if st.button("ปิดห้อง", key="room_close", use_container_width=True):
+                rooms().close(ROOM.code)
+                # host เก็บผลของห้องไว้เป็น party ตัวเอง (viewer ออกแล้วกลับไปใช้ party เดิมของตัวเอง)
+                pid = st.session_state.party_id
+                with ROOM.lock:
+                    event_log().scope(pid).snapshot(ROOM.party.snapshot())
+                snapshot_counts()[pid] = 0
+                st.query_params.pop("room", None)
+                st.query_params.pop("host", None)
+                st.rerun()
+            return
+        if not online and st.button("รับเป็น host", key="room_claim", use_container_width=True):
+            token = secrets.token_urlsafe(12)
+            if ROOM.claim(token):
+                st.query_params["host"] = token
+                st.rerun()
+        if st.button("ออกจากห้อง", key="room_leave", use_container_width=True):
+            st.query_params.pop("room", None)
+            st.rerun()
+
+
+def room_view(party):
+    """ข้อมูลที่ viewer แสดง (Room.view สร้างครั้งเดียวต่อ version แชร์ทุกจอ)"""
+    history = party.history
+    return {
+        "reward_left": len(party.reward),
+        "reward_recent": [e["ticket"] for e in history.recent(REWARD_RECENT, "reward")],
+        "punish_total": history.count("punish"),
+        "leaderboards": leaderboard_tops(history),
+        "pairs": party.pairing.pairs[:-ROOM_RECENT_PAIRS - 1:-1],
+        "pairs_total": len(party.pairing.pairs),
+    }
+
+
+def room_wheel(kind, w):
+    """วงล้อของ host บนจอนี้: seq ที่ยังไม่เคยส่ง -> หมุนตาม (หลายผล = playlist)"""
+    if w is None:
+        st.caption("รอ host เปิดวงล้อนี้…")
+        return
+    ss = st.session_state
+    key = f"room_{kind}_wheel"
+    spin = w["spin"]
+    seq = spin["seq"] if spin else 0
+    joined = ss.setdefault(f"{key}_joined", seq)
+    layout, winner_pos, playlist = w["layout"], None, None
+    if seq > ss.get(f"{key}_sent", joined):
+        ss[f"{key}_sent"] = seq
+        layout = spin["layout"]  # ตำแหน่งหยุดอิง layout ตอนหมุน (remove after -> layout ใหม่มาทีหลัง)
+        if len(spin["items"]) == 1:
+            winner_pos = spin["items"][0]["pos"]
+        else:
+            playlist = {"id": seq, "items": spin["items"]}
+    shown = wheel_component(layout, winner_pos=winner_pos, spin_id=seq, key=key, height=ROOM_WHEEL_HEIGHT, playlist=playlist)
+    if spin and spin["message"]:
+        done = seq <= joined or seq in (shown.get("spin_id"), shown.get("playlist"))
+        st.markdown(f"**{spin['message']}**" if done else "กำลังหมุน…")
+
+
+@st.fragment(run_every=ROOM_POLL_S)
+def room_viewer():
+    if rooms().get(ROOM.code) is not ROOM:
+        st.rerun(scope="app")  # ห้องถูกปิด
+    METRICS.incr("room.poll")
+    with METRICS.span("room.view"):
+        view = ROOM.view(room_view)
+
+    for col, (kind, title) in zip(st.columns(2), (("reward", "🎁 วงล้อรางวัล"), ("punish", "🎯 วงล้อบทลงโทษ"))):
+        with col:
+            st.markdown(f"### {title}")
+            room_wheel(kind, view["wheels"].get(kind))
+
+    st.caption(f"รางวัลเหลือ {view['reward_left']:,} · ล่าสุด: " + (", ".join(map(str, view["reward_recent"])) or "-"))
+    if view["punish_total"]:
+        st.markdown("## 🏆 Leaderboard คืนนี้")
+        leaderboard_tables(view["leaderboards"])
+    if view["pairs"]:
+        st.markdown(f"### 📌 คู่ล่าสุด (ทั้งหมด {view['pairs_total']:,} คู่)")
+        st.table(view["pairs"])
+
+
+room_sidebar()
+
+st.title("🎡 Party Tools (Graphic Wheels + Buddy Picker)")
+
+if ROOM is not None and not IS_HOST:
+    room_viewer()
+    st.stop()
+
+snapshot_sidebar()
+
+tab1, tab2, tab3 = st.tabs(["1) วงล้อรางวัล", "2) วงล้อบทลงโทษ + เลือกผู้เล่น", "3) Buddy–Budder"])
+
+with tab1:
+    reward_tab()
+
+with tab2:
+    punish_tab()
+
+with tab3:
+    pairing_tab()
+
+st.session_state.full_rerun = False
+record_timing("app", (time.perf_counter() - _RUN_T0) * 1000)
+
+
+# -----------------------------
+# Debug sidebar (?debug=1): เวลาแต่ละส่วน, counter, payload, cProfile
+# -----------------------------
+def save_profile(profiler):
+    """เก็บผล cProfile: ข้อความ top 30 (cumulative) + ไฟล์ .prof ใน data/profiles"""
+    profiler.disable()
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, time.strftime("rerun-%Y%m%d-%H%M%S.prof"))
+    profiler.dump_stats(path)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).strip_dirs().sort_stats("cumulative").print_stats(30)
+    st.session_state.profile_report = {"path": path, "text": out.getvalue()}
+
+
+def debug_sidebar():
+    snap = METRICS.snapshot()
+    with st.sidebar:
+        st.markdown("## 🛠 Debug")
+        t = st.session_state.get("rerun_ms", {})
+        st.caption(" · ".join(f"{k} {v:.1f} ms" for k, v in t.items()))
+
+        st.markdown("### ⏱ Spans")
+        spans = sorted(snap["spans"].items(), key=lambda kv: -kv[1]["total_ms"])
+        st.table([
+            {"span": k, "n": v["count"], "avg": f"{v['avg_ms']:.2f}", "p95": f"{v['p95_ms']:.2f}", "max": f"{v['max_ms']:.1f}"}
+            for k, v in spans
+        ])
+        st.markdown("### 🔢 Counters")
+        st.table([{"counter": k, "value": v} for k, v in sorted(snap["counters"].items())])
+        if snap["gauges"]:
+            st.table([{"gauge": k, "value": v} for k, v in sorted(snap["gauges"].items())])
+
+        if st.button("📸 Profile rerun ถัดไป (cProfile)", key="debug_profile", use_container_width=True):
+            st.session_state.profile_next = True
+            st.rerun()
+        report = st.session_state.get("profile_report")
+        if report:
+            with st.expander(f"cProfile: {os.path.basename(report['path'])}"):
+                st.code(report["text"])
+                with open(report["path"], "rb") as f:
+                    st.download_button("ดาวน์โหลด .prof", f.read(), file_name=os.path.basename(report["path"]), key="debug_profile_dl")
+
+        c1, c2 = st.columns(2)
+        with c1:
+            st.download_button("metrics.json", json.dumps(snap, ensure_ascii=False, indent=1), file_name="metrics.json",
+                               mime="application/json", key="debug_metrics_dl", use_container_width=True)
+        with c2:
+            if st.button("ล้าง metrics", key="debug_metrics_reset", use_container_width=True):
+                METRICS.reset()
+        st.caption(f"export อัตโนมัติทุก {METRICS_EXPORT_EVERY}s -> {os.path.relpath(METRICS_PATH, APP_DIR)}")
+
+
+if _PROFILER:
+    save_profile(_PROFILER)
+
+if DEBUG:
+    METRICS.maybe_export(METRICS_PATH, METRICS_EXPORT_EVERY)
+    debug_sidebar()
@@ -0,0 +1,291 @@
+"""
+Micro-benchmarks ของ hot path ใน party_engine (ไม่ใช้ Streamlit / pytest)
+
+    python benchmarks/bench.py                              # รันทั้งหมด พิมพ์ตาราง
+    python benchmarks/bench.py --save benchmarks/baseline.json
+    python benchmarks/bench.py --compare benchmarks/baseline.json   # exit 1 ถ้าช้าลงเกิน threshold
+    python benchmarks/bench.py -k pool --sizes 10,1000
+
+ขนาด 10..100k และ skew ของ weight: flat / dominant (label เดียวเกินครึ่ง) / zipf
+ผลเป็นเวลาต่อ 1 ครั้ง (median + min ของหลายรอบ) บันทึกเป็น JSON; --compare เทียบด้วย min
+"""
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from party_engine import (  # noqa: E402
+    PairingSession,
+    TicketPool,
+    WeightedSampler,
+    build_weighted_wheel,
+    expand_weighted_labels,
+    parse_eel_points,
+    shuffle_avoid_adjacent_same,
+)
+
+SIZES = (10, 100, 1_000, 10_000, 100_000)
+SKEWS = ("flat", "dominant", "zipf")
+PICKER_PAGE = 24  # card_picker ของแอป: อ่าน budder ที่เหลือทีละหน้า
+
+
+# -----------------------------
+# Inputs
+# -----------------------------
+def label_counts(n, skew):
+    """{label: จำนวน} รวม ~n ชิ้น; จำนวน label ~ sqrt(n)"""
+    k = max(2, int(n ** 0.5))
+    if skew == "flat":
+        raw = [1.0] * k
+    elif skew == "dominant":
+        raw = [k * 1.5] + [1.0] * (k - 1)  # label แรก ~60% -> เรียงแบบไม่ติดกันไม่ได้
+    else:
+        raw = [1.0 / (i + 1) for i in range(k)]
+    scale = n / sum(raw)
+    return {f"ดื่ม {i} วินาที หรือ แทงปลาไหล {10 * i}": max(1, round(w * scale)) for i, w in enumerate(raw)}
+
+
+def label_weights(n, skew):
+    """[(label, weight)] n label สำหรับ sampler / วงล้อ"""
+    if skew == "flat":
+        ws = [1] * n
+    elif skew == "dominant":
+        ws = [n] + [1] * (n - 1)
+    else:
+        ws = [max(1, 1_000_000 // (i + 1)) for i in range(n)]
+    return [(f"item {i}", w) for i, w in enumerate(ws)]
+
+
+def names(n, prefix):
+    return [f"{prefix} {i:06d}" for i in range(n)]
+
+
+# -----------------------------
+# Cases: setup(n, skew) -> fn; fn ถูกเรียกซ้ำ `number` ครั้งบน state เดียวกัน
+# state สร้างใหม่ทุกรอบ (ไม่นับเวลา) -> ของที่ mutate (remove / pair) ก็วัดได้
+# -----------------------------
+def case_shuffle(n, skew):
+    items = [label for label, c in label_counts(n, skew).items() for _ in range(c)]
+    random.shuffle(items)
+    return lambda: shuffle_avoid_adjacent_same(items)
+
+
+def case_expand(n, skew):
+    punish_items = [{"label": label, "seconds": 1, "weight": c} for label, c in label_counts(n, skew).items()]
+    return lambda: expand_weighted_labels(punish_items)
+
+
+def case_wheel(n, skew):
+    weights = label_weights(n, skew)
+    return lambda: build_weighted_wheel(weights)
+
+
+def case_sampler_draw(n, skew):
+    sampler = WeightedSampler(label_weights(n, skew))
+    return sampler.draw
+
+
+def case_sampler_set(n, skew):
+    sampler = WeightedSampler(label_weights(n, skew))
+    keys = [k for k, _ in sampler.items()]
+    return lambda: sampler.set(random.choice(keys), random.randrange(1, 100))
+
+
+def case_parse_eel(n, skew):
+    labels = list(label_counts(n, "flat")) + ["ดื่ม 5 วินาที", "", "แทงปลาไหล"]
+    labels = (labels * (n // len(labels) + 1))[:n]
+    return lambda: [parse_eel_points(x) for x in labels]
+
+
+def case_pool_remove(n, skew):
+    pool = TicketPool(n)
+    if skew == "fragmented":
+        for t in range(1, n + 1, 2):
+            pool.remove(t)
+    order = [t for a, b in pool.ranges() for t in range(a, b + 1)]
+    random.shuffle(order)
+    it = iter(order)
+    return lambda: pool.remove(next(it))
+
+
+def case_pool_draw(n, skew):
+    pool = TicketPool(n)
+    if skew == "fragmented":
+        for t in range(1, n + 1, 2):
+            pool.remove(t)
+    return pool.draw
+
+
+def read_page(left, page):
+    """สิ่งที่ UI อ่านจาก budder ที่เหลือทุก rerun: จำนวน + ชื่อ 1 หน้าของ picker"""
+    return len(left), left[page * PICKER_PAGE:(page + 1) * PICKER_PAGE]
+
+
+def case_budder_page(n, skew):
+    s = PairingSession(names(n, "buddy"), names(n, "budder"))
+    budders = list(s.budders)
+    random.shuffle(budders)
+    for a, b in zip(s.buddies[:n // 2], budders):
+        s.pair(a, b, ts="")
+    pages = max(1, len(s.budders) // PICKER_PAGE)
+    return lambda: read_page(s.budders, random.randrange(pages))
+
+
+def case_pair(n, skew):
+    # จับคู่แล้วอ่านพูลที่เหลือ (rerun ถัดไปของ UI) -> วัดการอัปเดต index ต่อคู่ด้วย
+    s = PairingSession(names(n, "buddy"), names(n, "budder"))
+    budders = list(s.budders)
+    random.shuffle(budders)
+    it = iter(zip(s.buddies, budders))
+
+    def run():
+        buddy, budder = next(it)
+        s.pair(buddy, budder, ts="")
+        return read_page(s.budders, 0)
+    return run
+
+
+def case_undo_redo(n, skew):
+    s = PairingSession(names(n, "buddy"), names(n, "budder"))
+    for a, b in zip(s.buddies[:n // 2], s.budders[:n // 2]):
+        s.pair(a, b, ts="")
+
+    def run():
+        s.undo()
+        read_page(s.budders, 0)
+        s.redo()
+        return read_page(s.budders, 0)
+    return run
+
+
+# name -> (setup, skews, จำนวนครั้งสูงสุดต่อรอบเป็นสัดส่วนของ n (None = ไม่จำกัด; case ที่ mutate state))
+CASES = {
+    "arrange.shuffle_avoid_adjacent_same": (case_shuffle, SKEWS, None),
+    "arrange.expand_weighted_labels": (case_expand, SKEWS, None),
+    "wheel.build_weighted_wheel": (case_wheel, SKEWS, None),
+    "sampler.draw": (case_sampler_draw, SKEWS, None),
+    "sampler.set": (case_sampler_set, SKEWS, None),
+    "party.parse_eel_points": (case_parse_eel, ("mixed",), None),
+    "pool.remove": (case_pool_remove, ("fresh", "fragmented"), 0.5),
+    "pool.draw": (case_pool_draw, ("fresh", "fragmented"), None),
+    "pairing.budder_page": (case_budder_page, ("full",), None),
+    "pairing.pair": (case_pair, ("full",), 0.5),
+    "pairing.undo_redo": (case_undo_redo, ("full",), None),
+}
+
+
+# -----------------------------
+# Runner
+# -----------------------------
+def measure(setup, n, skew, max_frac, min_time, repeats):
+    """-> {"median_s", "min_s", "number", "repeats"} เวลาต่อ 1 ครั้ง"""
+    cap = max(1, int(n * max_frac)) if max_frac else 1_000_000
+
+    def batch(number):
+        fn = setup(n, skew)
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        return time.perf_counter() - t0
+
+    number = 1
+    while number < cap:
+        if batch(number) >= min_time:
+            break
+        number = min(cap, number * 10)
+    times = [batch(number) / number for _ in range(repeats)]
+    return {"median_s": statistics.median(times), "min_s": min(times), "number": number, "repeats": repeats}
+
+
+def run(pattern="*", sizes=SIZES, min_time=0.02, repeats=5, seed=0):
+    results = {}
+    for name, (setup, skews, max_frac) in CASES.items():
+        if not fnmatch.fnmatch(name, pattern) and pattern not in name:
+            continue
+        for n in sizes:
+            for skew in skews:
+                random.seed(seed)
+                key = f"{name}[{n},{skew}]"
+                results[key] = measure(setup, n, skew, max_frac, min_time, repeats)
+                print(f"{key:<55} {fmt_time(results[key]['median_s']):>10}", file=sys.stderr)
+    return results
+
+
+def fmt_time(s):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if s >= scale:
+            return f"{s / scale:.2f} {unit}"
+    return f"{s / 1e-9:.0f} ns"
+
+
+def compare(base, new, threshold):
+    """-> (บรรทัดรายงาน, จำนวน regression) เทียบ min (นิ่งกว่า median); ช้าลงเกิน threshold เท่า = regression"""
+    lines, regressions = [], 0
+    for key, r in new.items():
+        b = base.get(key)
+        if b is None:
+            lines.append(f"{key:<55} {fmt_time(r['min_s']):>10}  (ใหม่)")
+            continue
+        ratio = r["min_s"] / b["min_s"] if b["min_s"] else float("inf")
+        mark = ""
+        if ratio > threshold:
+            mark = "  ❌ REGRESSION"
+            regressions += 1
+        elif ratio < 1 / threshold:
+            mark = "  ✅ faster"
+        lines.append(f"{key:<55} {fmt_time(b['min_s']):>10} -> {fmt_time(r['min_s']):>10}  x{ratio:.2f}{mark}")
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Party Tools micro-benchmarks")
+    parser.add_argument("-k", default="*", help="เลือก case (glob หรือ substring ของชื่อ)")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="ขนาด คั่นด้วย ,")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.02, help="เวลาขั้นต่ำต่อรอบ (วินาที)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="บันทึกผลเป็น JSON baseline")
+    parser.add_argument("--compare", help="เทียบกับ JSON baseline")
+    parser.add_argument("--threshold", type=float, default=1.5, help="ช้าลงเกินกี่เท่าถือว่า regression")
+    args = parser.parse_args(argv)
+
+    sizes = [int(x) for x in args.sizes.split(",") if x.strip()]
+    results = run(args.k, sizes, args.min_time, args.repeats, args.seed)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({
+                "meta": {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "platform": platform.platform(),
+                    "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+                },
+                "results": results,
+            }, f, ensure_ascii=False, indent=1, sort_keys=True)
+            f.write("\n")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            base = json.load(f)
+        lines, regressions = compare(base["results"], results, args.threshold)
+        print("\n".join(lines))
+        meta = base.get("meta", {})
+        print(f"\nbaseline: {meta.get('date', '?')} (Python {meta.get('python', '?')}); "
+              f"{regressions} regression (threshold x{args.threshold})")
+        return 1 if regressions else 0
+
+    for key, r in results.items():
+        print(f"{key:<55} {fmt_time(r['median_s']):>10}  (x{r['number']})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,247 @@
+"""
+Load test หลาย session พร้อมกันด้วย Streamlit AppTest (headless ไม่ต้องเปิด server / browser)
+
+    python benchmarks/loadtest.py --sessions 100 --workers 4 --steps 20
+    python benchmarks/loadtest.py --scenario reward --sessions 20 --out loadtest.json
+
+- แต่ละ worker process ถือ session ของตัวเอง (AppTest ละ 1 session) ทุกตัวมีชีวิตพร้อมกันจนจบ
+  แล้ววนทำทีละ step แบบสลับ session (round-robin) -> หน่วยความจำ = ทุก session ค้างอยู่จริง
+- scenario: reward (หมุนแบบตัดออก), punish (เลือกผู้เล่นแล้วหมุน), pairing (เลือก buddy/budder + confirm), mixed
+- รายงาน latency ต่อ rerun (p50 / p95 / p99 แยกตาม action), throughput, RSS ต่อ process และต่อ session
+- AppTest รันทั้งสคริปต์ทุกครั้ง (ไม่มี fragment rerun) -> ตัวเลขเป็นขอบบนของ rerun จริง
+- app ถูก copy ไป temp dir ก่อน (event log / metrics ไม่ปนกับ data/ จริง) ทุก process เขียน event log ไฟล์เดียวกัน
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ("reward", "punish", "pairing")
+
+
+# -----------------------------
+# หน่วยความจำ (ไม่ต้องมี psutil)
+# -----------------------------
+def rss_mb():
+    """RSS ปัจจุบันของ process (MB); ไม่มี /proc -> ใช้ peak จาก getrusage"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+# -----------------------------
+# Interaction scripts: step(at, rng, run) -> ชื่อ action (None = ทำไม่ได้ในตอนนี้)
+# run(widget) = rerun หลังแก้ widget (จับเวลาทีละ rerun)
+# -----------------------------
+def buttons(at, prefix):
+    return [b for b in at.button if b.key and b.key.startswith(prefix)]
+
+
+def click(at, key, run):
+    """กดปุ่ม key ถ้ามีใน rerun ล่าสุด -> True ถ้ากดได้"""
+    found = [b for b in at.button if b.key == key]
+    if found:
+        run(found[0].click())
+    return bool(found)
+
+
+def step_reward(at, rng, run):
+    if not len(at.session_state.party.reward):
+        run(at.button(key="reward_reset").click())
+        return "reward_reset"
+    run(at.button(key="reward_spin_btn").click())
+    return "reward_spin"
+
+
+def step_punish(at, rng, run):
+    players = buttons(at, "player_btn_")
+    if not players:
+        return None
+    run(rng.choice(players).click())
+    return "punish_spin" if click(at, "punish_spin_py", run) else None
+
+
+def step_pairing(at, rng, run):
+    buddies = buttons(at, "bb_buddy_btn_")
+    if not buddies:
+        return None
+    run(rng.choice(buddies).click())
+    budders = buttons(at, "bb_budder_btn_")
+    if not budders:
+        return None
+    run(rng.choice(budders).click())
+    if not click(at, "bb_pair_btn", run):
+        return None
+    click(at, "bb_pair_btn", run)  # ยืนยันครั้งที่ 2
+    return "pair"
+
+
+STEPS = {"reward": step_reward, "punish": step_punish, "pairing": step_pairing}
+
+
+def setup_session(at, scenario):
+    """สถานะเริ่มต้นของแต่ละ scenario (ไม่นับเวลา)"""
+    if scenario in ("reward", "mixed"):
+        at.number_input(key="reward_n").set_value(100).run()
+        at.button(key="reward_reset").click().run()
+        at.toggle(key="reward_remove_toggle").set_value(True).run()
+
+
+# -----------------------------
+# Worker (1 process)
+# -----------------------------
+def run_worker(app_path, n_sessions, steps, scenario, seed, timeout):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    rss = {"start": rss_mb()}
+    timings = []  # (action, ms) ต่อ 1 rerun
+    errors = []
+
+    def step(at, fn):
+        runs = []
+
+        def run(widget):
+            t0 = time.perf_counter()
+            widget.run()
+            runs.append((time.perf_counter() - t0) * 1000)
+
+        action = fn(at, rng, run)
+        if at.exception:
+            errors.append(str(at.exception[0].value)[:200])
+        if action is not None:
+            timings.extend((action, ms) for ms in runs)
+
+    sessions = []
+    for _ in range(n_sessions):
+        at = AppTest.from_file(app_path, default_timeout=timeout)
+        t0 = time.perf_counter()
+        at.run()
+        timings.append(("open", (time.perf_counter() - t0) * 1000))
+        setup_session(at, scenario)
+        sessions.append(at)
+        if len(sessions) == 1:
+            rss["first_session"] = rss_mb()  # หลัง import app + โหลด cache ที่แชร์ทั้ง process
+    rss["sessions_open"] = rss_mb()
+
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        for at in sessions:
+            step(at, STEPS[rng.choice(SCENARIOS) if scenario == "mixed" else scenario])
+    elapsed = time.perf_counter() - t0
+    rss["end"] = rss_mb()
+    return {"timings": timings, "errors": errors, "rss": rss, "elapsed": elapsed, "sessions": n_sessions}
+
+
+# -----------------------------
+# รวมผล
+# -----------------------------
+def percentiles(values):
+    if not values:
+        return {"n": 0}
+    if len(values) == 1:
+        p50 = p95 = p99 = values[0]
+    else:
+        q = statistics.quantiles(values, n=100, method="inclusive")
+        p50, p95, p99 = q[49], q[94], q[98]
+    return {"n": len(values), "p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "max_ms": max(values)}
+
+
+def summarize(results, wall):
+    by_action = {}
+    for r in results:
+        for action, ms in r["timings"]:
+            by_action.setdefault(action, []).append(ms)
+    reruns = [ms for action, values in by_action.items() if action != "open" for ms in values]
+    busy = max((r["elapsed"] for r in results), default=0.0)  # ช่วงที่ทุก process วน step พร้อมกัน
+    # ต่อ session = ส่วนที่เพิ่มหลัง session แรก (ไม่นับ import / cache ที่จ่ายครั้งเดียวต่อ process)
+    per_session = [
+        (r["rss"]["end"] - r["rss"]["first_session"]) / (r["sessions"] - 1) for r in results if r["sessions"] > 1
+    ]
+    return {
+        "sessions": sum(r["sessions"] for r in results),
+        "workers": len(results),
+        "wall_s": wall,
+        "reruns": len(reruns),
+        "throughput_rps": len(reruns) / busy if busy else 0.0,
+        "latency": {"all": percentiles(reruns), **{a: percentiles(v) for a, v in sorted(by_action.items())}},
+        "rss_mb": {
+            "per_process_start": [round(r["rss"]["start"], 1) for r in results],
+            "per_process_end": [round(r["rss"]["end"], 1) for r in results],
+            "per_session_avg": statistics.fmean(per_session) if per_session else 0.0,
+        },
+        "errors": [e for r in results for e in r["errors"]][:20],
+        "error_count": sum(len(r["errors"]) for r in results),
+    }
+
+
+def print_report(s):
+    print(f"{s['sessions']} sessions / {s['workers']} processes · {s['reruns']:,} reruns ใน {s['wall_s']:.1f}s "
+          f"· throughput {s['throughput_rps']:.1f} rerun/s")
+    print(f"{'action':<14} {'n':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for action, p in s["latency"].items():
+        if p["n"]:
+            print(f"{action:<14} {p['n']:>7} {p['p50_ms']:>7.1f}ms {p['p95_ms']:>7.1f}ms {p['p99_ms']:>7.1f}ms {p['max_ms']:>7.1f}ms")
+    rss = s["rss_mb"]
+    print(f"RSS ต่อ process: {rss['per_process_start']} -> {rss['per_process_end']} MB "
+          f"· ~{rss['per_session_avg']:.2f} MB ต่อ session")
+    if s["error_count"]:
+        print(f"⚠️ {s['error_count']} rerun มี exception เช่น: {s['errors'][0]}")
+
+
+def copy_app(dst):
+    """app + engine + frontend + config ไป temp dir (ไม่เอา event log / metrics ของจริง)"""
+    shutil.copy2(os.path.join(ROOT, "app.py"), dst)
+    for d in ("party_engine", "frontend"):
+        shutil.copytree(os.path.join(ROOT, d), os.path.join(dst, d), ignore=shutil.ignore_patterns("__pycache__"))
+    os.makedirs(os.path.join(dst, "data"))
+    shutil.copy2(os.path.join(ROOT, "data", "party_config.json"), os.path.join(dst, "data"))
+    return os.path.join(dst, "app.py")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Party Tools load test (AppTest, หลาย process)")
+    parser.add_argument("--sessions", type=int, default=20, help="จำนวน session รวม")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="จำนวน process")
+    parser.add_argument("--steps", type=int, default=10, help="จำนวน action ต่อ session")
+    parser.add_argument("--scenario", choices=SCENARIOS + ("mixed",), default="mixed")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60, help="timeout ต่อ rerun (วินาที)")
+    parser.add_argument("--out", help="บันทึกผลเป็น JSON")
+    args = parser.parse_args(argv)
+
+    workers = max(1, min(args.workers, args.sessions))
+    shares = [args.sessions // workers + (i < args.sessions % workers) for i in range(workers)]
+    with tempfile.TemporaryDirectory(prefix="party-loadtest-") as tmp:
+        app_path = copy_app(tmp)
+        t0 = time.perf_counter()
+        with ProcessPoolExecutor(workers) as ex:
+            futures = [
+                ex.submit(run_worker, app_path, n, args.steps, args.scenario, args.seed + i, args.timeout)
+                for i, n in enumerate(shares)
+            ]
+            results = [f.result() for f in futures]
+        summary = summarize(results, time.perf_counter() - t0)
+
+    summary["config"] = vars(args)
+    print_report(summary)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=1)
+            f.write("\n")
+    return 1 if summary["error_count"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
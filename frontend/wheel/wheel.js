@@ -0,0 +1,425 @@
+// Party Tools wheel (Streamlit custom component, static assets)
+// Python ส่งมาแค่ state เล็ก ๆ: segments (เฉพาะตอน version เปลี่ยน), spin_id, winner_pos
+// พอหมุนเสร็จจะส่ง {version, spin_id} กลับไปให้ Python (debug: + frame_stats)
+// quick spin: Python ส่งชุดผลที่ commit ไว้ (args.quick) -> แตะวงล้อแล้วหมุนทันที ไม่รอ rerun
+//   หมุนเสร็จค่อยส่ง {quick: {id, digest, done}} กลับไปให้ Python apply + ตรวจกับ digest
+// playlist (หมุนทั้งรอบ): ผลคิดไว้แล้วฝั่ง Python -> หมุนต่อกันทีละรายการ ไม่ต้องกลับไป server ระหว่างคน
+
+(function () {
+  // -----------------------------
+  // Streamlit component protocol (ไม่ต้องพึ่ง streamlit-component-lib)
+  // -----------------------------
+  const Streamlit = {
+    send(type, data) {
+      window.parent.postMessage(Object.assign({ isStreamlitMessage: true, type: type }, data), "*");
+    },
+    ready() { this.send("streamlit:componentReady", { apiVersion: 1 }); },
+    setFrameHeight(height) { this.send("streamlit:setFrameHeight", { height: height }); },
+    setValue(value) { this.send("streamlit:setComponentValue", { value: value, dataType: "json" }); },
+  };
+
+  const canvas = document.getElementById("wheel");
+  const ctx = canvas.getContext("2d");
+
+  function mulberry32(a) {
+    return function () {
+      var t = a += 0x6D2B79F5;
+      t = Math.imul(t ^ t >>> 15, t | 1);
+      t ^= t + Math.imul(t ^ t >>> 7, t | 61);
+      return ((t ^ t >>> 14) >>> 0) / 4294967296;
+    };
+  }
+  const rand = mulberry32(Date.now() >>> 0);
+
+  let segments = [];
+  let sectors = [];
+  let total = 0;
+  let version = null;   // id ของ layout ที่วาดอยู่
+  let lastSpin = null;  // spin_id ล่าสุดที่เริ่มหมุน
+  let lastDone = null;  // spin_id ล่าสุดที่หมุนเสร็จ
+  let spinning = false;
+  let pending = null;   // args ที่มาระหว่างหมุน (รอหมุนเสร็จก่อนค่อยเปลี่ยนวงล้อ)
+  let frameHeight = null;
+  let angle = 0;
+  let quick = null;     // ชุดผลที่ commit ไว้ {id, digest, layout, start, outcomes: [{pos, text}]}
+  let quickNext = 0;    // ผลถัดไปในชุด (นับฝั่ง browser; อาจนำหน้า quick.start ที่ Python รู้)
+  let centerText = "SPIN";
+  let banner = "";      // ข้อความแถบล่าง (ระหว่างเล่น playlist)
+  let lastPlaylist = null;
+  const ROUND_PAUSE_MS = 700;  // ค้างผลแต่ละคนไว้ก่อนหมุนคนถัดไป
+
+  function colorFor(i) {
+    const hue = (i * 360 / Math.max(1, segments.length)) % 360;
+    return `hsl(${hue}, 70%, 55%)`;
+  }
+
+  function setLayout(newSegments, order, newVersion) {
+    segments = newSegments || [];
+    // แถบ (sector) ของ segment เดียวกันกว้างเท่ากัน: weight / จำนวนแถบ
+    const stripeCount = {};
+    for (const i of order) stripeCount[i] = (stripeCount[i] || 0) + 1;
+    total = 0;
+    sectors = order.map((i) => {
+      const size = segments[i][1] / stripeCount[i];
+      const s = { seg: i, start: total, size: size };
+      total += size;
+      return s;
+    });
+    version = newVersion;
+    sprite = null;  // วาด sprite ใหม่รอบหน้า
+  }
+
+  // -----------------------------
+  // Sprite: วาดวงล้อ (แถบ + label) ครั้งเดียวตอน layout เปลี่ยน
+  // แต่ละเฟรมแค่หมุน bitmap แล้ววาด center + pointer ทับ
+  // -----------------------------
+  const cx = canvas.width / 2;
+  const cy = canvas.height / 2;
+  const R = Math.min(cx, cy) - 10;
+  const LABEL_MIN_PX = 9;   // แถบแคบกว่านี้ (ที่รัศมี label) ไม่วาดตัวอักษร
+  const LABEL_MAX_PX = 16;
+  const HUB_R = 56;         // วงกลมกลาง (SPIN)
+  let sprite = null;
+
+  function makeCanvas(w, h) {
+    if (typeof OffscreenCanvas !== "undefined") return new OffscreenCanvas(w, h);
+    const c = document.createElement("canvas");
+    c.width = w;
+    c.height = h;
+    return c;
+  }
+
+  // -----------------------------
+  // Label layout: ตัดคำตาม grapheme (สระ / วรรณยุกต์ไทยไม่หลุดจากพยัญชนะ) + ย่อ font ให้พอดีความกว้างจริง
+  // วัดด้วย measureText แล้ว cache ตาม (font, ข้อความ) -> คำนวณครั้งเดียวต่อชุด label (ตอนวาด sprite)
+  // แต่ละเฟรมไม่วัดอะไรใหม่
+  // -----------------------------
+  const segmenter = typeof Intl !== "undefined" && Intl.Segmenter ? new Intl.Segmenter("th", { granularity: "grapheme" }) : null;
+  const widthCache = new Map();  // font + "\n" + text -> px
+  const fitCache = new Map();    // text + maxWidth + maxPx -> {text, px} | null
+  const CACHE_MAX = 4000;
+  let measureCtx = null;
+
+  function graphemes(text) {
+    if (segmenter) return Array.from(segmenter.segment(text), (s) => s.segment);
+    // ไม่มี Intl.Segmenter: ติด combining mark (+ สระอำ ซึ่งเป็น SpacingMark) ไว้กับตัวหน้า
+    return text.match(/\P{M}[\p{M}\u0E33]*/gu) || [];
+  }
+
+  function fontFor(px) { return `bold ${px}px sans-serif`; }
+
+  function textWidth(text, font) {
+    const key = font + "\n" + text;
+    let w = widthCache.get(key);
+    if (w === undefined) {
+      if (!measureCtx) measureCtx = makeCanvas(1, 1).getContext("2d");
+      measureCtx.font = font;
+      w = measureCtx.measureText(text).width;
+      if (widthCache.size >= CACHE_MAX) widthCache.clear();
+      widthCache.set(key, w);
+    }
+    return w;
+  }
+
+  // font ใหญ่สุด (maxPx ลงไปถึง LABEL_MIN_PX) ที่ข้อความเต็มพอดี maxWidth; ไม่พอ -> ตัดท้ายทีละ grapheme + "…"
+  function fitLabel(text, maxWidth, maxPx) {
+    const key = text + "\n" + Math.round(maxWidth) + "\n" + maxPx;
+    if (fitCache.has(key)) return fitCache.get(key);
+    let fit = null;
+    for (let px = maxPx; px >= LABEL_MIN_PX; px--) {
+      if (textWidth(text, fontFor(px)) <= maxWidth) { fit = { text: text, px: px }; break; }
+    }
+    if (!fit) {
+      const font = fontFor(LABEL_MIN_PX);
+      const gs = graphemes(text);
+      let lo = 0, hi = gs.length;  // จำนวน grapheme มากสุดที่ + "…" แล้วยังพอดี
+      while (lo < hi) {
+        const mid = (lo + hi + 1) >> 1;
+        if (textWidth(gs.slice(0, mid).join("") + "…", font) <= maxWidth) lo = mid;
+        else hi = mid - 1;
+      }
+      fit = lo > 0 ? { text: gs.slice(0, lo).join("") + "…", px: LABEL_MIN_PX } : null;
+    }
+    if (fitCache.size >= CACHE_MAX) fitCache.clear();
+    fitCache.set(key, fit);
+    return fit;
+  }
+
+  function renderSprite() {
+    sprite = makeCanvas(canvas.width, canvas.height);
+    const g = sprite.getContext("2d");
+    const n = sectors.length;
+
+    g.beginPath();
+    g.arc(cx, cy, R, 0, Math.PI * 2);
+    g.fillStyle = "#ffffff";
+    g.fill();
+    g.lineWidth = 6;
+    g.strokeStyle = "#222";
+    g.stroke();
+
+    if (n === 0 || total <= 0) return;
+
+    const labelR = R - 24;
+    for (let k = 0; k < n; k++) {
+      const sec = sectors[k];
+      const arc = (Math.PI * 2) * sec.size / total;
+      const start = (Math.PI * 2) * sec.start / total;
+
+      g.beginPath();
+      g.moveTo(cx, cy);
+      g.arc(cx, cy, R - 6, start, start + arc);
+      g.closePath();
+      g.fillStyle = colorFor(sec.seg);
+      g.fill();
+
+      // level of detail: ขนาดตัวอักษรตามความกว้างแถบ, แคบเกินไปไม่วาด
+      const px = Math.min(LABEL_MAX_PX, Math.floor(arc * labelR * 0.8));
+      if (px < LABEL_MIN_PX) continue;
+      const fit = fitLabel(String(segments[sec.seg][0]), labelR - HUB_R - 8, px);
+      if (!fit) continue;
+
+      g.save();
+      g.translate(cx, cy);
+      g.rotate(start + arc / 2);
+      g.textAlign = "right";
+      g.fillStyle = "#111";
+      g.font = fontFor(fit.px);
+      g.fillText(fit.text, labelR, fit.px * 0.375);
+      g.restore();
+    }
+  }
+
+  function drawOverlay() {
+    // center
+    ctx.beginPath();
+    ctx.arc(cx, cy, HUB_R, 0, Math.PI * 2);
+    ctx.fillStyle = "#fff";
+    ctx.fill();
+    ctx.lineWidth = 4;
+    ctx.strokeStyle = "#111";
+    ctx.stroke();
+
+    const hub = fitLabel(centerText, HUB_R * 2 - 12, 16);
+    if (hub) {
+      ctx.fillStyle = "#111";
+      ctx.font = fontFor(hub.px);
+      ctx.textAlign = "center";
+      ctx.fillText(hub.text, cx, cy + hub.px * 0.375);
+    }
+
+    if (banner) {
+      ctx.fillStyle = "rgba(0,0,0,0.7)";
+      ctx.fillRect(cx - 200, canvas.height - 42, 400, 32);
+      const fit = fitLabel(banner, 384, 15);
+      if (fit) {
+        ctx.fillStyle = "#fff";
+        ctx.font = fontFor(fit.px);
+        ctx.textAlign = "center";
+        ctx.fillText(fit.text, cx, canvas.height - 20);
+      }
+    }
+
+    // pointer
+    ctx.beginPath();
+    ctx.moveTo(cx, cy - R + 6);
+    ctx.lineTo(cx - 14, cy - R + 34);
+    ctx.lineTo(cx + 14, cy - R + 34);
+    ctx.closePath();
+    ctx.fillStyle = "#111";
+    ctx.fill();
+  }
+
+  function draw() {
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    if (!sprite) renderSprite();
+
+    ctx.save();
+    ctx.translate(cx, cy);
+    ctx.rotate(angle);
+    ctx.drawImage(sprite, -cx, -cy);
+    ctx.restore();
+
+    drawOverlay();
+    if (debug) drawStats();
+  }
+
+  // -----------------------------
+  // Debug: frame-time counter (args.debug)
+  // -----------------------------
+  let debug = false;
+  const frameTimes = [];
+
+  function recordFrame(ms) {
+    frameTimes.push(ms);
+    if (frameTimes.length > 240) frameTimes.shift();
+  }
+
+  function frameStats() {
+    if (!frameTimes.length) return null;
+    const sorted = frameTimes.slice().sort((a, b) => a - b);
+    const avg = sorted.reduce((a, b) => a + b, 0) / sorted.length;
+    return {
+      avg_ms: +avg.toFixed(2),
+      p95_ms: +sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * 0.95))].toFixed(2),
+      fps: +(1000 / avg).toFixed(1),
+      sectors: sectors.length,
+    };
+  }
+
+  function drawStats() {
+    const s = frameStats();
+    if (!s) return;
+    ctx.save();
+    ctx.fillStyle = "rgba(0,0,0,0.65)";
+    ctx.fillRect(4, 4, 190, 22);
+    ctx.fillStyle = "#0f0";
+    ctx.font = "12px monospace";
+    ctx.textAlign = "left";
+    ctx.fillText(`${s.fps} fps  avg ${s.avg_ms}ms  n=${s.sectors}`, 10, 19);
+    ctx.restore();
+  }
+
+  function angleForPos(pos) {
+    // pos = ตำแหน่งบนวงล้อ [0, 1) ที่ต้องหยุดใต้ pointer
+    const pointerAngle = (Math.PI * 3 / 2);
+    return pointerAngle - pos * Math.PI * 2;
+  }
+
+  function spinTo(pos, onDone, fast) {
+    if (!sectors.length) { onDone(); return; }
+
+    const TAU = Math.PI * 2;
+    const target = ((angleForPos(pos) % TAU) + TAU) % TAU;
+    // fast (playlist): 1-2 รอบ สั้นกว่า ไม่งั้นทั้งรอบหลายสิบคนนานเกิน
+    const extra = TAU * (fast ? 1 + Math.floor(rand() * 2) : 4 + Math.floor(rand() * 3));
+    // หมุนต่อจากมุมปัจจุบันไปข้างหน้าเสมอ: มุมแรกที่ >= angle ที่หยุดตรง target แล้วค่อยบวกรอบเพิ่ม
+    let stop = angle - (((angle % TAU) + TAU) % TAU) + target;
+    if (stop < angle) stop += TAU;
+    const finalAngle = stop + extra;
+
+    const start = angle;
+    const delta = finalAngle - start;
+    const duration = fast ? 700 + Math.floor(rand() * 200) : 1800 + Math.floor(rand() * 600);
+    const t0 = performance.now();
+    let prev = null;
+    frameTimes.length = 0;
+
+    function easeOutCubic(t) { return 1 - Math.pow(1 - t, 3); }
+
+    function frame(now) {
+      if (prev !== null) recordFrame(now - prev);
+      prev = now;
+      const t = Math.min(1, (now - t0) / duration);
+      angle = start + delta * easeOutCubic(t);
+      draw();
+      if (t < 1) requestAnimationFrame(frame);
+      else onDone();
+    }
+    requestAnimationFrame(frame);
+  }
+
+  function onRender(args) {
+    if (spinning) { pending = args; return; }
+    debug = !!args.debug;
+
+    if (args.height !== frameHeight) {
+      frameHeight = args.height;
+      Streamlit.setFrameHeight(frameHeight);
+    }
+
+    if (args.segments != null) {
+      if (args.version !== version) {
+        setLayout(args.segments, args.order || [], args.version);
+        draw();
+      }
+    } else if (args.version !== version) {
+      // iframe ถูกสร้างใหม่แต่ Python คิดว่ามี layout แล้ว -> ขอ segments ใหม่
+      Streamlit.setValue({ version: null, spin_id: lastDone, nonce: Date.now() });
+      return;
+    }
+
+    if (!args.quick) {
+      quick = null;
+    } else if (!quick || quick.id !== args.quick.id) {
+      quick = args.quick;
+      quickNext = quick.start;
+    }
+    canvas.style.cursor = quickReady() ? "pointer" : "default";
+
+    if (args.playlist && args.playlist.id !== lastPlaylist) {
+      lastPlaylist = args.playlist.id;
+      playRound(args.playlist.items || []);
+      return;
+    }
+
+    if (args.spin_id != null && args.spin_id !== lastSpin && typeof args.winner_pos === "number") {
+      lastSpin = args.spin_id;
+      spinning = true;
+      centerText = "SPIN";
+      banner = "";
+      const id = args.spin_id;
+      setTimeout(() => spinTo(args.winner_pos, () => {
+        lastDone = id;
+        finishSpin();
+      }), 200);
+    }
+  }
+
+  function playRound(items) {
+    if (!items.length) return;
+    spinning = true;
+    let k = 0;
+    function next() {
+      if (k >= items.length) { finishSpin(); return; }
+      const o = items[k++];
+      centerText = "SPIN";
+      banner = `${k}/${items.length}`;
+      spinTo(o.pos, () => {
+        banner = `${k}/${items.length}  ${o.text}`;
+        draw();
+        setTimeout(next, ROUND_PAUSE_MS);
+      }, true);
+    }
+    next();
+  }
+
+  function finishSpin() {
+    spinning = false;
+    const value = { version: version, spin_id: lastDone };
+    if (quick) value.quick = { id: quick.id, digest: quick.digest, done: quickNext };
+    if (lastPlaylist !== null) value.playlist = lastPlaylist;
+    if (debug) value.frame_stats = frameStats();
+    Streamlit.setValue(value);
+    if (pending) {
+      const next = pending;
+      pending = null;
+      onRender(next);
+    }
+  }
+
+  function quickReady() {
+    return !!quick && quick.layout === version && quickNext < quick.outcomes.length;
+  }
+
+  // แตะวงล้อ = quick spin (ผลถัดไปจากชุดที่ commit ไว้) เริ่มหมุนทันที
+  canvas.addEventListener("click", () => {
+    if (spinning || !quickReady()) return;
+    const o = quick.outcomes[quickNext++];
+    spinning = true;
+    centerText = "SPIN";
+    banner = "";
+    spinTo(o.pos, () => {
+      centerText = o.text;
+      draw();
+      finishSpin();
+    });
+  });
+
+  window.addEventListener("message", (event) => {
+    if (event.data && event.data.type === "streamlit:render") onRender(event.data.args || {});
+  });
+
+  draw();
+  Streamlit.ready();
+})();
@@ -0,0 +1,98 @@
+"""
+Party Tools engine: logic ทั้งหมดของวงล้อ / จับคู่ แบบไม่ต้อง import Streamlit
+(app.py เป็นแค่ UI บน package นี้; CLI: python -m party_engine)
+"""
+from .arrange import can_avoid_adjacent, arrange_avoid_adjacent, shuffle_avoid_adjacent_same, expand_weighted_labels
+from .config import DEFAULT_CONFIG_PATH, load_party_config
+from .eventlog import DEFAULT_SCOPE, EventLog, ScopedLog
+from .export import EXPORT_FORMATS, EXPORTS, iter_csv, iter_json, iter_export
+from .fairness import chi_square, punish_expected, verify_reward, verify_punish, check_wheel_layout
+from .history import Leaderboard, History
+from .matching import auto_pair
+from .metrics import Metrics
+from .names import normalize_name, NameIndex
+from .party import parse_eel_points, is_mark, RewardPool, PunishmentWheel, PairingSession, Party, restore_party
+from .pool import NamePool, TicketPool
+from .quickspin import QUICK_BATCH_SIZE, SpinCommit, verify_commit, commit_reward, commit_punish
+from .room import ROOM_HOST_TIMEOUT, normalize_room_code, Room, RoomRegistry
+from .roster import ROSTER_CHUNK_ROWS, clean_name, split_department, RosterBuilder, import_roster, parse_roster_text
+from .sampler import WeightedSampler
+from .snapfile import SNAPFILE_EXT, SNAPFILE_MAX_BYTES, SNAPFILE_VERSION, PartyRecord, dump_party, iter_encode, load_party
+from .wheel import (
+    WHEEL_MAX_SECTORS,
+    REWARD_WHEEL_MAX_SLICES,
+    build_weighted_wheel,
+    equal_wheel,
+    wheel_sectors,
+    winner_pos_for,
+    build_reward_wheel,
+    reward_winner_pos,
+)
+
+__all__ = [
+    "can_avoid_adjacent",
+    "arrange_avoid_adjacent",
+    "shuffle_avoid_adjacent_same",
+    "expand_weighted_labels",
+    "DEFAULT_CONFIG_PATH",
+    "load_party_config",
+    "DEFAULT_SCOPE",
+    "EventLog",
+    "ScopedLog",
+    "EXPORT_FORMATS",
+    "EXPORTS",
+    "iter_csv",
+    "iter_json",
+    "iter_export",
+    "chi_square",
+    "punish_expected",
+    "verify_reward",
+    "verify_punish",
+    "check_wheel_layout",
+    "Leaderboard",
+    "History",
+    "auto_pair",
+    "Metrics",
+    "normalize_name",
+    "NameIndex",
+    "parse_eel_points",
+    "is_mark",
+    "RewardPool",
+    "PunishmentWheel",
+    "PairingSession",
+    "Party",
+    "restore_party",
+    "NamePool",
+    "TicketPool",
+    "QUICK_BATCH_SIZE",
+    "SpinCommit",
+    "verify_commit",
+    "commit_reward",
+    "commit_punish",
+    "ROOM_HOST_TIMEOUT",
+    "normalize_room_code",
+    "Room",
+    "RoomRegistry",
+    "ROSTER_CHUNK_ROWS",
+    "clean_name",
+    "split_department",
+    "RosterBuilder",
+    "import_roster",
+    "parse_roster_text",
+    "WeightedSampler",
+    "SNAPFILE_EXT",
+    "SNAPFILE_MAX_BYTES",
+    "SNAPFILE_VERSION",
+    "PartyRecord",
+    "dump_party",
+    "iter_encode",
+    "load_party",
+    "WHEEL_MAX_SECTORS",
+    "REWARD_WHEEL_MAX_SLICES",
+    "build_weighted_wheel",
+    "equal_wheel",
+    "wheel_sectors",
+    "winner_pos_for",
+    "build_reward_wheel",
+    "reward_winner_pos",
+]
@@ -0,0 +1,88 @@
+"""จัดเรียง label ไม่ให้ตัวเดิมติดกัน (ใช้ทั้งวงล้อแบบเก่าและการคละแถบของวงล้อ weighted)"""
+import heapq
+import random
+from collections import Counter
+
+
+def can_avoid_adjacent(counts):
+    """
+    บอกล่วงหน้าว่าจัดเรียงแบบไม่มี label เดิมติดกันได้ไหม
+    counts: {label: จำนวน} -> ได้ก็ต่อเมื่อ max(count) <= ceil(total / 2)
+    """
+    total = sum(counts.values())
+    if total <= 1:
+        return True
+    return max(counts.values()) <= (total + 1) // 2
+
+
+def arrange_avoid_adjacent(counts):
+    """
+    Build a randomized order from {label: count} with no identical neighbors.
+    O(n log k) via max-heap (k = number of distinct labels).
+    If impossible (one label > half), return the least-clustered order:
+    the dominant label is laid out and every other item is spread evenly
+    into the gaps between its copies.
+    """
+    counts = {label: int(c) for label, c in counts.items() if int(c) > 0}
+    if not counts:
+        return []
+
+    if not can_avoid_adjacent(counts):
+        top = max(counts, key=counts.get)
+        others = [label for label, c in counts.items() if label != top for _ in range(c)]
+        random.shuffle(others)
+        m = counts[top]
+        gaps = m - 1  # others < gaps เสมอในกรณีนี้
+        slots = set(((2 * i + 1) * gaps) // (2 * len(others)) for i in range(len(others)))
+        # slot ซ้ำกันไม่ได้ เพราะ len(others) < gaps -> ระยะห่าง >= 1
+        arr = []
+        it = iter(others)
+        for g in range(m):
+            arr.append(top)
+            if g in slots:
+                arr.append(next(it))
+        return arr
+
+    # สุ่ม tie-break ทุกครั้งที่ push เพื่อให้ลำดับไม่ตายตัว
+    heap = [(-c, random.random(), label) for label, c in counts.items()]
+    heapq.heapify(heap)
+    arr = []
+    prev = None
+    while heap:
+        c, _, label = heapq.heappop(heap)
+        if label == prev and heap:
+            c2, _, label2 = heapq.heappop(heap)
+            heapq.heappush(heap, (c, random.random(), label))
+            c, label = c2, label2
+        arr.append(label)
+        prev = label
+        if c + 1 < 0:
+            heapq.heappush(heap, (c + 1, random.random(), label))
+    return arr
+
+
+def shuffle_avoid_adjacent_same(items):
+    """
+    Shuffle list so that no identical neighbors exist.
+    Guaranteed whenever can_avoid_adjacent() says it is possible;
+    otherwise returns the least-clustered order.
+    """
+    if len(items) <= 2:
+        return items[:]
+    return arrange_avoid_adjacent(Counter(items))
+
+
+def expand_weighted_labels(punish_items):
+    """
+    Expand list by weight -> ["ดื่ม 3 วินาที", "ดื่ม 3 วินาที", ...]
+    arranged so that the same label is never adjacent (when possible).
+    """
+    counts = {}
+    for it in punish_items:
+        w = max(0, int(it.get("weight", 0)))
+        if w <= 0:
+            continue
+        label = str(it["label"])
+        counts[label] = counts.get(label, 0) + w
+
+    return arrange_avoid_adjacent(counts)
@@ -0,0 +1,222 @@
+"""
+CLI แบบ batch (ไม่ import Streamlit -> เริ่มเร็ว)
+
+    python -m party_engine reward --tickets 1000000 --spins 100000 --remove-after
+    python -m party_engine punish --spins 50000 --remove-after
+    python -m party_engine pair --rounds 1000 --out pairs.csv
+    python -m party_engine verify --spins 1000000 --workers 4 --sequence 3
+    python -m party_engine export --what pairs --format csv --out pairs.csv --party <id>   # จาก event log ของแอป
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import time
+
+from .config import DEFAULT_CONFIG_PATH, load_party_config
+from .eventlog import DEFAULT_SCOPE, EventLog
+from .export import EXPORT_FORMATS, EXPORTS, iter_export
+from .fairness import verify_punish, verify_reward
+from .party import Party, restore_party
+
+
+def _writer(path):
+    if not path:
+        return None, None
+    f = sys.stdout if path == "-" else open(path, "w", newline="", encoding="utf-8")
+    return f, csv.writer(f)
+
+
+def _report(name, count, unit, elapsed, extra=""):
+    rate = count / elapsed if elapsed > 0 else float("inf")
+    print(f"{name}: {count} {unit} in {elapsed:.3f}s ({rate:,.0f}/s){extra}", file=sys.stderr)
+
+
+def cmd_reward(args):
+    party = Party(load_party_config(args.config))
+    party.reward.reset(args.tickets)
+    party.reward.remove_after = args.remove_after
+    f, w = _writer(args.out)
+    if w:
+        w.writerow(["spin", "ticket"])
+
+    t0 = time.perf_counter()
+    done = 0
+    for i in range(args.spins):
+        _, ticket = party.reward.spin()
+        if ticket is None:
+            break
+        done += 1
+        if w:
+            w.writerow([i + 1, ticket])
+    elapsed = time.perf_counter() - t0
+
+    if f and f is not sys.stdout:
+        f.close()
+    _report("reward", done, "spins", elapsed, f", เหลือในพูล {len(party.reward)}")
+    return 0
+
+
+def cmd_punish(args):
+    party = Party(load_party_config(args.config))
+    party.punish.remove_after = args.remove_after
+    players = [x.strip() for x in args.players.split(",") if x.strip()] if args.players else list(party.pairing.buddies)
+    if not players:
+        print("ไม่มีผู้เล่น", file=sys.stderr)
+        return 1
+    f, w = _writer(args.out)
+    if w:
+        w.writerow(["spin", "player", "label", "seconds", "eel_points"])
+
+    t0 = time.perf_counter()
+    done = 0
+    for i in range(args.spins):
+        player = players[i % len(players)]
+        result = party.punish.spin(player)
+        if result is None:
+            break
+        done += 1
+        if w:
+            w.writerow([i + 1, player, result["label"], result["seconds"], result["eel_points"]])
+    elapsed = time.perf_counter() - t0
+
+    if f and f is not sys.stdout:
+        f.close()
+    _report("punish", done, "spins", elapsed)
+    return 0
+
+
+def cmd_pair(args):
+    cfg = load_party_config(args.config)
+    f, w = _writer(args.out)
+    if w:
+        w.writerow(["round", "buddy", "budder"])
+
+    t0 = time.perf_counter()
+    done = 0
+    for r in range(args.rounds):
+        party = Party(cfg)
+        pairing = party.pairing
+        if args.auto:
+            pairs, _ = pairing.auto_pair(args.no_same_dept)
+            done += len(pairs)
+            if w:
+                w.writerows([r + 1, p["buddy"], p["budder"]] for p in pairs)
+            continue
+        buddies = list(pairing.buddies)
+        random.shuffle(buddies)
+        for buddy in buddies:
+            if not pairing.budders:
+                break
+            p = pairing.pair(buddy, random.choice(pairing.budders))
+            done += 1
+            if w:
+                w.writerow([r + 1, p["buddy"], p["budder"]])
+    elapsed = time.perf_counter() - t0
+
+    if f and f is not sys.stdout:
+        f.close()
+    _report("pair", done, "pairings", elapsed)
+    return 0
+
+
+def format_report(report):
+    """รายงาน fairness เป็นตารางข้อความ"""
+    lines = [
+        f"[{report['wheel']}] {report['trials']:,} trials (sequence {report['sequence']}, "
+        f"{report['workers']} process, {report['elapsed']:.2f}s)",
+        f"{'label':<36} {'expected':>9} {'observed':>9} {'count':>10}",
+    ]
+    for r in report["rows"]:
+        lines.append(f"{r['label'][:36]:<36} {r['expected']:>9.5f} {r['observed']:>9.5f} {r['count']:>10,}")
+    lines.append(f"chi2 = {report['chi2']:.2f} (dof {report['dof']}), p = {report['p_value']:.4f}, max |diff| = {report['max_abs_diff']:.5f}")
+    for err in report.get("layout_errors", ()):
+        lines.append(f"layout: {err}")
+    return "\n".join(lines)
+
+
+def cmd_verify(args):
+    party = Party(load_party_config(args.config))
+    reports = []
+    if args.wheel in ("reward", "both"):
+        party.reward.reset(args.tickets)
+        reports.append(verify_reward(party.reward.tickets, args.spins, args.sequence, args.bins, args.workers, args.seed))
+    if args.wheel in ("punish", "both"):
+        reports.append(verify_punish(party.punish.sampler.items(), args.spins, args.sequence, args.workers, args.seed))
+
+    failed = False
+    for report in reports:
+        print(format_report(report))
+        print()
+        failed |= report["p_value"] < args.alpha or bool(report.get("layout_errors"))
+    return 1 if failed else 0
+
+
+def cmd_export(args):
+    """กู้ state จาก event log ของแอป แล้วเขียนออกทีละ chunk (stdout หรือไฟล์)"""
+    if not os.path.exists(args.log):
+        raise SystemExit(f"ไม่พบ event log: {args.log}")
+    party, _ = restore_party(EventLog(args.log).scope(args.party), load_party_config(args.config))
+    f = sys.stdout.buffer if args.out == "-" else open(args.out, "wb")
+    try:
+        for chunk in iter_export(party, args.what, args.format):
+            f.write(chunk)
+    finally:
+        if f is not sys.stdout.buffer:
+            f.close()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m party_engine", description="Party Tools batch runner (ไม่ใช้ Streamlit)")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH, help="party_config.json")
+    parser.add_argument("--seed", type=int, default=None, help="seed ของ random (ผลซ้ำได้)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("reward", help="หมุนวงล้อรางวัลหลายครั้ง")
+    p.add_argument("--tickets", type=int, default=10)
+    p.add_argument("--spins", type=int, default=1000)
+    p.add_argument("--remove-after", action="store_true")
+    p.add_argument("--out", help="เขียนผลเป็น CSV (- = stdout)")
+    p.set_defaults(func=cmd_reward)
+
+    p = sub.add_parser("punish", help="หมุนวงล้อบทลงโทษหลายครั้ง")
+    p.add_argument("--spins", type=int, default=1000)
+    p.add_argument("--players", help="ชื่อผู้เล่นคั่นด้วย , (default: players ใน config)")
+    p.add_argument("--remove-after", action="store_true")
+    p.add_argument("--out", help="เขียนผลเป็น CSV (- = stdout)")
+    p.set_defaults(func=cmd_punish)
+
+    p = sub.add_parser("pair", help="สุ่มจับคู่ Buddy–Budder ทั้งรายชื่อหลายรอบ")
+    p.add_argument("--rounds", type=int, default=1)
+    p.add_argument("--auto", action="store_true", help="จับคู่ทั้งหมดในครั้งเดียว (matching)")
+    p.add_argument("--no-same-dept", action="store_true", help="ใช้กับ --auto: ไม่จับแผนกเดียวกัน")
+    p.add_argument("--out", help="เขียนผลเป็น CSV (- = stdout)")
+    p.set_defaults(func=cmd_pair)
+
+    p = sub.add_parser("verify", help="ตรวจความยุติธรรมของวงล้อ (Monte Carlo + chi-square)")
+    p.add_argument("--wheel", choices=["reward", "punish", "both"], default="both")
+    p.add_argument("--spins", type=int, default=1_000_000)
+    p.add_argument("--sequence", type=int, default=1, help="หมุนแล้วตัดออกกี่ครั้งต่อ trial (ตรวจครั้งสุดท้าย)")
+    p.add_argument("--tickets", type=int, default=10, help="ขนาดพูลรางวัล")
+    p.add_argument("--bins", type=int, default=20, help="จำนวนช่วงเลขของวงล้อรางวัล")
+    p.add_argument("--workers", type=int, default=1, help="จำนวน process")
+    p.add_argument("--alpha", type=float, default=0.001, help="p-value ต่ำกว่านี้ -> exit code 1")
+    p.set_defaults(func=cmd_verify)
+
+    p = sub.add_parser("export", help="ส่งออกคู่ / ประวัติการหมุนจาก event log ของแอป")
+    p.add_argument("--log", default=os.path.join(os.path.dirname(DEFAULT_CONFIG_PATH), "events.sqlite3"), help="events.sqlite3 ของแอป")
+    p.add_argument("--party", default=DEFAULT_SCOPE, help="party id (?party=... ใน URL ของแอป)")
+    p.add_argument("--what", choices=list(EXPORTS), default="pairs")
+    p.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    p.add_argument("--out", default="-", help="ไฟล์ปลายทาง (- = stdout)")
+    p.set_defaults(func=cmd_export)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.seed is not None:
+        random.seed(args.seed)
+    return args.func(args)
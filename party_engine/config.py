@@ -0,0 +1,21 @@
+"""โหลด config ของปาร์ตี้ (รายชื่อ + บทลงโทษ default) เป็นข้อมูล immutable"""
+import json
+import os
+import sys
+from types import MappingProxyType
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "party_config.json")
+
+
+def load_party_config(path=DEFAULT_CONFIG_PATH):
+    """
+    -> mappingproxy {"players": tuple, "budders": tuple, "punish_items": tuple ของ mappingproxy}
+    intern ชื่อ -> players / budders ที่ซ้ำกันใช้ string object เดียวกัน
+    """
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    return MappingProxyType({
+        "players": tuple(sys.intern(str(x)) for x in raw.get("players", [])),
+        "budders": tuple(sys.intern(str(x)) for x in raw.get("budders", [])),
+        "punish_items": tuple(MappingProxyType(dict(x)) for x in raw.get("punish_items", [])),
+    })
@@ -0,0 +1,173 @@
+"""Event log แบบ append-only (SQLite WAL, group commit) แยกตาม scope (party)"""
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+DEFAULT_SCOPE = "default"  # event ที่บันทึกก่อนมี scope (ไฟล์เก่า) อยู่ใน scope นี้
+SNAPSHOT_KEEP = 2  # snapshot ต่อ scope ที่เก็บไว้ (ที่เก่ากว่าลบใน transaction เดียวกัน)
+
+
+class EventLog:
+    """
+    Event log แบบ append-only (SQLite WAL) กันผลหายตอน refresh / restart
+    - append() แค่เข้าคิว; writer thread รวมเป็น batch แล้ว commit ครั้งเดียว
+      (group commit: หมุนรัว ๆ ไม่ต้อง fsync ทุกคลิก)
+    - snapshot() เข้าคิวเดียวกัน -> event_id ของ snapshot ตรงกับ event ก่อนหน้าเสมอ
+    - load() = snapshot ล่าสุด + event หลังจากนั้น (replay สั้นเสมอ)
+    - ทุกแถวมี scope (party id): หลาย party ใช้ไฟล์เดียวกันได้โดยไม่ปนกัน
+      snapshot อ้าง event ล่าสุดของ scope ตัวเอง ไม่ใช่ของทั้งไฟล์
+    """
+
+    def __init__(self, path, flush_interval=0.2, batch_size=500):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = self._connect()
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS events (id INTEGER PRIMARY KEY, ts REAL, kind TEXT, data TEXT)")
+            conn.execute("CREATE TABLE IF NOT EXISTS snapshots (id INTEGER PRIMARY KEY, ts REAL, event_id INTEGER, state TEXT)")
+            for table in ("events", "snapshots"):
+                cols = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+                if "scope" not in cols:  # ไฟล์จากเวอร์ชันก่อน -> ทุกแถวเดิมเป็น DEFAULT_SCOPE
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN scope TEXT NOT NULL DEFAULT '{DEFAULT_SCOPE}'")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_scope ON {table} (scope, id)")
+        conn.close()
+        self._q = queue.Queue()
+        self._thread = threading.Thread(target=self._writer, name="party-event-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")
+        return conn
+
+    def append(self, kind, data, scope=DEFAULT_SCOPE):
+        self._q.put(("event", scope, time.time(), kind, json.dumps(data, ensure_ascii=False)))
+
+    def snapshot(self, state, scope=DEFAULT_SCOPE):
+        self._q.put(("snapshot", scope, time.time(), None, json.dumps(state, ensure_ascii=False)))
+
+    def scope(self, scope):
+        """-> ScopedLog: append / snapshot / load ของ scope เดียว (ส่งให้ restore_party ได้เลย)"""
+        return ScopedLog(self, scope)
+
+    def flush(self):
+        """รอจนทุกอย่างในคิวลงดิสก์"""
+        self._q.join()
+
+    def _writer(self):
+        conn = self._connect()
+        while True:
+            batch = [self._q.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._q.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            try:
+                with conn:  # 1 transaction (1 fsync) ต่อ batch
+                    for op, scope, ts, kind, data in batch:
+                        if op == "event":
+                            conn.execute("INSERT INTO events (scope, ts, kind, data) VALUES (?, ?, ?, ?)", (scope, ts, kind, data))
+                        else:
+                            conn.execute(
+                                "INSERT INTO snapshots (scope, ts, event_id, state) "
+                                "VALUES (?, ?, (SELECT COALESCE(MAX(id), 0) FROM events WHERE scope = ?), ?)",
+                                (scope, ts, scope, data),
+                            )
+                            conn.execute(
+                                "DELETE FROM snapshots WHERE scope = ? AND id NOT IN "
+                                "(SELECT id FROM snapshots WHERE scope = ? ORDER BY id DESC LIMIT ?)",
+                                (scope, scope, SNAPSHOT_KEEP),
+                            )
+            except sqlite3.Error:
+                logging.getLogger(__name__).exception("event log: เขียน batch ไม่สำเร็จ (%d รายการ)", len(batch))
+            finally:
+                for _ in batch:
+                    self._q.task_done()
+
+    def load(self, scope=DEFAULT_SCOPE):
+        """-> (snapshot state หรือ None, [(kind, data), ...] หลัง snapshot) ของ scope นี้"""
+        self.flush()
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT event_id, state FROM snapshots WHERE scope = ? ORDER BY id DESC LIMIT 1", (scope,)
+            ).fetchone()
+            upto, state = (row[0], json.loads(row[1])) if row else (0, None)
+            events = [
+                (kind, json.loads(data))
+                for kind, data in conn.execute(
+                    "SELECT kind, data FROM events WHERE scope = ? AND id > ? ORDER BY id", (scope, upto)
+                )
+            ]
+        finally:
+            conn.close()
+        return state, events
+
+    def exists(self, scope=DEFAULT_SCOPE):
+        """scope นี้มี event หรือ snapshot ไหม"""
+        self.flush()
+        conn = self._connect()
+        try:
+            return any(
+                conn.execute(f"SELECT 1 FROM {table} WHERE scope = ? LIMIT 1", (scope,)).fetchone()
+                for table in ("snapshots", "events")
+            )
+        finally:
+            conn.close()
+
+    def events(self, kinds, scope=DEFAULT_SCOPE):
+        """[(kind, data)] ทุก event ของ scope ที่เป็น kinds (ตามลำดับ) เช่นกู้ประวัติส่วนที่ไม่อยู่ใน snapshot"""
+        self.flush()
+        conn = self._connect()
+        try:
+            marks = ",".join("?" * len(kinds))
+            return [
+                (kind, json.loads(data))
+                for kind, data in conn.execute(
+                    f"SELECT kind, data FROM events WHERE scope = ? AND kind IN ({marks}) ORDER BY id", (scope, *kinds)
+                )
+            ]
+        finally:
+            conn.close()
+
+
+class ScopedLog:
+    """EventLog ที่ผูกกับ scope เดียว (party id)"""
+
+    __slots__ = ("log", "name")
+
+    def __init__(self, log, name):
+        self.log = log
+        self.name = name
+
+    def append(self, kind, data):
+        self.log.append(kind, data, self.name)
+
+    def snapshot(self, state):
+        self.log.snapshot(state, self.name)
+
+    def flush(self):
+        self.log.flush()
+
+    def load(self):
+        return self.log.load(self.name)
+
+    def exists(self):
+        return self.log.exists(self.name)
+
+    def events(self, kinds):
+        return self.log.events(kinds, self.name)
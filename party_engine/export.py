@@ -0,0 +1,69 @@
+"""
+ส่งออกผล (คู่ Buddy–Budder / ประวัติการหมุน) เป็น CSV หรือ JSON
+เป็น generator ของ bytes ทีละ chunk: เขียนลงไฟล์ / stdout ได้เลยโดยไม่ต้องสร้างทั้งเอกสารในหน่วยความจำ
+CSV ขึ้นต้นด้วย BOM (Excel เปิดภาษาไทยได้ถูก)
+"""
+import csv
+import io
+import json
+
+EXPORT_CHUNK_ROWS = 500
+PAIR_FIELDS = ("buddy", "budder", "ts")
+HISTORY_FIELDS = ("kind", "player", "label", "seconds", "eel_points", "ticket")
+
+
+def pair_rows(party):
+    # tuple: list อาจถูกแก้ (undo / reset) ระหว่างที่กำลังส่งออก
+    return tuple(party.pairing.pairs)
+
+
+def history_rows(party):
+    return tuple(party.history.entries)
+
+
+EXPORTS = {
+    "pairs": (pair_rows, PAIR_FIELDS),
+    "history": (history_rows, HISTORY_FIELDS),
+}
+EXPORT_FORMATS = ("csv", "json")
+
+
+def iter_csv(rows, fields, chunk_rows=EXPORT_CHUNK_ROWS):
+    buf = io.StringIO()
+    w = csv.DictWriter(buf, fields, extrasaction="ignore")
+    w.writeheader()
+    yield ("\ufeff" + buf.getvalue()).encode()
+    buf.seek(0)
+    buf.truncate()
+    for i, row in enumerate(rows, 1):
+        w.writerow(row)
+        if i % chunk_rows == 0:
+            yield buf.getvalue().encode()
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode()
+
+
+def iter_json(rows, fields, chunk_rows=EXPORT_CHUNK_ROWS):
+    """JSON array ของ object (เฉพาะ fields ที่มีค่า) ทีละ chunk"""
+    yield b"["
+    parts = []
+    for i, row in enumerate(rows):
+        obj = {f: row[f] for f in fields if row.get(f) is not None}
+        parts.append(("," if i else "") + "\n" + json.dumps(obj, ensure_ascii=False))
+        if len(parts) >= chunk_rows:
+            yield "".join(parts).encode()
+            parts = []
+    parts.append("\n]\n")
+    yield "".join(parts).encode()
+
+
+def iter_export(party, what, fmt):
+    """what: "pairs" | "history", fmt: "csv" | "json" -> generator ของ bytes"""
+    if what not in EXPORTS:
+        raise ValueError(f"ไม่รู้จักข้อมูล {what!r} (มี: {', '.join(EXPORTS)})")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"ไม่รู้จักรูปแบบ {fmt!r} (มี: {', '.join(EXPORT_FORMATS)})")
+    rows, fields = EXPORTS[what]
+    return (iter_csv if fmt == "csv" else iter_json)(rows(party), fields)
@@ -0,0 +1,280 @@
+"""
+ตรวจความยุติธรรมของวงล้อแบบ Monte Carlo (สุ่มจริงผ่านโค้ดเดียวกับที่ใช้ในงาน)
+- reward: TicketPool.draw (+ ตัดออกจากพูลทีละครั้ง ถ้า sequence > 1)
+- punish: WeightedSampler.draw (+ remove after) เทียบกับความน่าจะเป็นที่คำนวณได้ตรง ๆ
+รายงาน observed vs expected + chi-square p-value (ไม่ต้องมี scipy)
+NumPy (ถ้ามี) ใช้นับผล; กระจายงานหลาย process ได้ด้วย workers > 1
+"""
+import bisect
+import math
+import random
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from .pool import TicketPool
+from .sampler import WeightedSampler
+from .wheel import build_weighted_wheel, wheel_sectors, winner_pos_for
+
+try:
+    import numpy as np
+except ImportError:  # NumPy ไม่บังคับ
+    np = None
+
+MAX_DP_STATES = 200_000  # จำนวน state สูงสุดตอนคำนวณ expected ของ punish แบบ remove after
+
+
+# -----------------------------
+# chi-square p-value: Q(dof/2, x/2) (regularized upper incomplete gamma)
+# -----------------------------
+def _gamma_q(a, x):
+    if x <= 0:
+        return 1.0
+    lead = math.exp(-x + a * math.log(x) - math.lgamma(a))
+    if x < a + 1:
+        # series ของ P แล้วคืน 1 - P
+        term = total = 1.0 / a
+        ap = a
+        for _ in range(10_000):
+            ap += 1
+            term *= x / ap
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1.0 - total * lead)
+    # continued fraction (Lentz)
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 10_000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return min(1.0, h * lead)
+
+
+def chi_square(counts, probs):
+    """-> (สถิติ chi-square, dof, p-value) ของ counts เทียบกับความน่าจะเป็น probs"""
+    n = sum(counts)
+    cells = [(c, p * n) for c, p in zip(counts, probs) if p > 0]
+    stat = sum((c - e) ** 2 / e for c, e in cells)
+    dof = len(cells) - 1
+    if dof <= 0 or n == 0:
+        return stat, dof, 1.0
+    return stat, dof, _gamma_q(dof / 2, stat / 2)
+
+
+# -----------------------------
+# Expected probabilities
+# -----------------------------
+def punish_expected(weights, sequence=1):
+    """
+    ความน่าจะเป็นที่แต่ละ label ออกใน "ครั้งที่ sequence" เมื่อหมุนแล้วตัดออกทุกครั้ง
+    weights: [(label, weight)]; DP บนเซตที่ถูกตัดไปแล้ว
+    """
+    w = [int(x) for _, x in weights]
+    if sequence > len(w):
+        raise ValueError(f"sequence ({sequence}) มากกว่าจำนวนรายการ ({len(w)})")
+    total = sum(w)
+    states = {(): 1.0}  # tuple ของ index ที่ถูกตัด (เรียง) -> ความน่าจะเป็น
+    for _ in range(sequence - 1):
+        nxt = {}
+        for removed, p in states.items():
+            left = total - sum(w[i] for i in removed)
+            for i, wi in enumerate(w):
+                if i not in removed:
+                    key = tuple(sorted(removed + (i,)))
+                    nxt[key] = nxt.get(key, 0.0) + p * wi / left
+        if len(nxt) > MAX_DP_STATES:
+            raise ValueError("รายการ/sequence มากเกินไปสำหรับคำนวณ expected")
+        states = nxt
+    out = [0.0] * len(w)
+    for removed, p in states.items():
+        left = total - sum(w[i] for i in removed)
+        for i, wi in enumerate(w):
+            if i not in removed:
+                out[i] += p * wi / left
+    return out
+
+
+def _rank_table(ranges):
+    """ช่วงเลขที่เหลือ -> (จุดเริ่มแต่ละช่วง, จำนวนสะสมก่อนช่วงนั้น) สำหรับหา rank ของเลข"""
+    starts, before = [], []
+    acc = 0
+    for a, b in ranges:
+        starts.append(a)
+        before.append(acc)
+        acc += b - a + 1
+    return starts, before
+
+
+def _rank_of(table, ticket):
+    starts, before = table
+    j = bisect.bisect_right(starts, ticket) - 1
+    return before[j] + ticket - starts[j]
+
+
+# -----------------------------
+# Workers (top-level -> pickle ไปต่าง process ได้)
+# -----------------------------
+def _tally(hits, n):
+    if np is not None:
+        return np.bincount(np.frombuffer(hits, dtype=np.int32), minlength=n).tolist()
+    counts = [0] * n
+    for h in hits:
+        counts[h] += 1
+    return counts
+
+
+def _reward_chunk(pool_state, sequence, bins, trials, seed):
+    if seed is not None:
+        random.seed(seed)
+    base = TicketPool.from_dict(pool_state)
+    size = len(base)
+    table = _rank_table(pool_state["ranges"])
+    hits = array("i")
+    for _ in range(trials):
+        pool = base
+        if sequence > 1:
+            pool = base.copy()
+            for _ in range(sequence - 1):
+                pool.remove(pool.draw()[1])
+        _, ticket = pool.draw()
+        hits.append(_rank_of(table, ticket) * bins // size)
+    return _tally(hits, bins)
+
+
+def _punish_chunk(weights, sequence, trials, seed):
+    if seed is not None:
+        random.seed(seed)
+    slot = {label: i for i, (label, _) in enumerate(weights)}
+    base = WeightedSampler(weights)
+    hits = array("i")
+    for _ in range(trials):
+        sampler = base
+        if sequence > 1:
+            sampler = WeightedSampler(weights)  # สร้างใหม่ถูกกว่า copy (รายการไม่กี่แถว)
+            for _ in range(sequence - 1):
+                sampler.remove(sampler.draw())
+        hits.append(slot[sampler.draw()])
+    return _tally(hits, len(weights))
+
+
+def _run(fn, args, trials, workers, seed):
+    """แบ่ง trials เป็น chunk ละ worker -> counts รวม"""
+    workers = max(1, min(int(workers), trials or 1))
+    if workers == 1:
+        # process เดียว + seed=None -> ไม่ reseed random ของทั้งโปรแกรม
+        return fn(*args, trials, seed)
+    # แต่ละ chunk ต้องมี seed ของตัวเอง (fork แล้ว state ของ random ซ้ำกัน)
+    rng = random.Random(seed)
+    sizes = [trials // workers + (i < trials % workers) for i in range(workers)]
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        futures = [ex.submit(fn, *args, n, rng.getrandbits(64)) for n in sizes]
+        parts = [f.result() for f in futures]
+    return [sum(col) for col in zip(*parts)]
+
+
+def _report(name, labels, counts, probs, sequence, elapsed, workers):
+    n = sum(counts)
+    stat, dof, p = chi_square(counts, probs)
+    rows = [
+        {"label": label, "expected": pe, "observed": (c / n if n else 0.0), "count": c}
+        for label, c, pe in zip(labels, counts, probs)
+    ]
+    return {
+        "wheel": name,
+        "trials": n,
+        "sequence": sequence,
+        "rows": rows,
+        "chi2": stat,
+        "dof": dof,
+        "p_value": p,
+        "max_abs_diff": max((abs(r["observed"] - r["expected"]) for r in rows), default=0.0),
+        "elapsed": elapsed,
+        "workers": workers,
+    }
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+def verify_reward(pool, spins=1_000_000, sequence=1, bins=20, workers=1, seed=None):
+    """
+    หมุนวงล้อรางวัล spins ครั้งจาก TicketPool ปัจจุบัน (ไม่แก้พูลจริง)
+    sequence > 1: แต่ละ trial หมุนแล้วตัดออก sequence ครั้ง นับเลขที่ออกครั้งสุดท้าย
+    (ควรเท่ากันทุกเลขในพูลตั้งต้น) เลขจัดเป็น bins ช่วงตาม rank
+    """
+    size = len(pool)
+    if size == 0:
+        raise ValueError("พูลรางวัลว่าง")
+    if sequence > size:
+        raise ValueError(f"sequence ({sequence}) มากกว่าจำนวนเลขในพูล ({size})")
+    state = pool.to_dict()
+    bins = max(1, min(int(bins), size))
+    trials = spins // sequence
+    t0 = time.perf_counter()
+    counts = _run(_reward_chunk, (state, sequence, bins), trials, workers, seed)
+    elapsed = time.perf_counter() - t0
+
+    labels, probs = [], []
+    for j in range(bins):
+        a, b = -(-j * size // bins), -(-(j + 1) * size // bins)  # rank ช่วง [a, b) ที่ map มา bucket j
+        labels.append(f"{pool.kth(a)}–{pool.kth(b - 1)}" if b - a > 1 else str(pool.kth(a)))
+        probs.append((b - a) / size)
+    return _report("reward", labels, counts, probs, sequence, elapsed, workers)
+
+
+def verify_punish(weights, spins=1_000_000, sequence=1, workers=1, seed=None):
+    """
+    หมุนวงล้อบทลงโทษ spins ครั้งด้วย WeightedSampler (weights = sampler.items())
+    sequence > 1: หมุนแล้วตัดออก (remove after) นับ label ที่ออกครั้งสุดท้าย
+    """
+    weights = [(str(k), int(w)) for k, w in weights if int(w) > 0]
+    if not weights:
+        raise ValueError("ไม่มีรายการที่ weight > 0")
+    probs = punish_expected(weights, sequence)
+    trials = spins // sequence
+    t0 = time.perf_counter()
+    counts = _run(_punish_chunk, (weights, sequence), trials, workers, seed)
+    elapsed = time.perf_counter() - t0
+    report = _report("punish", [k for k, _ in weights], counts, probs, sequence, elapsed, workers)
+    report["layout_errors"] = check_wheel_layout(weights)
+    return report
+
+
+def check_wheel_layout(weights, samples=200):
+    """
+    วงล้อที่วาดตรงกับ weight ไหม: พื้นที่แถบรวมของแต่ละ label = weight
+    และ winner_pos_for ของแต่ละ label หยุดในแถบของ label นั้นจริง -> [ข้อความ error]
+    """
+    wheel = build_weighted_wheel(weights)
+    sectors = wheel_sectors(wheel)
+    errors = []
+    area = [0.0] * len(wheel["segments"])
+    for seg, _, size in sectors:
+        area[seg] += size
+    for (label, w), a in zip(wheel["segments"], area):
+        if abs(a - w) > 1e-9 * max(1, w):
+            errors.append(f"{label}: พื้นที่ {a:g} ≠ weight {w}")
+
+    total = sectors[-1][1] + sectors[-1][2] if sectors else 0
+    starts = [s[1] / total for s in sectors] if total else []
+    for seg, (label, _) in enumerate(wheel["segments"]):
+        for _ in range(max(1, samples // max(1, len(wheel["segments"])))):
+            pos = winner_pos_for(wheel, seg)
+            k = bisect.bisect_right(starts, pos) - 1
+            if sectors[k][0] != seg:
+                errors.append(f"{label}: หยุดผิดแถบ ({wheel['segments'][sectors[k][0]][0]})")
+                break
+    return errors
@@ -0,0 +1,163 @@
+"""
+ประวัติการหมุนทั้งคืน + ยอดสะสมต่อผู้เล่น (leaderboard)
+- อัปเดตทีละ event (ไม่ rescan ประวัติทั้งหมด)
+- top-k: heap แบบ lazy deletion (คะแนนเปลี่ยน -> push ค่าใหม่ ค่าเก่าทิ้งตอนเจอ) -> O(k log n) ต่อครั้ง
+- snapshot เก็บยอดสะสม + จำนวน + ท้ายประวัติ HISTORY_SNAPSHOT_TAIL รายการ (ขนาดคงที่ ไม่โตตามทั้งคืน)
+  ส่วนที่เก่ากว่านั้นกู้จาก event log ตอน restore (restore_party)
+"""
+import heapq
+
+HISTORY_KINDS = ("punish_spin", "punish_round", "reward_spin")  # event ที่ทำให้ประวัติเพิ่ม
+HISTORY_SNAPSHOT_TAIL = 500
+BOARDS = ("seconds", "eel_points", "punish_spins", "reward_wins")
+
+
+class Leaderboard:
+    """คะแนนต่อ key + top(k) เรียงจากมากไปน้อย (เท่ากันเรียงตาม key)"""
+
+    def __init__(self):
+        self.scores = {}
+        self._heap = []  # (-score, key) รวมค่าเก่าที่ยังไม่ถูกทิ้ง
+
+    def __len__(self):
+        return len(self.scores)
+
+    def get(self, key, default=0):
+        return self.scores.get(key, default)
+
+    def load(self, items):
+        """[(key, score)] จาก snapshot (list ไม่ใช่ dict: key ที่เป็นเลขไม่กลายเป็น string ใน JSON)"""
+        self.scores = {k: s for k, s in items}
+        self._compact()
+
+    def add(self, key, delta):
+        if not delta and key in self.scores:
+            return
+        score = self.scores.get(key, 0) + delta
+        self.scores[key] = score
+        heapq.heappush(self._heap, (-score, key))
+        if len(self._heap) > 2 * len(self.scores) + 64:
+            self._compact()
+
+    def _compact(self):
+        self._heap = [(-s, k) for k, s in self.scores.items()]
+        heapq.heapify(self._heap)
+
+    def top(self, k):
+        """-> [(key, score)] k อันดับแรก"""
+        out, seen, valid = [], set(), []
+        heap = self._heap
+        while heap and len(out) < k:
+            entry = heapq.heappop(heap)
+            neg, key = entry
+            if key in seen or self.scores.get(key) != -neg:
+                continue  # ค่าเก่า (lazy deletion)
+            seen.add(key)
+            valid.append(entry)
+            out.append((key, -neg))
+        for entry in valid:
+            heapq.heappush(heap, entry)
+        return out
+
+
+class History:
+    """
+    entries: ประวัติตามลำดับ ({"kind": "punish", player, label, seconds, eel_points} | {"kind": "reward", ticket})
+    ยอดสะสม: seconds / eel_points / punish_spins ต่อผู้เล่น, reward_wins ต่อเลข
+    """
+
+    def __init__(self, entries=()):
+        self.entries = []
+        self._by_kind = {"punish": [], "reward": []}
+        self._counts = {}  # ต่อ kind รวมส่วนที่ไม่ได้อยู่ใน entries (กู้จาก snapshot แต่กู้ส่วนเก่าไม่ได้)
+        self.seconds = Leaderboard()
+        self.eel_points = Leaderboard()
+        self.punish_spins = Leaderboard()
+        self.reward_wins = Leaderboard()
+        for e in entries:
+            self._add(dict(e))
+
+    @property
+    def total(self):
+        return sum(self._counts.values())
+
+    @property
+    def missing(self):
+        """จำนวนรายการเก่าที่นับในยอดแล้วแต่ไม่มีใน entries"""
+        return self.total - len(self.entries)
+
+    def state(self, tail=HISTORY_SNAPSHOT_TAIL):
+        """สำหรับ snapshot: ยอดสะสม + จำนวนต่อ kind + entries ท้ายสุด tail รายการ (None = ทั้งหมด)"""
+        return {
+            "counts": dict(self._counts),
+            "boards": {name: list(getattr(self, name).scores.items()) for name in BOARDS},
+            "tail": list(self.entries if tail is None else self.entries[max(0, len(self.entries) - tail):]),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """state() -> History (ยอดสะสมตามที่บันทึก ไม่คำนวณจาก tail); list = snapshot รุ่นก่อน (entries ทั้งหมด)"""
+        if not isinstance(state, dict):
+            return cls(state or ())
+        history = cls()
+        for name in BOARDS:
+            getattr(history, name).load(state["boards"].get(name, ()))
+        for e in state.get("tail") or ():
+            history._append(dict(e))
+        history._counts = dict(state["counts"])
+        return history
+
+    def prepend(self, older):
+        """entries ก่อน tail (กู้จาก event log) -> ใส่ไว้หน้า entries; ยอดสะสม / จำนวนไม่เปลี่ยน"""
+        older = [dict(e) for e in older[:self.missing]]
+        if not older:
+            return
+        self.entries[:0] = older
+        self._by_kind = {"punish": [], "reward": []}
+        for e in self.entries:
+            self._by_kind.setdefault(e["kind"], []).append(e)
+
+    def _append(self, e):
+        self.entries.append(e)
+        self._by_kind.setdefault(e["kind"], []).append(e)
+        self._counts[e["kind"]] = self._counts.get(e["kind"], 0) + 1
+
+    def _add(self, e):
+        self._append(e)
+        if e["kind"] == "punish":
+            player = e["player"]
+            self.punish_spins.add(player, 1)
+            self.seconds.add(player, int(e.get("seconds") or 0))
+            if e.get("eel_points") is not None:
+                self.eel_points.add(player, int(e["eel_points"]))
+        elif e["kind"] == "reward":
+            self.reward_wins.add(e["ticket"], 1)
+
+    def observe(self, kind, d):
+        """event เดียวกับที่ลง event log (ทั้งตอนเล่นจริงและตอน replay) -> อัปเดตประวัติ + ยอดสะสม"""
+        if kind == "punish_spin":
+            self._add_punish(d)
+        elif kind == "punish_round":
+            for r in d["results"]:
+                if r is not None:
+                    self._add_punish(r)
+        elif kind == "reward_spin":
+            self._add({"kind": "reward", "ticket": d["ticket"]})
+
+    def _add_punish(self, r):
+        self._add({
+            "kind": "punish",
+            "player": r["player"],
+            "label": r["label"],
+            "seconds": int(r.get("seconds") or 0),
+            "eel_points": r.get("eel_points"),
+        })
+
+    def recent(self, n, kind=None, offset=0):
+        """n รายการล่าสุด (ใหม่สุดก่อน) ข้ามใหม่สุดไป offset รายการ; slice เฉพาะส่วนที่ขอ"""
+        entries = self.entries if kind is None else self._by_kind.get(kind, [])
+        stop = len(entries) - offset
+        return entries[max(0, stop - n):max(0, stop)][::-1]
+
+    def count(self, kind):
+        return self._counts.get(kind, 0)
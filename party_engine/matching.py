@@ -0,0 +1,114 @@
+"""
+จับคู่ Buddy–Budder อัตโนมัติทั้งหมดในครั้งเดียว (bipartite matching แบบสุ่ม)
+กราฟเกือบสมบูรณ์ (ทุกคู่จับได้ ยกเว้นชื่อเดียวกัน / แผนกเดียวกัน) -> ไม่สร้าง edge จริง
+ใช้ "เซต budder ที่ยังไม่เยี่ยม" แยกตามแผนก ทำให้ BFS แต่ละ phase เป็น O(n + จำนวนแผนก)
+"""
+import random
+from collections import deque
+
+
+def auto_pair(buddies, budders, department=None, no_same_dept=False, rng=random):
+    """
+    buddies, budders: รายชื่อที่ยังไม่ได้จับคู่
+    department(name) -> แผนก หรือ None (ใช้เมื่อ no_same_dept)
+    -> (pairs [(buddy, budder)], buddy ที่จับคู่ไม่ได้)
+    1) greedy แบบสุ่ม  2) augmenting path แบบ Hopcroft–Karp (BFS หลายต้นพร้อมกันต่อ phase)
+    ได้ matching ขนาดสูงสุดเสมอ; ลำดับสุ่มทำให้ผลต่างกันทุกครั้ง (แต่ไม่ uniform ทุก matching)
+    """
+    buddies = list(buddies)
+    budders = list(budders)
+    rng.shuffle(buddies)
+    rng.shuffle(budders)
+    n, m = len(buddies), len(budders)
+    dept_of = department if (no_same_dept and department) else (lambda name: None)
+    u_dept = [dept_of(x) for x in buddies]
+    v_dept = [dept_of(x) for x in budders]
+
+    def allowed(u, v):
+        if buddies[u] == budders[v]:
+            return False
+        return u_dept[u] is None or u_dept[u] != v_dept[v]
+
+    match_u = [-1] * n  # buddy -> budder
+    match_v = [-1] * m  # budder -> buddy
+
+    # 1) greedy: สุ่ม budder ว่างจากแผนกที่จับได้ (น้ำหนักตามจำนวนคนในแผนก)
+    free = {}
+    for v in range(m):
+        free.setdefault(v_dept[v], []).append(v)
+    # buddy จากแผนกใหญ่ (ตัวเลือกน้อยสุด) ได้เลือกก่อน -> greedy แทบไม่ต้องพึ่ง phase 2
+    size = {}
+    for d in v_dept:
+        size[d] = size.get(d, 0) + 1
+    order = sorted(range(n), key=lambda u: -size.get(u_dept[u], 0) if u_dept[u] is not None else 0)
+    for u in order:
+        buckets = [b for d, b in free.items() if b and (u_dept[u] is None or d != u_dept[u])]
+        if not buckets:
+            continue
+        r = rng.randrange(sum(len(b) for b in buckets))
+        for bucket in buckets:
+            if r < len(bucket):
+                break
+            r -= len(bucket)
+        if buddies[u] == budders[bucket[-1]]:  # ชื่อเดียวกัน -> ลองตัวถัดไปในแผนกเดียวกัน
+            if len(bucket) < 2:
+                continue
+            bucket[-1], bucket[-2] = bucket[-2], bucket[-1]
+        v = bucket.pop()
+        match_u[u], match_v[v] = v, u
+
+    # 2) phases: BFS จาก buddy ที่ยังว่างทุกคนพร้อมกัน -> เก็บ path ที่ไม่ชนกันแล้วสลับคู่
+    while True:
+        roots = [u for u in range(n) if match_u[u] < 0]
+        if not roots:
+            break
+        unvisited = {}
+        for v in range(m):
+            unvisited.setdefault(v_dept[v], set()).add(v)
+        parent_v = {}  # budder -> buddy ที่มาถึง
+        root_of = {u: u for u in roots}
+        queue = deque(roots)
+        ends = []
+        while queue:
+            u = queue.popleft()
+            for d in list(unvisited):
+                if u_dept[u] is not None and d == u_dept[u]:
+                    continue
+                bucket = unvisited[d]
+                reached = [v for v in bucket if allowed(u, v)]
+                for v in reached:
+                    bucket.discard(v)
+                    parent_v[v] = u
+                    w = match_v[v]
+                    if w < 0:
+                        ends.append(v)
+                    else:
+                        root_of[w] = root_of[u]
+                        queue.append(w)
+                if not bucket:
+                    del unvisited[d]
+        if not ends:
+            break
+
+        used_roots = set()
+        augmented = 0
+        for v in ends:
+            # path: v <- u <- match_u[u] ... จนถึง root; แต่ละ root ใช้ได้ครั้งเดียวต่อ phase
+            root = root_of[parent_v[v]]
+            if root in used_roots:
+                continue
+            used_roots.add(root)
+            while True:
+                u = parent_v[v]
+                prev = match_u[u]
+                match_u[u], match_v[v] = v, u
+                if prev < 0:
+                    break
+                v = prev
+            augmented += 1
+        if not augmented:
+            break
+
+    pairs = [(buddies[u], budders[match_u[u]]) for u in range(n) if match_u[u] >= 0]
+    unmatched = [buddies[u] for u in range(n) if match_u[u] < 0]
+    return pairs, unmatched
@@ -0,0 +1,109 @@
+"""
+ตัวเก็บ metrics แบบเบา ๆ: span (จับเวลา), counter, gauge — thread-safe แชร์ทั้ง process
+export เป็น JSON (เขียนไฟล์แบบ atomic) ไม่ต้องมี dependency เพิ่ม
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+SPAN_WINDOW = 256  # เก็บเวลาล่าสุดกี่ครั้งต่อ span (สำหรับ p50 / p95)
+
+
+class Metrics:
+    """span = เวลาที่ใช้ (ms) ต่อชื่อ, counter = นับครั้ง, gauge = ค่าล่าสุด (เช่นขนาด payload)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.counters = {}
+        self.gauges = {}
+        self.spans = {}  # name -> {"count", "total_ms", "max_ms", "recent": deque}
+        self._last_export = float("-inf")
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name, value):
+        with self._lock:
+            self.gauges[name] = value
+
+    def record(self, name, ms):
+        with self._lock:
+            s = self.spans.get(name)
+            if s is None:
+                s = self.spans[name] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "recent": deque(maxlen=SPAN_WINDOW)}
+            s["count"] += 1
+            s["total_ms"] += ms
+            s["max_ms"] = max(s["max_ms"], ms)
+            s["recent"].append(ms)
+
+    @contextmanager
+    def span(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - t0) * 1000)
+
+    def timed(self, name):
+        """decorator: จับเวลาทุกครั้งที่เรียกฟังก์ชัน"""
+        def deco(fn):
+            @wraps(fn)
+            def run(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return run
+        return deco
+
+    def snapshot(self):
+        """-> dict (JSON ได้): counters, gauges, spans พร้อม avg / p50 / p95"""
+        with self._lock:
+            spans = {}
+            for name, s in self.spans.items():
+                recent = sorted(s["recent"])
+                pick = lambda q: recent[min(len(recent) - 1, int(len(recent) * q))] if recent else 0.0  # noqa: E731
+                spans[name] = {
+                    "count": s["count"],
+                    "avg_ms": s["total_ms"] / s["count"],
+                    "p50_ms": pick(0.5),
+                    "p95_ms": pick(0.95),
+                    "max_ms": s["max_ms"],
+                    "total_ms": s["total_ms"],
+                }
+            return {
+                "started": self.started,
+                "ts": time.time(),
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "spans": spans,
+            }
+
+    def export(self, path):
+        """เขียน snapshot เป็น JSON (เขียนไฟล์ชั่วคราวแล้ว rename -> คนอ่านไม่เจอไฟล์ครึ่ง ๆ)"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+
+    def maybe_export(self, path, interval):
+        """export ถ้าครั้งล่าสุดนานเกิน interval วินาที -> True ถ้าเขียนไฟล์"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_export < interval:
+                return False
+            self._last_export = now
+        self.export(path)
+        return True
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.counters.clear()
+            self.gauges.clear()
+            self.spans.clear()
@@ -0,0 +1,52 @@
+"""normalize + index ค้นหาชื่อ (prefix / substring)"""
+import bisect
+import unicodedata
+
+_ZERO_WIDTH = dict.fromkeys(map(ord, "\u200b\u200c\u200d\u2060\ufeff"))
+
+
+def normalize_name(text):
+    """
+    normalize ชื่อสำหรับค้นหา: NFC, ตัด zero-width, รวม "ํา" -> "ำ",
+    casefold (อังกฤษ) และยุบช่องว่าง
+    """
+    s = unicodedata.normalize("NFC", str(text)).translate(_ZERO_WIDTH)
+    s = s.replace("\u0e4d\u0e32", "\u0e33")
+    return " ".join(s.casefold().split())
+
+
+class NameIndex:
+    """
+    index ค้นหาชื่อแบบ prefix + substring (คำนวณครั้งเดียวต่อรายชื่อ)
+    - prefix: bisect บน (คำ, index) ที่เรียงไว้ ทั้งชื่อเต็มและแต่ละคำ
+    - substring: ตัวอักษร 1-2 ตัว (n-gram) -> set ของ index แล้วค่อยเช็คจริง
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.norm = [normalize_name(x) for x in self.names]
+        self.prefix_keys = sorted(
+            (tok, i) for i, n in enumerate(self.norm) for tok in {n, *n.split()}
+        )
+        self.grams = {}
+        for i, n in enumerate(self.norm):
+            for g in set(n) | {n[j:j + 2] for j in range(len(n) - 1)}:
+                self.grams.setdefault(g, set()).add(i)
+
+    def search(self, query):
+        """index ของชื่อที่ตรง: prefix ก่อน แล้วตามด้วย substring (เรียงตามลำดับเดิม)"""
+        q = normalize_name(query)
+        if not q:
+            return list(range(len(self.names)))
+
+        prefix = set()
+        k = bisect.bisect_left(self.prefix_keys, (q,))
+        while k < len(self.prefix_keys) and self.prefix_keys[k][0].startswith(q):
+            prefix.add(self.prefix_keys[k][1])
+            k += 1
+
+        grams = [q[j:j + 2] for j in range(len(q) - 1)] or [q]
+        sets = sorted((self.grams.get(g, set()) for g in grams), key=len)
+        cand = set.intersection(*sets) if sets else set()
+        sub = {i for i in cand - prefix if q in self.norm[i]}
+        return sorted(prefix) + sorted(sub)
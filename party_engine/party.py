@@ -0,0 +1,441 @@
+"""
+State ของปาร์ตี้แบบไม่ต้องใช้ Streamlit
+- RewardPool: วงล้อรางวัล (โอกาสเท่ากัน)
+- PunishmentWheel: วงล้อบทลงโทษ (weighted) + กติกา MARK = 0 วินาที
+- PairingSession: จับคู่ Buddy–Budder
+- Party: รวมทั้งหมด + replay event / snapshot
+ทุก operation แยกเป็น "สุ่ม" กับ "apply ผล" เพื่อให้ replay event ได้ตรงกับของจริง
+"""
+import random
+import re
+import time
+from collections import deque
+
+from .history import HISTORY_KINDS, History
+from .matching import auto_pair
+from .pool import NamePool, TicketPool
+from .roster import split_department
+from .sampler import WeightedSampler
+
+
+def parse_eel_points(label: str):
+    """
+    ดึงเลขหลังคำว่า 'แทงปลาไหล' เช่น '... แทงปลาไหล 40' -> 40
+    ถ้าไม่มี -> None
+    """
+    if not label:
+        return None
+    m = re.search(r"แทงปลาไหล\s*(\d+)", str(label))
+    return int(m.group(1)) if m else None
+
+
+def is_mark(player):
+    """กติกา MARK = ดื่ม 0 วินาทีเสมอ (และไม่ตัดรายการออกจากพูล)"""
+    return str(player).strip().upper() == "MARK"
+
+
+class RewardPool:
+    """วงล้อรางวัลเลข 1..n โอกาสเท่ากัน"""
+
+    def __init__(self, n=10):
+        self.tickets = TicketPool(n)
+        self.remove_after = False
+        self.last = None  # เลขล่าสุดที่ได้
+        self._epoch = 0   # เพิ่มทุกครั้งที่ reset (TicketPool ใหม่ version เริ่มที่ 0)
+
+    def __len__(self):
+        return len(self.tickets)
+
+    @property
+    def version(self):
+        return (self._epoch, self.tickets.version)
+
+    def reset(self, n):
+        self.tickets = TicketPool(n)
+        self.last = None
+        self._epoch += 1
+
+    def spin(self):
+        """สุ่ม 1 เลข -> (rank ก่อนตัด, เลข) หรือ (None, None) ถ้าพูลว่าง"""
+        rank, ticket = self.tickets.draw()
+        if ticket is not None:
+            self.apply_spin(ticket, self.remove_after)
+        return rank, ticket
+
+    def apply_spin(self, ticket, removed):
+        self.last = ticket
+        if removed:
+            self.tickets.remove(ticket)
+
+
+class PunishmentWheel:
+    """
+    วงล้อบทลงโทษ: items = [{"label", "seconds", "weight"}, ...]
+    items อาจเป็น tuple ที่แชร์กับ session อื่น -> แก้เมื่อไรค่อย copy (own_items)
+    """
+
+    def __init__(self, items=()):
+        self.items = items
+        self.sampler = WeightedSampler.from_items(items)
+        self.remove_after = False
+        self.last = None  # ผลล่าสุด (dict)
+
+    @property
+    def version(self):
+        return self.sampler.version
+
+    def own_items(self):
+        """copy-on-write: ก่อนแก้ items ให้มี list ของตัวเอง"""
+        if isinstance(self.items, tuple):
+            self.items = [dict(x) for x in self.items]
+        return self.items
+
+    def set_items(self, items):
+        self.items = items
+        self.sampler.load_items(items)
+
+    def add_item(self, label, seconds, weight):
+        self.own_items().append({"label": label, "seconds": int(seconds), "weight": int(weight)})
+        self.sampler.add(label, int(weight))
+
+    def update_item(self, idx, label, seconds, weight):
+        """แก้แถว idx -> True ถ้ามีอะไรเปลี่ยน (sampler อัปเดตเฉพาะส่วนต่าง)"""
+        it = self.items[idx]
+        if (label, int(seconds), int(weight)) == (it["label"], int(it["seconds"]), int(it["weight"])):
+            return False
+        old_label, old_w = it["label"], int(it["weight"])
+        self.own_items()[idx].update(label=label, seconds=int(seconds), weight=int(weight))
+        if (label, int(weight)) != (old_label, old_w):
+            self.sampler.add(old_label, -old_w)
+            self.sampler.add(label, int(weight))
+        return True
+
+    def delete_item(self, idx):
+        it = self.own_items().pop(idx)
+        self.sampler.add(it["label"], -int(it["weight"]))
+
+    def result_for(self, label, player):
+        """ผลของ label ที่สุ่มได้สำหรับผู้เล่นคนนี้ (กติกา MARK + remove after)"""
+        chosen = next((x for x in self.items if x["label"] == label), {"label": label, "seconds": 0, "weight": 1})
+        mark = is_mark(player)
+        return {
+            "player": player,
+            "label": chosen.get("label"),
+            "seconds": 0 if mark else int(chosen.get("seconds", 0)),
+            "eel_points": parse_eel_points(chosen.get("label", "")),
+            "removed": bool(self.remove_after and not mark),
+        }
+
+    def spin(self, player):
+        """สุ่มบทลงโทษให้ผู้เล่น -> dict ผล หรือ None ถ้าไม่มีรายการที่ weight > 0"""
+        label = self.sampler.draw()
+        if label is None:
+            return None
+        result = self.result_for(label, player)
+        self.apply_spin(result)
+        return result
+
+    def apply_spin(self, result):
+        self.last = result
+        if result["removed"]:
+            self.items = [x for x in self.own_items() if x["label"] != result["label"]]
+            self.sampler.remove(result["label"])
+
+    def spin_round(self, players):
+        """
+        สุ่มทั้งรอบให้ผู้เล่นหลายคนในครั้งเดียว -> [ผล dict หรือ None (ไม่เหลือรายการ)] ตามลำดับ players
+        ไม่ตัดออก: ทุกคนสุ่มจาก weight ชุดเดียวกัน -> random.choices ครั้งเดียวทั้งรอบ
+        remove after: ผลแต่ละคนเปลี่ยนพูลของคนถัดไป -> สุ่มทีละคนตามลำดับ (MARK ไม่ตัด เหมือน spin)
+        """
+        players = list(players)
+        if self.remove_after:
+            return [self.spin(p) for p in players]
+        pool = self.sampler.items()
+        if not pool or not players:
+            return [None] * len(players)
+        labels, weights = zip(*pool)
+        results = [self.result_for(label, p) for label, p in zip(random.choices(labels, weights, k=len(players)), players)]
+        self.last = results[-1]
+        return results
+
+
+class PairingSession:
+    """
+    จับคู่ Buddy–Budder แบบ 1-1 (budder ที่จับแล้วออกจากพูล)
+    index: buddy ที่จับแล้ว (set) / budder ที่เหลือ (NamePool) อัปเดตทีละคู่ O(log n) ไม่สร้างใหม่จาก pairs ทุกรอบ
+    journal: undo / redo ทีละ operation (จับคู่ 1 คู่, จับอัตโนมัติทั้งชุด, reset)
+    """
+
+    UNDO_LIMIT = 200
+
+    def __init__(self, buddies=(), budders=()):
+        self.buddies = buddies
+        self.budders = budders  # budder ที่ยังเหลือ
+        self.pairs = []
+        self.departments = {}  # ชื่อ -> แผนก (จากคอลัมน์แผนกตอนนำเข้า)
+
+    # -----------------------------
+    # state + index
+    # -----------------------------
+    @property
+    def budders(self):
+        """budder ที่ยังเหลือ ตามลำดับเดิม (NamePool: len / in / [i] ไม่ต้องสร้าง list)"""
+        return self._remaining
+
+    @budders.setter
+    def budders(self, names):
+        # ตั้งรายชื่อใหม่ = ทุกคนในรายชื่อว่าง; เก็บ object เดิมไว้ (snapshot เช็ค "ยังเป็นค่า default")
+        self._remaining = NamePool(names)
+
+    @property
+    def budder_pool(self):
+        """รายชื่อ budder ที่ตั้งไว้ (รวมคนที่ถูกจับไปแล้ว)"""
+        return self._remaining.names
+
+    def taken_budders(self):
+        return self._remaining.taken()
+
+    def rebase_budders(self, names, taken=None):
+        """เปลี่ยนรายชื่อต้นทาง แต่คนที่ถูกจับแล้วยังไม่กลับเข้าพูล (config hot reload / กู้ snapshot)"""
+        self._remaining = NamePool(names, self._remaining.taken() if taken is None else taken)
+
+    @property
+    def pairs(self):
+        return self._pairs
+
+    @pairs.setter
+    def pairs(self, pairs):
+        self._pairs = list(pairs)
+        self._used = {p["buddy"] for p in self._pairs}
+        self._undo = deque(maxlen=self.UNDO_LIMIT)  # ("pair", จำนวนคู่ท้าย pairs) | ("reset", pairs เดิม)
+        self._redo = []                             # ("pair", [คู่]) | ("reset", None)
+
+    def used_buddies(self):
+        """set ของ buddy ที่จับคู่แล้ว (อ่านอย่างเดียว)"""
+        return self._used
+
+    def _push(self, pairs):
+        self._pairs.extend(pairs)
+        for p in pairs:
+            self._used.add(p["buddy"])
+            self._remaining.take(p["budder"])
+
+    def _pop(self, k):
+        popped = self._pairs[len(self._pairs) - k:]
+        del self._pairs[len(self._pairs) - k:]
+        for p in popped:
+            self._used.discard(p["buddy"])
+            self._remaining.put(p["budder"])
+        return popped
+
+    def department(self, name):
+        """แผนกของชื่อนี้: จากไฟล์ที่นำเข้า ไม่มีก็ดูจากคำท้ายชื่อ ("แจน PH" -> PH)"""
+        return self.departments.get(name) or split_department(name)[1]
+
+    # -----------------------------
+    # operations
+    # -----------------------------
+    def pair(self, buddy, budder, ts=None):
+        p = {"buddy": buddy, "budder": budder, "ts": ts or time.strftime("%Y-%m-%d %H:%M:%S")}
+        self.apply_pair(p)
+        return p
+
+    def apply_pair(self, p):
+        self.apply_pairs([p])
+
+    def auto_pair(self, no_same_dept=False, ts=None):
+        """
+        จับคู่ buddy ที่เหลือทั้งหมดกับ budder ที่เหลือในครั้งเดียว (คู่เดิมคงไว้)
+        ไม่จับชื่อเดียวกัน; no_same_dept -> ไม่จับแผนกเดียวกัน
+        -> (คู่ใหม่ [dict], buddy ที่จับคู่ไม่ได้)
+        """
+        free = [b for b in self.buddies if b not in self._used]
+        matched, unmatched = auto_pair(free, self.budders, self.department, no_same_dept)
+        ts = ts or time.strftime("%Y-%m-%d %H:%M:%S")
+        pairs = [{"buddy": a, "budder": b, "ts": ts} for a, b in matched]
+        if pairs:
+            self.apply_pairs(pairs)
+        return pairs, unmatched
+
+    def apply_pairs(self, pairs):
+        """เพิ่มคู่ (1 คู่หรือทั้งชุด) เป็น 1 operation ใน journal"""
+        self._push(pairs)
+        self._undo.append(("pair", len(pairs)))
+        self._redo.clear()
+
+    def reset(self):
+        """ล้างคู่ทั้งหมด (budder ที่ถูกจับไม่กลับเข้าพูล เหมือนเดิม); undo ได้"""
+        if not self._pairs:
+            return
+        self._undo.append(("reset", self._pairs))
+        self._redo.clear()
+        self._pairs = []
+        self._used = set()
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo(self):
+        """ย้อน operation ล่าสุด -> True ถ้ามีให้ย้อน"""
+        if not self._undo:
+            return False
+        op, arg = self._undo.pop()
+        if op == "pair":
+            self._redo.append(("pair", self._pop(arg)))
+        else:
+            self._pairs = arg
+            self._used = {p["buddy"] for p in arg}
+            self._redo.append(("reset", None))
+        return True
+
+    def redo(self):
+        if not self._redo:
+            return False
+        op, arg = self._redo.pop()
+        if op == "pair":
+            self._push(arg)
+            self._undo.append(("pair", len(arg)))
+        else:
+            self._undo.append(("reset", self._pairs))
+            self._pairs = []
+            self._used = set()
+        return True
+
+    # -----------------------------
+    # snapshot ของ journal (undo/redo หลังกู้จาก snapshot ต้องได้ผลเหมือนเดิม)
+    # -----------------------------
+    def journal(self):
+        return {"undo": [list(x) for x in self._undo], "redo": [list(x) for x in self._redo]}
+
+    def load_journal(self, j):
+        self._undo = deque((tuple(x) for x in j.get("undo", ())), maxlen=self.UNDO_LIMIT)
+        self._redo = [tuple(x) for x in j.get("redo", ())]
+
+
+class Party:
+    """
+    state ทั้งปาร์ตี้ของ 1 session
+    ค่าที่ยังไม่แก้ (รายชื่อ, บทลงโทษ) ชี้ไปที่ cfg ที่แชร์กัน
+    """
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.reward = RewardPool(10)
+        self.punish = PunishmentWheel(cfg["punish_items"])
+        self.pairing = PairingSession(cfg["players"], cfg["budders"])
+        self.history = History()
+
+    # -----------------------------
+    # replay
+    # -----------------------------
+    def apply(self, kind, d):
+        """replay 1 event (ผลที่บันทึกไว้ ไม่สุ่มใหม่)"""
+        if kind == "reward_reset":
+            self.reward.reset(d["n"])
+        elif kind == "reward_spin":
+            self.reward.apply_spin(d["ticket"], d["removed"])
+        elif kind == "punish_config":
+            self.punish.set_items(d["items"])
+        elif kind == "punish_spin":
+            self.punish.apply_spin(d)
+        elif kind == "punish_round":
+            for r in d["results"]:
+                if r is not None:
+                    self.punish.apply_spin(r)
+        elif kind == "roster":
+            if d["key"] == "buddy_list":
+                self.pairing.buddies = d["names"]
+            else:
+                self.pairing.budders = d["names"]
+            self.pairing.departments.update(d.get("departments") or {})
+        elif kind == "pair":
+            self.pairing.apply_pair({"buddy": d["buddy"], "budder": d["budder"], "ts": d["ts"]})
+        elif kind == "pair_batch":
+            self.pairing.apply_pairs(d["pairs"])
+        elif kind == "pairs_reset":
+            self.pairing.reset()
+        elif kind == "pair_undo":
+            self.pairing.undo()
+        elif kind == "pair_redo":
+            self.pairing.redo()
+        self.history.observe(kind, d)
+
+    # -----------------------------
+    # snapshot (JSON ได้; None = ยังใช้ค่า default จาก cfg)
+    # -----------------------------
+    def snapshot(self):
+        def own(value, default):
+            return None if value is default else list(value)
+
+        return {
+            "reward_pool": self.reward.tickets.to_dict(),
+            "reward_last": self.reward.last,
+            "punish_items": own(self.punish.items, self.cfg["punish_items"]),
+            "punish_last": self.punish.last,
+            "buddy_list": own(self.pairing.buddies, self.cfg["players"]),
+            "budder_list": own(self.pairing.budder_pool, self.cfg["budders"]),
+            "budders_taken": list(self.pairing.taken_budders()),
+            "pairs": self.pairing.pairs,
+            "departments": self.pairing.departments,
+            "pair_journal": self.pairing.journal(),
+            "history": self.history.state(),
+        }
+
+    @classmethod
+    def from_snapshot(cls, cfg, snap):
+        party = cls(cfg)
+        if not snap:
+            return party
+        if snap.get("reward_pool") is not None:
+            party.reward.tickets = TicketPool.from_dict(snap["reward_pool"])
+        party.reward.last = snap.get("reward_last")
+        if snap.get("punish_items") is not None:
+            party.punish.set_items(snap["punish_items"])
+        party.punish.last = snap.get("punish_last")
+        if snap.get("buddy_list") is not None:
+            party.pairing.buddies = snap["buddy_list"]
+        party.pairing.rebase_budders(
+            snap["budder_list"] if snap.get("budder_list") is not None else cfg["budders"],
+            snap.get("budders_taken", ()),
+        )
+        party.pairing.pairs = list(snap.get("pairs") or [])
+        party.pairing.departments = dict(snap.get("departments") or {})
+        party.pairing.load_journal(snap.get("pair_journal") or {})
+        party.history = History.from_state(snap.get("history"))
+        return party
+
+    def sync_config(self, cfg):
+        """
+        ไฟล์ config เปลี่ยน (hot reload) -> ค่าที่ยังไม่ได้แก้ให้ชี้ไปชุดใหม่
+        ค่าที่แก้เองแล้ว (list ของ session) ไม่ยุ่ง
+        """
+        old, self.cfg = self.cfg, cfg
+        if old is cfg:
+            return
+        if self.pairing.buddies is old["players"]:
+            self.pairing.buddies = cfg["players"]
+        if self.pairing.budder_pool is old["budders"]:
+            self.pairing.rebase_budders(cfg["budders"])
+        if self.punish.items is old["punish_items"]:
+            self.punish.set_items(cfg["punish_items"])
+
+
+def restore_party(log, cfg):
+    """snapshot ล่าสุด + replay event ที่ตามมา -> (Party, จำนวน event ที่ replay)"""
+    snap, events = log.load()
+    party = Party.from_snapshot(cfg, snap)
+    for kind, d in events:
+        party.apply(kind, d)
+    missing = party.history.missing
+    if missing:
+        # snapshot เก็บแค่ท้ายประวัติ -> ส่วนเก่ากู้จาก event ของ scope นี้
+        # (เฉพาะเมื่อ event ครบตั้งแต่ต้น; scope ที่เริ่มจาก snapshot นำเข้าจะเหลือแค่ส่วนท้าย)
+        full = History()
+        for kind, d in log.events(HISTORY_KINDS):
+            full.observe(kind, d)
+        if full.total == party.history.total:
+            party.history.prepend(full.entries[:missing])
+    return party, len(events)
@@ -0,0 +1,283 @@
+"""พูลเลขรางวัลแบบบีบอัดเป็นช่วง + พูลรายชื่อที่ยังเหลือ (ตัด / คืนทีละชื่อ)"""
+import random
+from bisect import bisect_right
+
+
+class TicketPool:
+    """
+    พูลเลขรางวัล 1..n แบบบีบอัดเป็นช่วง (sparse segment tree + นับจำนวน)
+    child: None = ช่วงนั้นเหลือครบ, 0 = หมดแล้ว, list = [count, left, right]
+    kth / remove / contains = O(log n), หน่วยความจำโตตามจำนวน "รู" ไม่ใช่จำนวนตั๋ว
+    """
+
+    def __init__(self, n):
+        self.n = int(n)
+        self.root = None if self.n > 0 else 0
+        self.version = 0
+
+    def __len__(self):
+        return self._count(self.root, 1, self.n)
+
+    @staticmethod
+    def _count(node, lo, hi):
+        if node is None:
+            return hi - lo + 1
+        return node[0] if node else 0
+
+    def contains(self, t):
+        if not 1 <= t <= self.n:
+            return False
+        node, lo, hi = self.root, 1, self.n
+        while node:
+            if lo == hi:
+                return node[0] > 0
+            mid = (lo + hi) // 2
+            if t <= mid:
+                node, hi = node[1], mid
+            else:
+                node, lo = node[2], mid + 1
+        return node is None
+
+    def kth(self, r):
+        """เลขลำดับที่ r (0-based) จากเลขที่เหลือ เรียงจากน้อยไปมาก"""
+        node, lo, hi = self.root, 1, self.n
+        while node is not None:
+            mid = (lo + hi) // 2
+            left = self._count(node[1], lo, mid)
+            if r < left:
+                node, hi = node[1], mid
+            else:
+                r -= left
+                node, lo = node[2], mid + 1
+        return lo + r
+
+    def remove(self, t):
+        if not self.contains(t):
+            return False
+        if self.root is None:
+            self.root = [self.n, None, None]
+        node, lo, hi = self.root, 1, self.n
+        parent, side = None, None
+        while True:
+            node[0] -= 1
+            if node[0] == 0:
+                # ทั้งช่วงหมด -> เก็บเป็น 0 แทน subtree
+                if parent is None:
+                    self.root = 0
+                else:
+                    parent[side] = 0
+                break
+            if lo == hi:
+                break
+            mid = (lo + hi) // 2
+            if t <= mid:
+                side, clo, chi = 1, lo, mid
+            else:
+                side, clo, chi = 2, mid + 1, hi
+            child = node[side]
+            if child is None:
+                child = [chi - clo + 1, None, None]
+                node[side] = child
+            parent, node, lo, hi = node, child, clo, chi
+        self.version += 1
+        return True
+
+    def remove_range(self, a, b):
+        """ตัดเลข a..b ออกทั้งช่วง (O(log n) ต่อช่วง) -> จำนวนที่ตัดได้"""
+        a, b = max(a, 1), min(b, self.n)
+        if a > b:
+            return 0
+        self.root, removed = self._cut(self.root, 1, self.n, a, b)
+        if removed:
+            self.version += 1
+        return removed
+
+    def _cut(self, node, lo, hi, a, b):
+        if node == 0 or b < lo or hi < a:
+            return node, 0
+        if a <= lo and hi <= b:
+            return 0, self._count(node, lo, hi)
+        if node is None:
+            node = [hi - lo + 1, None, None]
+        mid = (lo + hi) // 2
+        node[1], r1 = self._cut(node[1], lo, mid, a, b)
+        node[2], r2 = self._cut(node[2], mid + 1, hi, a, b)
+        node[0] -= r1 + r2
+        return (node if node[0] else 0), r1 + r2
+
+    def copy(self):
+        """สำเนาที่แก้แยกกันได้ (copy เฉพาะ node ที่มี ไม่ใช่ทีละเลข)"""
+        def clone(node):
+            return [node[0], clone(node[1]), clone(node[2])] if node else node
+
+        pool = TicketPool(self.n)
+        pool.root = clone(self.root)
+        pool.version = self.version
+        return pool
+
+    def to_dict(self):
+        return {"n": self.n, "ranges": self.ranges()}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls.from_ranges(d["n"], d["ranges"])
+
+    @classmethod
+    def from_ranges(cls, n, ranges):
+        """สร้างจากช่วงที่เหลือ (เรียงแล้ว ไม่ทับกัน) ทีเดียวทั้งต้น -> O(ช่วง x log n) ไม่ต้อง cut ทีละช่วง"""
+        pool = cls(n)
+        rs = [(max(int(a), 1), min(int(b), pool.n)) for a, b in ranges]
+        rs = [(a, b) for a, b in rs if a <= b]
+        starts = [a for a, _ in rs]
+
+        def build(lo, hi, i, j):
+            # rs[i:j] = ช่วงที่ทับ [lo, hi]
+            if i >= j:
+                return 0
+            if j - i == 1 and rs[i][0] <= lo and hi <= rs[i][1]:
+                return None
+            mid = (lo + hi) // 2
+            k = bisect_right(starts, mid, i, j)  # rs[k:] เริ่มหลัง mid
+            left = build(lo, mid, i, k)
+            right = build(mid + 1, hi, k - 1 if k > i and rs[k - 1][1] > mid else k, j)
+            count = cls._count(left, lo, mid) + cls._count(right, mid + 1, hi)
+            return [count, left, right] if count else 0
+
+        if pool.n > 0:
+            pool.root = build(1, pool.n, 0, len(rs))
+        return pool
+
+    def draw(self):
+        """สุ่มเลขที่เหลือแบบโอกาสเท่ากัน -> (rank, เลข)"""
+        size = len(self)
+        if size <= 0:
+            return None, None
+        r = random.randrange(size)
+        return r, self.kth(r)
+
+    def ranges(self):
+        """ช่วงเลขที่เหลือ [(lo, hi), ...] เรียงจากน้อยไปมาก (ต่อช่วงที่ติดกันให้แล้ว)"""
+        out = []
+        stack = [(self.root, 1, self.n)]
+        while stack:
+            node, lo, hi = stack.pop()
+            if node is None:
+                if out and out[-1][1] == lo - 1:
+                    out[-1] = (out[-1][0], hi)
+                else:
+                    out.append((lo, hi))
+            elif node:
+                mid = (lo + hi) // 2
+                stack.append((node[2], mid + 1, hi))
+                stack.append((node[1], lo, mid))
+        return out
+
+    def summary(self, max_ranges=30):
+        rs = self.ranges()
+        parts = [str(a) if a == b else f"{a}–{b}" for a, b in rs[:max_ranges]]
+        if len(rs) > max_ranges:
+            parts.append(f"… (+{len(rs) - max_ranges} ช่วง)")
+        return ", ".join(parts) if parts else "-"
+
+
+class NamePool:
+    """
+    ชื่อที่ยังเหลือจาก names ตามลำดับเดิม (view: ไม่สร้าง list ใหม่ทุกครั้งที่ตัด / คืน)
+    Fenwick tree ของ "ยังว่าง" ต่อตำแหน่ง -> take / put / [i] = O(log n), len / in = O(1)
+    ชื่อซ้ำใน names: ตัด / คืนพร้อมกันทุกตำแหน่ง
+    """
+
+    def __init__(self, names, taken=()):
+        self.names = names
+        self._pos = {}
+        for i, x in enumerate(names):
+            self._pos.setdefault(x, []).append(i)
+        self._taken = set(taken)  # รวมชื่อที่ไม่อยู่ใน names (เปลี่ยนรายชื่อภายหลังก็ยังไม่กลับเข้าพูล)
+        free = [1] * len(names)
+        for x in self._taken:
+            for i in self._pos.get(x, ()):
+                free[i] = 0
+        self._size = sum(free)
+        tree = [0] + free
+        for i in range(1, len(tree)):
+            j = i + (i & -i)
+            if j < len(tree):
+                tree[j] += tree[i]
+        self._tree = tree
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, name):
+        return name in self._pos and name not in self._taken
+
+    def __iter__(self):
+        taken = self._taken
+        return (x for x in self.names if x not in taken)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self._size)
+            if step != 1:
+                return list(self)[i]
+            return self.page(start, stop)
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError("NamePool index out of range")
+        return self.names[self._position(i)]
+
+    def _position(self, i):
+        """ตำแหน่งใน names ของชื่อว่างลำดับที่ i (ไล่ลง Fenwick ทีละบิต)"""
+        tree = self._tree
+        pos, bit = 0, 1 << (len(tree) - 1).bit_length()
+        while bit:
+            nxt = pos + bit
+            if nxt < len(tree) and tree[nxt] <= i:
+                pos = nxt
+                i -= tree[nxt]
+            bit >>= 1
+        return pos
+
+    def page(self, start, stop):
+        """ชื่อว่างลำดับ start..stop-1: หาตัวแรก O(log n) แล้วเดินต่อ (ข้ามชื่อที่ถูกตัด)"""
+        out = []
+        if start >= min(stop, self._size):
+            return out
+        names, taken, want = self.names, self._taken, min(stop, self._size) - start
+        for pos in range(self._position(start), len(names)):
+            if names[pos] not in taken:
+                out.append(names[pos])
+                if len(out) == want:
+                    break
+        return out
+
+    def _update(self, name, delta):
+        tree, n = self._tree, len(self._tree)
+        for i in self._pos[name]:
+            i += 1
+            while i < n:
+                tree[i] += delta
+                i += i & -i
+            self._size += delta
+
+    def take(self, name):
+        """ตัดชื่อออกจากที่เหลือ -> True ถ้าตัด (ไม่มีในรายชื่อ / ตัดไปแล้ว -> จำไว้เฉย ๆ)"""
+        if name in self._taken:
+            return False
+        self._taken.add(name)
+        if name in self._pos:
+            self._update(name, -1)
+        return True
+
+    def put(self, name):
+        """คืนชื่อกลับเข้าที่เหลือ"""
+        if name not in self._taken:
+            return False
+        self._taken.discard(name)
+        if name in self._pos:
+            self._update(name, 1)
+        return True
+
+    def taken(self):
+        return self._taken
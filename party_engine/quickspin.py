@@ -0,0 +1,112 @@
+"""
+Quick spin: สุ่มผลล่วงหน้าเป็นชุด (commit) ส่งให้วงล้อฝั่ง browser หมุนได้ทันทีที่แตะ
+ผลไหลกลับมาทีหลัง (component value) แล้วค่อย apply -> ไม่ต้องรอ rerun ก่อนเริ่มหมุน
+- digest = sha256 ของ (id, wheel, outcomes, salt) ส่งไปพร้อมชุด; ผลที่ตอบกลับต้องอ้าง id + digest ตรงกัน
+- reveal() เปิด salt ให้ตรวจย้อนหลังได้ว่าผลที่ใช้ตรงกับที่ commit ไว้ (verify_commit)
+- remove after -> ชุดละ 1 ผล (หลังตัดแล้ว layout เปลี่ยน ผลถัดไปต้องสุ่มจากพูลใหม่)
+"""
+import hashlib
+import json
+import random
+import secrets
+
+from .wheel import reward_winner_pos, winner_pos_for
+
+QUICK_BATCH_SIZE = 20
+
+
+def _digest(body):
+    raw = json.dumps(body, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class SpinCommit:
+    """
+    ชุดผลที่สุ่มไว้แล้วของวงล้อ 1 อัน (ผูกกับ layout id + state version ตอนสุ่ม)
+    outcomes: [{"pos", "text", ...ข้อมูลสำหรับ apply}]; next = จำนวนที่ apply ไปแล้ว
+    """
+
+    def __init__(self, wheel, version, outcomes):
+        self.id = random.getrandbits(32)
+        self.wheel = wheel
+        self.version = version
+        self.outcomes = outcomes
+        self.salt = secrets.token_hex(16)
+        self.digest = _digest(self._body())
+        self.next = 0
+
+    def _body(self):
+        return {"id": self.id, "wheel": self.wheel, "outcomes": self.outcomes, "salt": self.salt}
+
+    def __len__(self):
+        return len(self.outcomes)
+
+    @property
+    def exhausted(self):
+        return self.next >= len(self.outcomes)
+
+    def public(self, layout_id):
+        """ส่งให้ component: ตำแหน่งหยุด + ข้อความที่จะแสดง (start = ผลที่ apply ไปแล้ว)"""
+        return {
+            "id": self.id,
+            "digest": self.digest,
+            "layout": layout_id,
+            "start": self.next,
+            "outcomes": [{"pos": o["pos"], "text": o["text"]} for o in self.outcomes],
+        }
+
+    def settle(self, report):
+        """
+        report จาก browser: {"id", "digest", "done": จำนวนผลที่หมุนไปแล้วในชุดนี้}
+        -> ผลที่ต้อง apply เพิ่ม (list, อาจว่าง); อ้างชุดอื่น / digest ไม่ตรง / done เกิน -> ValueError
+        """
+        if report.get("id") != self.id or report.get("digest") != self.digest:
+            raise ValueError("ผลที่ส่งกลับไม่ตรงกับชุดที่ commit ไว้")
+        done = report.get("done")
+        if not isinstance(done, int) or not 0 <= done <= len(self.outcomes):
+            raise ValueError(f"จำนวนรอบไม่ถูกต้อง: {done!r}")
+        new = self.outcomes[self.next:done]
+        self.next = max(self.next, done)
+        return new
+
+    def reveal(self):
+        """ข้อมูลสำหรับตรวจย้อนหลัง (เปิด salt -> เรียกตอนเลิกใช้ชุดนี้แล้วเท่านั้น)"""
+        return dict(self._body(), digest=self.digest, used=self.next)
+
+
+def verify_commit(revealed):
+    """reveal() -> True ถ้า digest ตรงกับ outcomes ที่เปิดเผย"""
+    body = {k: revealed[k] for k in ("id", "wheel", "outcomes", "salt")}
+    return _digest(body) == revealed.get("digest")
+
+
+# -----------------------------
+# สุ่มชุดผลจาก state ปัจจุบัน (ไม่เปลี่ยน state; apply ตอน settle)
+# -----------------------------
+def commit_reward(reward, wheel, size=QUICK_BATCH_SIZE):
+    """RewardPool + layout ปัจจุบัน -> SpinCommit (None ถ้าพูลว่าง)"""
+    if not len(reward):
+        return None
+    removed = reward.remove_after
+    outcomes = []
+    for _ in range(1 if removed else size):
+        rank, ticket = reward.tickets.draw()
+        outcomes.append({"pos": reward_winner_pos(wheel, rank, ticket), "text": str(ticket), "ticket": ticket, "removed": removed})
+    return SpinCommit("reward", (wheel["id"], reward.version, removed), outcomes)
+
+
+def commit_punish(punish, wheel, player, size=QUICK_BATCH_SIZE):
+    """PunishmentWheel + layout + ผู้เล่น -> SpinCommit (None ถ้าไม่มีรายการที่ weight > 0)"""
+    index = {s[0]: i for i, s in enumerate(wheel["segments"])}
+    outcomes = []
+    while len(outcomes) < size:
+        label = punish.sampler.draw()
+        if label is None:
+            break
+        result = punish.result_for(label, player)
+        outcomes.append({"pos": winner_pos_for(wheel, index[label]), "text": label, "result": result})
+        if result["removed"]:
+            break
+    if not outcomes:
+        return None
+    return SpinCommit("punish", (wheel["id"], punish.version, player, punish.remove_after), outcomes)
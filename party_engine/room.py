@@ -0,0 +1,142 @@
+"""
+ห้อง (shared room): state กลางของปาร์ตี้ 1 ชุดในหน่วยความจำของ process ให้หลายจอเปิดดูพร้อมกัน
+- host (session เดียว) แก้ party ภายใต้ lock แล้ว touch() -> version +1
+- viewer แค่เทียบ version (ถูก) แล้วอ่าน view ที่สร้างครั้งเดียวต่อ version แชร์ทุกจอ
+- วงล้อ: host publish layout + ผลหมุน (ตำแหน่งหยุด) -> ทุกจอหมุนตามโดยไม่ต้องสุ่ม / สร้าง layout เอง
+"""
+import re
+import secrets
+import threading
+import time
+
+ROOM_HOST_TIMEOUT = 120  # วินาทีที่ host เงียบไปแล้ว session อื่นรับเป็น host แทนได้
+ROOM_IDLE_TIMEOUT = 12 * 3600  # ห้องที่ host เงียบนานเท่านี้ถูกลบตอนเปิดห้องใหม่
+ROOM_CODE_RE = re.compile(r"^[a-z0-9-]{3,32}$")
+
+
+def normalize_room_code(code):
+    """-> รหัสห้อง (ตัวเล็ก) หรือ None ถ้ารูปแบบไม่ถูก"""
+    code = (code or "").strip().lower()
+    return code if ROOM_CODE_RE.match(code) else None
+
+
+class Room:
+    """
+    party: Party ตัวเดียวที่ทุก session ในห้องชี้ถึง (แก้ได้เฉพาะ host และต้องถือ lock)
+    wheels: {kind: {"layout", "spin": {"seq", "layout", "items": [{"pos", "text"}], "message"} | None}}
+    """
+
+    def __init__(self, code, party):
+        self.code = code
+        self.party = party
+        self.lock = threading.RLock()
+        self.version = 0
+        self.wheels = {}
+        self.host = None
+        self.host_seen = time.time()
+        self._seq = 0
+        self._view = None
+        self._view_version = -1
+
+    # host ---------------------------------------------------------------
+    def claim(self, token, now=None):
+        """รับเป็น host ได้ถ้ายังไม่มี / เป็นคนเดิม / host เดิมเงียบเกิน ROOM_HOST_TIMEOUT -> True ถ้าได้"""
+        now = time.time() if now is None else now
+        with self.lock:
+            if self.host not in (None, token) and now - self.host_seen < ROOM_HOST_TIMEOUT:
+                return False
+            self.host = token
+            self.host_seen = now
+            return True
+
+    def is_host(self, token):
+        return token is not None and token == self.host
+
+    def heartbeat(self, token):
+        if self.is_host(token):
+            self.host_seen = time.time()
+
+    def host_online(self, now=None):
+        return self.host is not None and (time.time() if now is None else now) - self.host_seen < ROOM_HOST_TIMEOUT
+
+    def touch(self):
+        """party เปลี่ยน (เรียกหลังแก้ทุกครั้ง)"""
+        with self.lock:
+            self.version += 1
+
+    def replace_party(self, party):
+        """แทน party ทั้งก้อน (กู้จาก snapshot) -> layout / ผลหมุนเดิมใช้ไม่ได้แล้ว"""
+        with self.lock:
+            self.party = party
+            self.wheels = {}
+            self.version += 1
+
+    def publish(self, kind, layout, items=None, message=None):
+        """
+        layout ปัจจุบันของวงล้อ kind (+ ผลหมุนใหม่ถ้ามี items; ตำแหน่งอิง layout นี้)
+        version เปลี่ยนเฉพาะตอน layout id เปลี่ยนหรือมีผลหมุนใหม่
+        """
+        with self.lock:
+            w = self.wheels.get(kind)
+            if items:
+                self._seq += 1
+                spin = {"seq": self._seq, "layout": layout, "items": list(items), "message": message}
+                self.wheels[kind] = {"layout": layout, "spin": spin}
+            elif w is None or w["layout"]["id"] != layout["id"]:
+                self.wheels[kind] = {"layout": layout, "spin": w["spin"] if w else None}
+            else:
+                return
+            self.version += 1
+
+    # viewer -------------------------------------------------------------
+    def view(self, build):
+        """
+        build(party) -> dict สำหรับแสดงผล; สร้างครั้งเดียวต่อ version แล้วแชร์ทุก viewer
+        คืน dict ใหม่ที่มี "version" และ "wheels" (snapshot ตอนสร้าง) เพิ่มเข้าไป
+        """
+        with self.lock:
+            if self._view_version != self.version:
+                self._view = dict(build(self.party), version=self.version, wheels=dict(self.wheels))
+                self._view_version = self.version
+            return self._view
+
+
+class RoomRegistry:
+    """ห้องทั้งหมดของ process: {code: Room}"""
+
+    def __init__(self):
+        self._rooms = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rooms)
+
+    def get(self, code):
+        return self._rooms.get(normalize_room_code(code))
+
+    def open(self, party, code=None):
+        """เปิดห้องใหม่ (code ว่าง -> สุ่ม) -> Room; รหัสซ้ำ / ไม่ถูกรูปแบบ -> ValueError"""
+        with self._lock:
+            self._prune()
+            if code is None:
+                code = secrets.token_hex(3)
+                while code in self._rooms:
+                    code = secrets.token_hex(3)
+            else:
+                norm = normalize_room_code(code)
+                if norm is None:
+                    raise ValueError(f"รหัสห้องต้องเป็น a-z 0-9 - ยาว 3-32 ตัว: {code!r}")
+                if norm in self._rooms:
+                    raise ValueError(f"มีห้อง {norm} อยู่แล้ว")
+                code = norm
+            room = self._rooms[code] = Room(code, party)
+            return room
+
+    def close(self, code):
+        with self._lock:
+            return self._rooms.pop(normalize_room_code(code), None)
+
+    def _prune(self, now=None):
+        now = time.time() if now is None else now
+        for code in [c for c, r in self._rooms.items() if now - r.host_seen > ROOM_IDLE_TIMEOUT]:
+            del self._rooms[code]
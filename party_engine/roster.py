@@ -0,0 +1,162 @@
+"""
+นำเข้ารายชื่อ (CSV / XLSX / ข้อความ): อ่านทีละ chunk, ทำความสะอาดชื่อ, ตัดชื่อซ้ำ, แยกแผนก
+openpyxl ไม่บังคับ (ต้องมีเฉพาะตอนอ่าน .xlsx)
+"""
+import codecs
+import csv
+import io
+import re
+import unicodedata
+
+from .names import _ZERO_WIDTH, normalize_name
+
+ROSTER_CHUNK_ROWS = 1000
+NAME_HEADERS = {"name", "names", "nickname", "player", "buddy", "budder", "ชื่อ", "ชื่อเล่น", "รายชื่อ"}
+DEPT_HEADERS = {"department", "dept", "team", "แผนก", "ฝ่าย"}
+CSV_ENCODINGS = ("utf-8-sig", "cp874")  # Excel ภาษาไทยบางเครื่อง save CSV เป็น TIS-620
+
+_DEPT_SUFFIX = re.compile(r"[A-Za-z][A-Za-z.&/-]*")
+
+
+def clean_name(text):
+    """ชื่อสำหรับแสดง: NFC, ตัด zero-width, ยุบช่องว่าง (ไม่เปลี่ยนตัวพิมพ์)"""
+    s = unicodedata.normalize("NFC", str(text)).translate(_ZERO_WIDTH)
+    return " ".join(s.split())
+
+
+def split_department(name):
+    """
+    แยกแผนกที่ต่อท้ายชื่อ: "แจน PH" -> ("แจน", "PH"), "แนน Asst." -> ("แนน", "ASST")
+    เฉพาะกรณีชื่อมีตัวอักษรไทย + คำสุดท้ายเป็นอังกฤษ; ไม่เข้าเงื่อนไข -> (name, None)
+    """
+    parts = name.rsplit(None, 1)
+    if len(parts) == 2 and _DEPT_SUFFIX.fullmatch(parts[1]) and not parts[0].isascii():
+        return parts[0], parts[1].rstrip(".").upper()
+    return name, None
+
+
+# -----------------------------
+# แหล่งข้อมูล -> แถว (list ของ cell)
+# -----------------------------
+def _csv_rows(f, encoding):
+    text = codecs.getreader(encoding)(f)
+    yield from csv.reader(text)
+
+
+def _xlsx_rows(f):
+    try:
+        import openpyxl
+    except ImportError:
+        raise ValueError("ต้องติดตั้ง openpyxl ก่อนถึงจะนำเข้า .xlsx ได้ (pip install openpyxl)") from None
+    wb = openpyxl.load_workbook(f, read_only=True, data_only=True)
+    try:
+        for row in wb.active.iter_rows(values_only=True):
+            yield ["" if v is None else str(v) for v in row]
+    finally:
+        wb.close()
+
+
+def _columns(header):
+    """header row -> (index ชื่อ, index แผนก) หรือ None ถ้าไม่ใช่ header"""
+    keys = [normalize_name(c) for c in header]
+    name_col = next((i for i, k in enumerate(keys) if k in NAME_HEADERS), None)
+    if name_col is None:
+        return None
+    dept_col = next((i for i, k in enumerate(keys) if k in DEPT_HEADERS), None)
+    return name_col, dept_col
+
+
+class RosterBuilder:
+    """
+    รับแถวทีละ chunk -> รายชื่อไม่ซ้ำ (ตัดซ้ำด้วย normalize_name ผ่าน hash set)
+    departments เก็บเฉพาะที่มีคอลัมน์แผนกจริง (ที่ต่อท้ายชื่อใช้ split_department ตอนอ่าน)
+    """
+
+    def __init__(self, existing=()):
+        self.names = []
+        self.departments = {}
+        self.seen = set()
+        self.rows = 0
+        self.blank = 0
+        self.duplicates = []
+        self.columns = None  # (name, dept) หลังอ่านแถวแรก
+        for name in existing:
+            self._add(name, None)
+
+    def _add(self, name, dept):
+        key = normalize_name(name)
+        if key in self.seen:
+            self.duplicates.append(name)
+            return
+        self.seen.add(key)
+        self.names.append(name)
+        if dept:
+            self.departments[name] = dept
+
+    def feed(self, rows):
+        for row in rows:
+            if self.columns is None:
+                self.columns = _columns(row)
+                if self.columns is not None:
+                    continue  # header
+                self.columns = (0, 1)
+            self.rows += 1
+            name_col, dept_col = self.columns
+            name = clean_name(row[name_col]) if name_col < len(row) else ""
+            if not name:
+                self.blank += 1
+                continue
+            dept = clean_name(row[dept_col]) if dept_col is not None and dept_col < len(row) else ""
+            self._add(name, dept.upper() or None)
+
+    def result(self):
+        return {
+            "names": self.names,
+            "departments": self.departments,
+            "rows": self.rows,
+            "blank": self.blank,
+            "duplicates": self.duplicates,
+        }
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_roster(f, filename, existing=(), chunk_size=ROSTER_CHUNK_ROWS, on_chunk=None):
+    """
+    อ่านไฟล์ CSV / XLSX (file object แบบ binary) ทีละ chunk
+    -> {"names", "departments", "rows", "blank", "duplicates"}
+    existing: รายชื่อเดิม (กรณีต่อท้าย) ใช้ตัดซ้ำด้วย
+    on_chunk(จำนวนแถวที่อ่านแล้ว): เรียกหลังแต่ละ chunk (เช่นอัปเดต progress)
+    """
+    is_xlsx = filename.lower().endswith((".xlsx", ".xlsm"))
+    encodings = (None,) if is_xlsx else CSV_ENCODINGS
+    for encoding in encodings:
+        builder = RosterBuilder(existing)
+        f.seek(0)
+        rows = _xlsx_rows(f) if is_xlsx else _csv_rows(f, encoding)
+        try:
+            for chunk in _chunks(rows, chunk_size):
+                builder.feed(chunk)
+                if on_chunk:
+                    on_chunk(builder.rows)
+        except UnicodeDecodeError:
+            continue  # ลอง encoding ถัดไป
+        return builder.result()
+    raise ValueError("อ่านไฟล์ไม่ได้: encoding ไม่ใช่ UTF-8 หรือ TIS-620")
+
+
+def parse_roster_text(text, existing=()):
+    """ข้อความ 1 ชื่อต่อบรรทัด (ช่องแก้ไขใน UI) ผ่าน pipeline เดียวกับไฟล์"""
+    builder = RosterBuilder(existing)
+    builder.columns = (0, None)
+    builder.feed([line] for line in io.StringIO(text))
+    return builder.result()
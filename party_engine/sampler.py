@@ -0,0 +1,112 @@
+"""Weighted sampler (Fenwick tree) สำหรับวงล้อบทลงโทษ"""
+import random
+
+
+class WeightedSampler:
+    """
+    สุ่มแบบถ่วงน้ำหนัก (Fenwick tree) เก็บไว้ใน session_state
+    draw / set / add / remove = O(log n), ไม่ต้องสร้างลิสต์ตาม weight ใหม่
+    key = label; label ซ้ำกันหลายแถว -> weight รวมกัน
+    """
+
+    def __init__(self, pairs=()):
+        self._rebuild([(k, w) for k, w in pairs])
+
+    @classmethod
+    def from_items(cls, punish_items):
+        s = cls()
+        s.load_items(punish_items)
+        return s
+
+    def load_items(self, punish_items):
+        """สร้างใหม่ทั้งหมดจาก punish_items (version ยังเดินต่อ)"""
+        self._rebuild([(str(it["label"]), int(it.get("weight", 0))) for it in punish_items])
+
+    def _rebuild(self, pairs):
+        merged = {}
+        for k, w in pairs:
+            merged[k] = merged.get(k, 0) + max(0, int(w))
+        self.keys = [k for k, w in merged.items() if w > 0]
+        self.weights = [merged[k] for k in self.keys]
+        self.index = {k: i for i, k in enumerate(self.keys)}
+        self.total = sum(self.weights)
+        self.dead = 0  # จำนวน slot ที่ weight = 0
+        # Fenwick tree แบบ O(n) build
+        n = len(self.weights)
+        tree = [0] + self.weights[:]
+        for i in range(1, n + 1):
+            j = i + (i & -i)
+            if j <= n:
+                tree[j] += tree[i]
+        self.tree = tree
+        self.version = getattr(self, "version", 0) + 1
+
+    def _prefix(self, i):
+        s = 0
+        while i > 0:
+            s += self.tree[i]
+            i -= i & -i
+        return s
+
+    def _update(self, slot, delta):
+        i = slot + 1
+        n = len(self.weights)
+        while i <= n:
+            self.tree[i] += delta
+            i += i & -i
+
+    def weight(self, key):
+        slot = self.index.get(key)
+        return 0 if slot is None else self.weights[slot]
+
+    def set(self, key, weight):
+        weight = max(0, int(weight))
+        slot = self.index.get(key)
+        if slot is None:
+            if weight <= 0:
+                return
+            # append slot ใหม่: node i ครอบคลุมช่วง (i - lowbit(i), i]
+            self.keys.append(key)
+            self.weights.append(weight)
+            i = len(self.weights)
+            self.tree.append(weight + self._prefix(i - 1) - self._prefix(i - (i & -i)))
+            self.index[key] = i - 1
+        else:
+            old = self.weights[slot]
+            delta = weight - old
+            if delta == 0:
+                return
+            self.dead += (weight == 0) - (old == 0)
+            self.weights[slot] = weight
+            self._update(slot, delta)
+        self.total += weight if slot is None else delta
+        self.version += 1
+
+        # slot ที่ weight = 0 เกินครึ่ง -> compact (amortized O(1))
+        if self.dead > 32 and self.dead * 2 > len(self.weights):
+            self._rebuild(self.items())
+
+    def add(self, key, delta):
+        self.set(key, self.weight(key) + int(delta))
+
+    def remove(self, key):
+        self.set(key, 0)
+
+    def draw(self):
+        """สุ่ม key ตาม weight: Fenwick descent หา slot แรกที่ prefix > u"""
+        if self.total <= 0:
+            return None
+        u = random.randrange(self.total)
+        pos = 0
+        step = 1 << len(self.weights).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= len(self.weights) and self.tree[nxt] <= u:
+                pos = nxt
+                u -= self.tree[nxt]
+            step >>= 1
+        return self.keys[pos]
+
+    def items(self):
+        """[(key, weight)] เฉพาะที่ weight > 0 ตามลำดับที่เพิ่มเข้ามา"""
+        return [(k, w) for k, w in zip(self.keys, self.weights) if w > 0]
@@ -0,0 +1,277 @@
+"""
+ไฟล์ snapshot ของทั้งปาร์ตี้ (.ptsnap): ย้ายงานไปเครื่องอื่น / เก็บ setup ไว้ใช้ซ้ำ
+รูปแบบ v1: MAGIC + version (u16) + zlib stream ของ
+  [meta JSON] [string table] [คอลัมน์ u32 ...]
+- string table: ทุกชื่อ / label / ts เก็บครั้งเดียว, คอลัมน์อ้างด้วย id
+- คอลัมน์ = array ของ u32 (little-endian) -> encode/decode ด้วย array.tobytes/frombytes
+- ค่าเล็ก ๆ (flag, ผลล่าสุด, journal, ประวัติการหมุน) อยู่ใน meta JSON; ชื่อคอลัมน์อยู่ใน meta -> เพิ่มคอลัมน์ได้ไม่ต้องเปลี่ยน version
+"""
+import json
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+from .history import History
+from .pool import TicketPool
+
+SNAPFILE_MAGIC = b"PTSNAP"
+SNAPFILE_VERSION = 1
+SNAPFILE_EXT = ".ptsnap"
+_HEADER = struct.Struct("<6sH")
+_U32 = struct.Struct("<I")
+_READ_CHUNK = 1 << 20
+SNAPFILE_MAX_BYTES = 64 << 20  # ขนาดหลัง decompress สูงสุด (กันไฟล์ zip bomb กินหน่วยความจำ)
+
+
+# -----------------------------
+# Typed records (ใช้ระหว่าง encode / decode)
+# -----------------------------
+class PairRecord:
+    __slots__ = ("buddy", "budder", "ts")
+
+    def __init__(self, buddy, budder, ts):
+        self.buddy, self.budder, self.ts = buddy, budder, ts
+
+    def to_dict(self):
+        return {"buddy": self.buddy, "budder": self.budder, "ts": self.ts}
+
+
+class PunishItemRecord:
+    __slots__ = ("label", "seconds", "weight")
+
+    def __init__(self, label, seconds, weight):
+        self.label, self.seconds, self.weight = label, int(seconds), int(weight)
+
+    def to_dict(self):
+        return {"label": self.label, "seconds": self.seconds, "weight": self.weight}
+
+
+class PartyRecord:
+    """ทั้งปาร์ตี้ในรูปที่ encode ได้ตรง ๆ (list ของ str / record)"""
+
+    __slots__ = (
+        "created", "reward_n", "reward_ranges", "reward_remove_after", "reward_last",
+        "punish_items", "punish_remove_after", "punish_last",
+        "buddies", "budder_pool", "taken", "departments", "pairs", "journal", "history",
+    )
+
+    @classmethod
+    def from_party(cls, party):
+        r = cls()
+        r.created = time.time()
+        r.reward_n = party.reward.tickets.n
+        r.reward_ranges = party.reward.tickets.ranges()
+        r.reward_remove_after = party.reward.remove_after
+        r.reward_last = party.reward.last
+        r.punish_items = [PunishItemRecord(x["label"], x["seconds"], x["weight"]) for x in party.punish.items]
+        r.punish_remove_after = party.punish.remove_after
+        r.punish_last = party.punish.last
+        pairing = party.pairing
+        r.buddies = list(pairing.buddies)
+        r.budder_pool = list(pairing.budder_pool)
+        r.taken = list(pairing.taken_budders())
+        r.departments = dict(pairing.departments)
+        r.pairs = [PairRecord(p["buddy"], p["budder"], p["ts"]) for p in pairing.pairs]
+        r.journal = pairing.journal()
+        r.history = party.history.state(tail=None)
+        return r
+
+    def to_party(self, cfg):
+        """-> Party; รายชื่อ / บทลงโทษที่ตรงกับ config ใช้ object ของ config (แชร์ได้เหมือนเดิม)"""
+        from .party import Party
+
+        def shared(values, default):
+            return default if tuple(values) == tuple(default) else values
+
+        party = Party(cfg)
+        party.reward.tickets = TicketPool.from_dict({"n": self.reward_n, "ranges": self.reward_ranges})
+        party.reward.remove_after = self.reward_remove_after
+        party.reward.last = self.reward_last
+
+        items = [x.to_dict() for x in self.punish_items]
+        if items != [dict(x) for x in cfg["punish_items"]]:
+            party.punish.set_items(items)
+        party.punish.remove_after = self.punish_remove_after
+        party.punish.last = self.punish_last
+
+        pairing = party.pairing
+        pairing.buddies = shared(self.buddies, cfg["players"])
+        pairing.rebase_budders(shared(self.budder_pool, cfg["budders"]), self.taken)
+        pairing.pairs = [p.to_dict() for p in self.pairs]
+        pairing.departments = dict(self.departments)
+        pairing.load_journal(self.journal)
+        party.history = History.from_state(self.history)
+        return party
+
+
+# -----------------------------
+# Encode
+# -----------------------------
+def _u32_array(values):
+    a = array("I", values)
+    if a.itemsize != 4:  # pragma: no cover - แพลตฟอร์มแปลก ๆ
+        a = array("L", values)
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a
+
+
+def iter_encode(record, level=6):
+    """PartyRecord -> bytes ทีละ chunk (header ก่อน แล้วตามด้วย zlib stream)"""
+    strings = {}
+
+    def sid(s):
+        i = strings.get(s)
+        if i is None:
+            i = strings[s] = len(strings)
+        return i
+
+    columns = {
+        "buddies": [sid(x) for x in record.buddies],
+        "budder_pool": [sid(x) for x in record.budder_pool],
+        "taken": [sid(x) for x in record.taken],
+        "dept_name": [sid(x) for x in record.departments],
+        "dept_value": [sid(x) for x in record.departments.values()],
+        "pair_buddy": [sid(p.buddy) for p in record.pairs],
+        "pair_budder": [sid(p.budder) for p in record.pairs],
+        "pair_ts": [sid(p.ts) for p in record.pairs],
+        "item_label": [sid(x.label) for x in record.punish_items],
+        "item_seconds": [x.seconds for x in record.punish_items],
+        "item_weight": [x.weight for x in record.punish_items],
+        "reward_ranges": [v for ab in record.reward_ranges for v in ab],
+    }
+    meta = {
+        "created": record.created,
+        "reward": {"n": record.reward_n, "remove_after": record.reward_remove_after, "last": record.reward_last},
+        "punish": {"remove_after": record.punish_remove_after, "last": record.punish_last},
+        "journal": record.journal,
+        "history": record.history,
+        "columns": list(columns),
+    }
+
+    yield _HEADER.pack(SNAPFILE_MAGIC, SNAPFILE_VERSION)
+    z = zlib.compressobj(level)
+
+    def block(data):
+        return z.compress(_U32.pack(len(data))) + z.compress(data)
+
+    yield block(json.dumps(meta, ensure_ascii=False).encode())
+    table = list(strings)
+    yield block(_u32_array(len(s) for s in table).tobytes())
+    yield block("".join(table).encode())
+    for values in columns.values():
+        yield block(_u32_array(values).tobytes())
+    yield z.flush()
+
+
+def dump_party(party, level=6):
+    """Party -> bytes ของไฟล์ .ptsnap"""
+    return b"".join(iter_encode(PartyRecord.from_party(party), level))
+
+
+# -----------------------------
+# Decode
+# -----------------------------
+def _read_body(f, max_bytes=SNAPFILE_MAX_BYTES):
+    """file object / bytes -> body ที่ decompress แล้ว (อ่านทีละ chunk, ไม่เกิน max_bytes)"""
+    if isinstance(f, (bytes, bytearray, memoryview)):
+        head, chunks = bytes(f[:_HEADER.size]), [bytes(f[_HEADER.size:])]
+    else:
+        head, chunks = f.read(_HEADER.size), iter(lambda: f.read(_READ_CHUNK), b"")
+    if len(head) < _HEADER.size:
+        raise ValueError("ไฟล์สั้นเกินไป ไม่ใช่ snapshot")
+    magic, version = _HEADER.unpack(head)
+    if magic != SNAPFILE_MAGIC:
+        raise ValueError("ไม่ใช่ไฟล์ snapshot ของ Party Tools")
+    if version > SNAPFILE_VERSION:
+        raise ValueError(f"snapshot version {version} ใหม่กว่าที่รองรับ ({SNAPFILE_VERSION})")
+    z = zlib.decompressobj()
+    out, size = [], 0
+    try:
+        for c in chunks:
+            while c and size <= max_bytes:
+                # ขอเกิน limit 1 byte: ได้ครบ = เกินจริง; input ที่ยังไม่ได้ใช้อยู่ใน unconsumed_tail
+                out.append(z.decompress(c, max_bytes - size + 1))
+                size += len(out[-1])
+                c = z.unconsumed_tail
+            if size > max_bytes:
+                break
+        else:
+            out.append(z.flush())
+            size += len(out[-1])
+    except zlib.error as e:
+        raise ValueError(f"ไฟล์เสีย: {e}") from None
+    if size > max_bytes:
+        raise ValueError(f"ไฟล์ใหญ่เกิน {max_bytes >> 20} MiB หลังแตกไฟล์")
+    if not z.eof:
+        raise ValueError("ไฟล์ไม่ครบ (ถูกตัดกลางทาง)")
+    return b"".join(out)
+
+
+def decode(f):
+    """file object (binary) หรือ bytes -> PartyRecord"""
+    body = memoryview(_read_body(f))
+    pos = 0
+
+    def block():
+        nonlocal pos
+        if pos + 4 > len(body):
+            raise ValueError("ไฟล์เสีย: ข้อมูลไม่ครบ")
+        (n,) = _U32.unpack_from(body, pos)
+        data = body[pos + 4:pos + 4 + n]
+        if len(data) != n:
+            raise ValueError("ไฟล์เสีย: ข้อมูลไม่ครบ")
+        pos += 4 + n
+        return data
+
+    def u32s(data):
+        a = array("I")
+        a.frombytes(data)
+        if sys.byteorder == "big":
+            a.byteswap()
+        return a
+
+    # โครงสร้างถูกแต่ขาด column / key หรือ index ของ string เกินตาราง -> ValueError เหมือนไฟล์เสียแบบอื่น
+    try:
+        meta = json.loads(bytes(block()))
+        lens = u32s(block())
+        text = bytes(block()).decode()
+        table, i = [], 0
+        for n in lens:
+            table.append(text[i:i + n])
+            i += n
+        cols = {name: u32s(block()) for name in meta["columns"]}
+
+        def names(col):
+            return [table[i] for i in cols.get(col, ())]
+
+        r = PartyRecord()
+        r.created = meta.get("created")
+        r.reward_n = meta["reward"]["n"]
+        flat = cols.get("reward_ranges", ())
+        r.reward_ranges = list(zip(flat[0::2], flat[1::2]))
+        r.reward_remove_after = meta["reward"].get("remove_after", False)
+        r.reward_last = meta["reward"].get("last")
+        r.punish_items = [
+            PunishItemRecord(table[l], s, w)
+            for l, s, w in zip(cols["item_label"], cols["item_seconds"], cols["item_weight"])
+        ]
+        r.punish_remove_after = meta["punish"].get("remove_after", False)
+        r.punish_last = meta["punish"].get("last")
+        r.buddies = names("buddies")
+        r.budder_pool = names("budder_pool")
+        r.taken = names("taken")
+        r.departments = dict(zip(names("dept_name"), names("dept_value")))
+        r.pairs = [PairRecord(a, b, t) for a, b, t in zip(names("pair_buddy"), names("pair_budder"), names("pair_ts"))]
+        r.journal = meta.get("journal") or {}
+        r.history = meta.get("history") or []
+        return r
+    except (KeyError, IndexError, TypeError, AttributeError) as e:
+        raise ValueError(f"ไฟล์เสีย: โครงสร้างไม่ครบ ({type(e).__name__}: {e})") from e
+
+
+def load_party(cfg, f):
+    """ไฟล์ .ptsnap (file object หรือ bytes) -> Party"""
+    return decode(f).to_party(cfg)
@@ -0,0 +1,120 @@
+"""Layout ของวงล้อ: segments + ลำดับแถบ + ตำแหน่งหยุด (ไม่ผูกกับ UI)"""
+import random
+from collections import Counter
+
+from .arrange import arrange_avoid_adjacent
+
+WHEEL_MAX_SECTORS = 48  # จำนวนแถบสูงสุดบนวงล้อแบบ weighted (ไม่ขึ้นกับ weight รวม)
+
+
+def build_weighted_wheel(weights, max_sectors=WHEEL_MAX_SECTORS):
+    """
+    Weighted wheel (ไม่ต้องคูณ label ตาม weight):
+    weights: [(label, weight), ...] (เช่น sampler.items())
+    -> {"segments": [[label, weight], ...], "order": [segment index ต่อแถบ, ...]}
+    แต่ละ segment แบ่งเป็นแถบ (stripe) ตามสัดส่วน weight แล้วคละไม่ให้ติดกัน (รวมแถบแรก–สุดท้ายที่ชนกันบนวงกลม)
+    จำนวนแถบรวมไม่เกิน ~max_sectors + จำนวน segment
+    """
+    weights = {str(label): int(w) for label, w in weights if int(w) > 0}
+
+    segments = [[label, w] for label, w in weights.items()]
+    total = sum(weights.values())
+    if not segments:
+        return {"segments": [], "order": [], "id": random.getrandbits(32)}
+
+    stripes = {
+        i: max(1, min(w, round(w * max_sectors / total)))
+        for i, (_, w) in enumerate(segments)
+    }
+    # label ที่ weight เกินครึ่ง: ลดจำนวนแถบให้แถบอื่นคั่นได้ครบวง (วงกลม: แถบละไม่เกินจำนวนแถบอื่น)
+    n_stripes = sum(stripes.values())
+    for i, s in stripes.items():
+        stripes[i] = min(s, max(1, n_stripes - s))
+    order = _fix_wrap(arrange_avoid_adjacent(stripes))
+    return {"segments": segments, "order": order, "id": random.getrandbits(32)}
+
+
+def _fix_wrap(order):
+    """แถบแรกกับแถบสุดท้ายติดกันบนวงล้อ: ถ้าซ้ำกัน -> สลับแถบสุดท้ายกับแถบที่ใกล้ที่สุดที่ไม่ทำให้ติดกันใหม่"""
+    n = len(order)
+    if n < 3 or order[0] != order[-1]:
+        return order
+
+    def clear(i):
+        return order[i] != order[i - 1] and order[i] != order[(i + 1) % n]
+
+    for j in range(n - 2, 0, -1):
+        if order[j] == order[-1]:
+            continue
+        order[j], order[-1] = order[-1], order[j]
+        if clear(j) and clear(n - 1):
+            break
+        order[j], order[-1] = order[-1], order[j]
+    return order
+
+
+def equal_wheel(labels):
+    """วงล้อโอกาสเท่ากัน: 1 label = 1 แถบ ตามลำดับที่ให้มา"""
+    return {
+        "segments": [[str(x), 1] for x in labels],
+        "order": list(range(len(labels))),
+        "id": random.getrandbits(32),  # ให้ component รู้ว่า layout เปลี่ยน
+    }
+
+
+def wheel_sectors(wheel):
+    """[(segment index, start, size)] ในหน่วย weight; แถบของ segment เดียวกันกว้างเท่ากัน"""
+    segments, order = wheel["segments"], wheel["order"]
+    stripe_count = Counter(order)
+    sectors = []
+    pos = 0.0
+    for i in order:
+        size = segments[i][1] / stripe_count[i]
+        sectors.append((i, pos, size))
+        pos += size
+    return sectors
+
+
+def winner_pos_for(wheel, seg_idx):
+    """
+    ตำแหน่งที่ให้วงล้อไปหยุดสำหรับ segment ที่สุ่มได้ -> pos ในช่วง [0, 1)
+    สุ่มเลือก 1 แถบของ segment นั้น แล้วหยุดค่อนไปกลางแถบ (ไม่ชี้ตรงเส้นแบ่ง)
+    """
+    sectors = wheel_sectors(wheel)
+    if not sectors:
+        return None
+    total = sectors[-1][1] + sectors[-1][2]
+    _, start, size = random.choice([s for s in sectors if s[0] == seg_idx])
+    return (start + size * (0.15 + 0.7 * random.random())) / total
+
+
+REWARD_WHEEL_MAX_SLICES = 60  # เกินนี้วงล้อรางวัลจะแสดงเป็นช่วงเลข (bucket) แทนทีละเลข
+
+
+def build_reward_wheel(pool, max_slices=REWARD_WHEEL_MAX_SLICES):
+    """
+    วงล้อรางวัลจาก TicketPool
+    - เหลือไม่เกิน max_slices: 1 เลข = 1 แถบ (คละลำดับ), "slot" = ตำแหน่งแถบของเลขนั้น
+    - มากกว่านั้น: แบ่งตาม rank เป็นช่วงเลขละแถบ (กว้างตามจำนวน), "slot" = rank
+    """
+    size = len(pool)
+    if size <= max_slices:
+        tickets = [t for a, b in pool.ranges() for t in range(a, b + 1)]
+        random.shuffle(tickets)  # reward ไม่มี duplicate เลย shuffle ธรรมดาพอ
+        wheel = equal_wheel(tickets)
+        wheel["slot"] = {t: i for i, t in enumerate(tickets)}
+    else:
+        segments = []
+        for j in range(max_slices):
+            a, b = j * size // max_slices, (j + 1) * size // max_slices
+            segments.append([f"{pool.kth(a)}–{pool.kth(b - 1)}", b - a])
+        wheel = {"segments": segments, "order": list(range(max_slices)), "slot": None, "id": random.getrandbits(32)}
+    wheel["size"] = size
+    wheel["version"] = pool.version
+    return wheel
+
+
+def reward_winner_pos(wheel, rank, ticket):
+    """ตำแหน่งหยุดบนวงล้อรางวัล [0, 1) ของเลขที่สุ่มได้ (ค่อนไปกลางแถบ)"""
+    slot = wheel["slot"][ticket] if wheel["slot"] is not None else rank
+    return (slot + 0.15 + 0.7 * random.random()) / wheel["size"]
@@ -0,0 +1,64 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from party_engine import load_party_config  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def cfg():
+    return load_party_config()
+
+
+@pytest.fixture
+def rng():
+    import random
+    return random.Random(1234)
+
+
+def play(party, rng, steps=300, log=None, snapshot_every=None):
+    """
+    ทำ event สุ่มกับ party ผ่าน Party.apply (เหมือนตอน replay) แล้วบันทึกลง log ถ้ามี
+    -> จำนวน event
+    """
+    players = list(party.pairing.buddies)
+    for i in range(steps):
+        roll = rng.random()
+        if roll < 0.3:
+            result = party.punish.result_for(party.punish.sampler.draw() or "ไม่มี", rng.choice(players))
+            result["removed"] = rng.random() < 0.1
+            kind, data = "punish_spin", result
+        elif roll < 0.5:
+            _, ticket = party.reward.tickets.draw()
+            kind, data = ("reward_spin", {"ticket": ticket, "removed": rng.random() < 0.5}) if ticket else ("reward_reset", {"n": 30})
+        elif roll < 0.7:
+            free = [b for b in party.pairing.buddies if b not in party.pairing.used_buddies()]
+            left = party.pairing.budders
+            if free and len(left):
+                kind, data = "pair", {"buddy": rng.choice(free), "budder": left[rng.randrange(len(left))], "ts": str(i)}
+            else:
+                kind, data = "pairs_reset", {}
+        elif roll < 0.8:
+            kind, data = "pair_undo", {}
+        elif roll < 0.9:
+            kind, data = "pair_redo", {}
+        else:
+            items = [dict(x) for x in party.punish.items]
+            items.append({"label": f"ดื่ม {i} วินาที หรือ แทงปลาไหล {i}", "seconds": i % 9, "weight": rng.randint(0, 4)})
+            kind, data = "punish_config", {"items": items}
+        party.apply(kind, data)
+        if log is not None:
+            log.append(kind, data)
+            if snapshot_every and (i + 1) % snapshot_every == 0:
+                log.snapshot(party.snapshot())
+    return steps
+
+
+def comparable(party):
+    """snapshot ที่เทียบกันได้ (budders_taken มาจาก set -> ลำดับไม่แน่นอน)"""
+    snap = party.snapshot()
+    snap["budders_taken"] = sorted(snap["budders_taken"])
+    return snap
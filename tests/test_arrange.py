@@ -0,0 +1,51 @@
+from collections import Counter
+
+import pytest
+
+from party_engine import can_avoid_adjacent, shuffle_avoid_adjacent_same
+
+
+def adjacent_same(arr):
+    return sum(a == b for a, b in zip(arr, arr[1:]))
+
+
+@pytest.mark.parametrize("counts", [
+    {"a": 1},
+    {"a": 2, "b": 1},
+    {"a": 3, "b": 3},
+    {"a": 5, "b": 4},
+    {"a": 10, "b": 5, "c": 5},
+    {f"l{i}": i + 1 for i in range(12)},
+])
+def test_feasible_inputs_have_no_identical_neighbours(counts):
+    items = [k for k, c in counts.items() for _ in range(c)]
+    assert can_avoid_adjacent(counts)
+    for _ in range(50):
+        arr = shuffle_avoid_adjacent_same(items)
+        assert Counter(arr) == Counter(items)
+        assert adjacent_same(arr) == 0
+
+
+@pytest.mark.parametrize("counts", [
+    {"a": 2},
+    {"a": 3, "b": 1},
+    {"a": 10, "b": 2, "c": 1},
+    {"a": 100, "b": 7},
+])
+def test_infeasible_inputs_are_least_clustered(counts):
+    items = [k for k, c in counts.items() for _ in range(c)]
+    assert not can_avoid_adjacent(counts)
+    top = max(counts.values())
+    for _ in range(20):
+        arr = shuffle_avoid_adjacent_same(items)
+        assert Counter(arr) == Counter(items)
+        # ทุกตัวอื่นคั่นระหว่าง label หลักได้ 1 ครั้ง -> ติดกันน้อยที่สุดที่เป็นไปได้
+        assert adjacent_same(arr) == top - 1 - (len(items) - top)
+
+
+def test_short_and_empty_inputs():
+    assert shuffle_avoid_adjacent_same([]) == []
+    assert shuffle_avoid_adjacent_same(["a", "a"]) == ["a", "a"]
+    items = ["a", "b"]
+    out = shuffle_avoid_adjacent_same(items)
+    assert out == items and out is not items
@@ -0,0 +1,60 @@
+import sqlite3
+
+import pytest
+
+from party_engine import EventLog, Party, restore_party
+from party_engine.eventlog import SNAPSHOT_KEEP
+
+from conftest import comparable, play
+
+
+@pytest.fixture
+def log(tmp_path):
+    return EventLog(str(tmp_path / "events.sqlite3"), flush_interval=0.01)
+
+
+@pytest.mark.parametrize("snapshot_every", [None, 7, 100])
+def test_replay_equals_live_party(cfg, rng, log, snapshot_every):
+    party = Party(cfg)
+    play(party, rng, steps=600, log=log.scope("p1"), snapshot_every=snapshot_every)
+    restored, _ = restore_party(log.scope("p1"), cfg)
+    assert comparable(restored) == comparable(party)
+    assert restored.history.entries == party.history.entries
+    assert list(restored.pairing.budders) == list(party.pairing.budders)
+    assert restored.pairing.journal() == party.pairing.journal()
+
+
+def test_scopes_do_not_mix(cfg, rng, log):
+    a, b = Party(cfg), Party(cfg)
+    play(a, rng, steps=200, log=log.scope("a"), snapshot_every=50)
+    play(b, rng, steps=50, log=log.scope("b"), snapshot_every=20)
+    assert comparable(restore_party(log.scope("a"), cfg)[0]) == comparable(a)
+    assert comparable(restore_party(log.scope("b"), cfg)[0]) == comparable(b)
+    assert not log.scope("c").exists()
+    assert comparable(restore_party(log.scope("c"), cfg)[0]) == comparable(Party(cfg))
+
+
+def test_old_snapshots_are_pruned(cfg, rng, log):
+    party = Party(cfg)
+    play(party, rng, steps=300, log=log.scope("p1"), snapshot_every=25)
+    play(Party(cfg), rng, steps=30, log=log.scope("p2"), snapshot_every=10)
+    log.flush()
+    conn = sqlite3.connect(log.path)
+    counts = dict(conn.execute("SELECT scope, COUNT(*) FROM snapshots GROUP BY scope"))
+    conn.close()
+    assert counts == {"p1": SNAPSHOT_KEEP, "p2": SNAPSHOT_KEEP}
+    assert comparable(restore_party(log.scope("p1"), cfg)[0]) == comparable(party)
+
+
+def test_history_older_than_snapshot_tail_is_rebuilt_from_events(cfg, rng, log):
+    party = Party(cfg)
+    play(party, rng, steps=400, log=log.scope("p1"))
+    snap = party.snapshot()
+    snap["history"] = party.history.state(tail=10)
+    log.scope("p1").snapshot(snap)
+    restored, _ = restore_party(log.scope("p1"), cfg)
+    assert restored.history.missing == 0
+    assert restored.history.entries == party.history.entries
+    assert restored.history.recent(5, "punish", offset=20) == party.history.recent(5, "punish", offset=20)
+    assert restored.history.seconds.top(5) == party.history.seconds.top(5)
+    assert restored.history.reward_wins.top(5) == party.history.reward_wins.top(5)
@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from party_engine import auto_pair
+
+
+def kuhn(buddies, budders, allowed):
+    """ขนาด matching สูงสุดแบบ brute force (Kuhn) สำหรับกราฟเล็ก"""
+    match_v = {}
+
+    def augment(u, seen):
+        for v in range(len(budders)):
+            if v not in seen and allowed(buddies[u], budders[v]):
+                seen.add(v)
+                if v not in match_v or augment(match_v[v], seen):
+                    match_v[v] = u
+                    return True
+        return False
+
+    return sum(augment(u, set()) for u in range(len(buddies)))
+
+
+def dept(name):
+    return name.split()[-1]
+
+
+@pytest.mark.parametrize("no_same_dept", [False, True])
+def test_auto_pair_is_maximum(no_same_dept):
+    rng = random.Random(2024)
+    for _ in range(300):
+        depts = ["A", "B", "C"][: rng.randint(1, 3)]
+        pool = [f"p{i} {rng.choice(depts)}" for i in range(10)]
+        buddies = rng.sample(pool, rng.randint(0, 7))
+        budders = rng.sample(pool, rng.randint(0, 7))
+
+        def allowed(a, b):
+            return a != b and not (no_same_dept and dept(a) == dept(b))
+
+        pairs, unmatched = auto_pair(buddies, budders, dept, no_same_dept, rng=rng)
+        assert len(pairs) == kuhn(buddies, budders, allowed)
+        assert all(allowed(a, b) for a, b in pairs)
+        assert len({a for a, _ in pairs}) == len(pairs) == len({b for _, b in pairs})
+        assert sorted(unmatched + [a for a, _ in pairs]) == sorted(buddies)
@@ -0,0 +1,69 @@
+from party_engine import PairingSession
+
+
+def make(n=5):
+    return PairingSession([f"a{i}" for i in range(n)], [f"b{i}" for i in range(n)])
+
+
+def state(s):
+    return list(s.pairs), list(s.budders), set(s.used_buddies())
+
+
+def test_pair_removes_budder_and_undo_redo_restore_it():
+    s = make()
+    start = state(s)
+    s.pair("a0", "b2", ts="t")
+    after = state(s)
+    assert list(s.budders) == ["b0", "b1", "b3", "b4"] and "b2" not in s.budders
+    assert s.undo() and state(s) == start
+    assert s.redo() and state(s) == after
+    assert not s.can_redo()
+
+
+def test_batch_is_one_operation_and_new_op_clears_redo():
+    s = make()
+    s.pair("a0", "b0", ts="t")
+    s.apply_pairs([{"buddy": "a1", "budder": "b1", "ts": "t"}, {"buddy": "a2", "budder": "b2", "ts": "t"}])
+    assert len(s.pairs) == 3
+    s.undo()
+    assert [p["buddy"] for p in s.pairs] == ["a0"] and list(s.budders) == ["b1", "b2", "b3", "b4"]
+    s.pair("a3", "b3", ts="t")
+    assert not s.can_redo()
+
+
+def test_reset_keeps_budders_taken_and_is_undoable():
+    s = make()
+    s.pair("a0", "b0", ts="t")
+    s.pair("a1", "b1", ts="t")
+    before = state(s)
+    s.reset()
+    assert s.pairs == [] and not s.used_buddies() and "b0" not in s.budders
+    s.undo()
+    assert state(s) == before
+    s.redo()
+    assert s.pairs == []
+
+
+def test_journal_round_trip():
+    s = make()
+    s.pair("a0", "b0", ts="t")
+    s.pair("a1", "b1", ts="t")
+    s.undo()
+    t = make()
+    t.rebase_budders(t.budder_pool, s.taken_budders())
+    t.pairs = s.pairs
+    t.load_journal(s.journal())
+    assert t.redo() and s.redo()
+    assert state(t) == state(s)
+    assert t.undo() and t.undo() and not t.can_undo()
+    assert t.pairs == [] and list(t.budders) == list(t.budder_pool)
+
+
+def test_auto_pair_pairs_everyone_when_possible():
+    s = make(6)
+    s.pair("a0", "b0", ts="t")
+    pairs, unmatched = s.auto_pair(ts="t")
+    assert len(pairs) == 5 and unmatched == []
+    assert len(s.budders) == 0
+    s.undo()
+    assert len(s.pairs) == 1 and len(s.budders) == 5
@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from party_engine import NamePool, TicketPool
+
+
+def check(pool, model):
+    assert len(pool) == len(model)
+    assert [pool.kth(r) for r in range(len(model))] == model
+    assert all(pool.contains(t) == (t in model) for t in range(0, pool.n + 2))
+
+
+@pytest.mark.parametrize("n", [1, 2, 7, 64, 1000])
+def test_remove_and_kth_match_list_model(n, rng):
+    pool, model = TicketPool(n), list(range(1, n + 1))
+    order = model[:]
+    rng.shuffle(order)
+    for t in order[: n // 2 + 1]:
+        assert pool.remove(t)
+        model.remove(t)
+        assert not pool.remove(t)
+    check(pool, model)
+
+
+def test_remove_range_and_ranges(rng):
+    pool, model = TicketPool(500), list(range(1, 501))
+    for _ in range(40):
+        a = rng.randint(-5, 505)
+        b = rng.randint(a, a + 30)
+        gone = [t for t in model if a <= t <= b]
+        assert pool.remove_range(a, b) == len(gone)
+        model = [t for t in model if not a <= t <= b]
+    check(pool, model)
+    assert [t for a, b in pool.ranges() for t in range(a, b + 1)] == model
+
+
+def test_from_ranges_matches_removals(rng):
+    for _ in range(50):
+        n = rng.randint(1, 300)
+        pool = TicketPool(n)
+        for t in rng.sample(range(1, n + 1), rng.randint(0, n)):
+            pool.remove(t)
+        rebuilt = TicketPool.from_ranges(n, pool.ranges())
+        check(rebuilt, [pool.kth(r) for r in range(len(pool))])
+        assert TicketPool.from_dict(pool.to_dict()).ranges() == pool.ranges()
+
+
+def test_draw_empty_pool():
+    pool = TicketPool(3)
+    pool.remove_range(1, 3)
+    assert pool.draw() == (None, None)
+
+
+def test_name_pool_matches_list_model():
+    rng = random.Random(7)
+    for _ in range(100):
+        names = [f"n{rng.randint(0, 30)}" for _ in range(rng.randint(0, 25))]
+        pool = NamePool(names, rng.sample(names, min(3, len(names))))
+        taken = set(pool.taken())
+        for _ in range(30):
+            x = rng.choice(names + ["ghost"])
+            if rng.random() < 0.6:
+                assert pool.take(x) == (x not in taken)
+                taken.add(x)
+            else:
+                assert pool.put(x) == (x in taken)
+                taken.discard(x)
+            model = [x for x in names if x not in taken]
+            assert list(pool) == model and len(pool) == len(model)
+            assert [pool[i] for i in range(-len(model), len(model))] == model + model
+            assert pool[2:9] == model[2:9]
@@ -0,0 +1,40 @@
+import random
+from collections import Counter
+
+import pytest
+
+from party_engine import WeightedSampler, chi_square
+
+
+def test_set_add_remove_match_dict_model(rng):
+    s, model = WeightedSampler(), {}
+    for _ in range(500):
+        key = f"k{rng.randint(0, 40)}"
+        w = rng.choice([0, 0, 1, 2, 5, 100])
+        s.set(key, w)
+        model[key] = w
+        assert s.total == sum(model.values())
+        assert s.weight(key) == w
+    assert dict(s.items()) == {k: w for k, w in model.items() if w > 0}
+    for key in list(model):
+        s.remove(key)
+    assert s.total == 0 and s.draw() is None
+
+
+def test_duplicate_labels_merge():
+    s = WeightedSampler.from_items([{"label": "a", "weight": 2}, {"label": "a", "weight": 3}, {"label": "b", "weight": 0}])
+    assert s.items() == [("a", 5)]
+
+
+@pytest.mark.parametrize("weights", [[1, 1, 1, 1], [1, 2, 3, 4], [50, 1, 1, 1, 1]])
+def test_draw_follows_weights(weights):
+    random.seed(99)
+    s = WeightedSampler([(f"x{i}", w) for i, w in enumerate(weights)])
+    s.set("gone", 10)
+    s.set("gone", 0)
+    spins = 20_000
+    counts = Counter(s.draw() for _ in range(spins))
+    assert "gone" not in counts
+    observed = [counts[f"x{i}"] for i in range(len(weights))]
+    stat, _, p = chi_square(observed, [w / sum(weights) for w in weights])
+    assert p > 0.001, (stat, observed)
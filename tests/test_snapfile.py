@@ -0,0 +1,45 @@
+import io
+import zlib
+
+import pytest
+
+from party_engine import Party, dump_party, load_party
+from party_engine.snapfile import _HEADER, SNAPFILE_MAGIC
+
+from conftest import comparable, play
+
+
+def test_round_trip_keeps_everything(cfg, rng):
+    party = Party(cfg)
+    play(party, rng, steps=400)
+    data = dump_party(party)
+    for src in (data, io.BytesIO(data)):
+        restored = load_party(cfg, src)
+        assert comparable(restored) == comparable(party)
+        assert restored.history.entries == party.history.entries
+        assert list(restored.pairing.budders) == list(party.pairing.budders)
+
+
+def test_untouched_party_keeps_sharing_config(cfg):
+    restored = load_party(cfg, dump_party(Party(cfg)))
+    assert restored.pairing.buddies is cfg["players"]
+    assert restored.pairing.budder_pool is cfg["budders"]
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"NOTSNAP" + b"\0" * 10,
+    _HEADER.pack(SNAPFILE_MAGIC, 99),
+    _HEADER.pack(SNAPFILE_MAGIC, 1) + b"garbage",
+    _HEADER.pack(SNAPFILE_MAGIC, 1) + zlib.compress(b"\0" * 64)[:-4],
+    _HEADER.pack(SNAPFILE_MAGIC, 1) + zlib.compress(b"\0" * 64),
+])
+def test_broken_files_raise_value_error(cfg, data):
+    with pytest.raises(ValueError):
+        load_party(cfg, data)
+
+
+def test_decompression_bomb_is_rejected(cfg):
+    bomb = _HEADER.pack(SNAPFILE_MAGIC, 1) + zlib.compress(b"\0" * (80 << 20), 9)
+    with pytest.raises(ValueError, match="MiB"):
+        load_party(cfg, io.BytesIO(bomb))
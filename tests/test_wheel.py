@@ -0,0 +1,35 @@
+import random
+
+import pytest
+
+from party_engine import build_weighted_wheel, wheel_sectors, winner_pos_for
+
+
+def circular_neighbours(order):
+    return sum(a == b for a, b in zip(order, order[1:] + order[:1])) if len(order) > 1 else 0
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_no_identical_stripes_touch_around_the_wheel(seed):
+    rng = random.Random(seed)
+    random.seed(seed)
+    weights = [(f"l{i}", rng.choice([1, 1, 2, 3, 10, 50])) for i in range(rng.randint(2, 12))]
+    wheel = build_weighted_wheel(weights)
+    assert circular_neighbours(wheel["order"]) == 0
+    assert set(wheel["order"]) == set(range(len(wheel["segments"])))
+
+
+def test_dominant_label_is_still_separated():
+    for _ in range(50):
+        wheel = build_weighted_wheel([("big", 1000), ("a", 1), ("b", 1)])
+        assert circular_neighbours(wheel["order"]) == 0
+
+
+def test_sectors_keep_weights_and_winner_lands_in_segment():
+    wheel = build_weighted_wheel([("a", 5), ("b", 3), ("c", 2)])
+    total = sum(w for _, w in wheel["segments"])
+    sectors = wheel_sectors(wheel)
+    for i, (_, w) in enumerate(wheel["segments"]):
+        assert sum(size for seg, _, size in sectors if seg == i) == pytest.approx(w)
+        pos = winner_pos_for(wheel, i) * total
+        assert any(seg == i and start <= pos < start + size for seg, start, size in sectors)